@@ -2,16 +2,8 @@ from __future__ import annotations
 
 import typer
 
-from mrpd.commands.bridge_mcp import bridge_mcp
-from mrpd.commands.bridge_openapi import bridge_openapi
-from mrpd.commands.init_provider import init_provider
-from mrpd.commands.mrpify_mcp import mrpify_mcp
-from mrpd.commands.mrpify_openapi import mrpify_openapi
-from mrpd.commands.publish import publish
-from mrpd.commands.route import route
-from mrpd.commands.run import run
-from mrpd.commands.serve import serve
-from mrpd.commands.validate import validate
+# Command modules are imported inside each command, so a subcommand only
+# pays for its own dependencies (httpx, FastAPI/uvicorn, jsonschema, ...).
 
 app = typer.Typer(add_completion=False)
 
@@ -21,6 +13,18 @@ app.add_typer(bridge_app, name="bridge")
 mrpify_app = typer.Typer(help="MRP-ify existing systems with a guided flow")
 app.add_typer(mrpify_app, name="mrpify")
 
+evidence_app = typer.Typer(help="Inspect stored evidence bundles")
+app.add_typer(evidence_app, name="evidence")
+
+registry_app = typer.Typer(help="Local registry mirror for offline routing")
+app.add_typer(registry_app, name="registry")
+
+health_app = typer.Typer(help="Provider health: observed stats, probes and circuit breakers")
+app.add_typer(health_app, name="health")
+
+daemon_app = typer.Typer(help="Warm background daemon that serves route/run for the CLI")
+app.add_typer(daemon_app, name="daemon")
+
 
 @app.command()
 def version() -> None:
@@ -35,6 +39,8 @@ def serve_cmd(
     reload: bool = typer.Option(False, "--reload"),
 ) -> None:
     """Run the MRP HTTP server."""
+    from mrpd.commands.serve import serve
+
     serve(host=host, port=port, reload=reload)
 
 
@@ -44,6 +50,8 @@ def validate_cmd(
     fixtures: bool = typer.Option(False, "--fixtures", help="Validate bundled fixtures (valid must pass, invalid must fail)"),
 ) -> None:
     """Validate an MRP envelope against the bundled JSON Schemas."""
+    from mrpd.commands.validate import validate
+
     validate(path, fixtures=fixtures)
 
 
@@ -55,9 +63,22 @@ def route_cmd(
     registry: str | None = typer.Option(None, "--registry", help="Registry base URL (default: https://www.moltrouter.dev)"),
     bootstrap_raw: str | None = typer.Option(None, "--bootstrap-raw", help="Override fallback raw registry JSON (URL or file://path)"),
     limit: int = typer.Option(10, "--limit", min=1, max=50),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the on-disk registry/manifest cache"),
+    concurrency: int = typer.Option(8, "--concurrency", min=1, max=64, help="Max concurrent manifest fetches"),
+    max_scan: int = typer.Option(1000, "--max-scan", min=1, help="Max registry entries to walk across pages"),
+    offline: bool = typer.Option(False, "--offline", help="Answer from the local registry mirror (see: mrpd registry sync)"),
 ) -> None:
     """Query registry + rank candidates for an intent."""
-    route(intent=intent, capability=capability, policy=policy, registry=registry, limit=limit, bootstrap_raw=bootstrap_raw)
+    from mrpd.core.daemon import forward
+
+    if bootstrap_raw is None:
+        code = forward("route", dict(intent=intent, capability=capability, policy=policy, registry=registry, limit=limit, use_cache=not no_cache, concurrency=concurrency, max_scan=max_scan, offline=offline))
+        if code is not None:
+            raise typer.Exit(code=code)
+
+    from mrpd.commands.route import route
+
+    route(intent=intent, capability=capability, policy=policy, registry=registry, limit=limit, bootstrap_raw=bootstrap_raw, use_cache=not no_cache, concurrency=concurrency, max_scan=max_scan, offline=offline)
 
 
 @app.command(name="run")
@@ -67,12 +88,56 @@ def run_cmd(
     capability: str = typer.Option("summarize_url", "--capability", help="Capability to request"),
     policy: str | None = typer.Option(None, "--policy", help="Policy requirement"),
     registry: str | None = typer.Option(None, "--registry", help="Registry base URL (default: https://www.moltrouter.dev)"),
-    manifest_url: str | None = typer.Option(None, "--manifest-url", help="Skip registry and use this provider manifest URL (useful for local testing)"),
+    manifest_url: str | None = typer.Option(None, "--manifest-url", help="Skip registry and use this provider manifest URL (useful for local testing; asgi://mrpd/mrp/manifest runs the built-in provider in-process)"),
     max_tokens: int | None = typer.Option(None, "--max-tokens", help="Soft max context tokens (constraint hint)"),
     max_cost: float | None = typer.Option(None, "--max-cost", help="Max cost (constraint hint)"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the on-disk registry/manifest cache"),
+    max_scan: int = typer.Option(500, "--max-scan", min=1, help="Max registry entries to walk across pages"),
+    offline: bool = typer.Option(False, "--offline", help="Route from the local registry mirror (see: mrpd registry sync)"),
+    hedge: int | None = typer.Option(None, "--hedge", min=1, help="Send DISCOVER to the top N providers; first offer wins (default: config, 1)"),
+    hedge_delay: float | None = typer.Option(None, "--hedge-delay", min=0.0, help="Seconds before asking the next provider (default: ask all at once)"),
+    retries: int | None = typer.Option(None, "--retries", min=0, help="Retries of a retryable EXECUTE error per provider before failing over (default: config, 1)"),
+    deadline: float | None = typer.Option(None, "--deadline", min=0.0, help="Overall time budget in seconds (default: config, 120; 0: none)"),
+    prefer: str | None = typer.Option(None, "--prefer", help="Offer objective: balanced, cheapest, fastest or confident (default: config, balanced)"),
 ) -> None:
     """End-to-end: DISCOVER -> EXECUTE against the best matching provider."""
-    run(intent=intent, url=url, capability=capability, policy=policy, registry=registry, manifest_url=manifest_url, max_tokens=max_tokens, max_cost=max_cost)
+    from mrpd.core.daemon import forward
+
+    code = forward("run", dict(intent=intent, url=url, capability=capability, policy=policy, registry=registry, manifest_url=manifest_url, max_tokens=max_tokens, max_cost=max_cost, use_cache=not no_cache, max_scan=max_scan, hedge=hedge, hedge_delay=hedge_delay, retries=retries, deadline=deadline, prefer=prefer, offline=offline))
+    if code is not None:
+        raise typer.Exit(code=code)
+
+    from mrpd.commands.run import run
+
+    run(intent=intent, url=url, capability=capability, policy=policy, registry=registry, manifest_url=manifest_url, max_tokens=max_tokens, max_cost=max_cost, use_cache=not no_cache, max_scan=max_scan, offline=offline, hedge=hedge, hedge_delay=hedge_delay, retries=retries, deadline=deadline, prefer=prefer)
+
+
+@app.command(name="batch")
+def batch_cmd(
+    input_path: str = typer.Argument("-", help="NDJSON file of items ({\"url\": ...}), or '-' for stdin"),
+    intent: str | None = typer.Option(None, "--intent", help="Intent for items that do not set one"),
+    capability: str = typer.Option("summarize_url", "--capability", help="Capability for items that do not set one"),
+    policy: str | None = typer.Option(None, "--policy", help="Policy requirement for items that do not set one"),
+    registry: str | None = typer.Option(None, "--registry", help="Registry base URL (default: https://www.moltrouter.dev)"),
+    manifest_url: str | None = typer.Option(None, "--manifest-url", help="Skip registry and use this provider manifest URL"),
+    max_tokens: int | None = typer.Option(None, "--max-tokens", help="Soft max context tokens (constraint hint)"),
+    max_cost: float | None = typer.Option(None, "--max-cost", help="Max cost (constraint hint)"),
+    concurrency: int = typer.Option(8, "--concurrency", min=1, max=256, help="Items in flight at once"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the on-disk registry/manifest cache"),
+    max_scan: int = typer.Option(500, "--max-scan", min=1, help="Max registry entries to walk per route"),
+    offline: bool = typer.Option(False, "--offline", help="Route from the local registry mirror (see: mrpd registry sync)"),
+    hedge: int | None = typer.Option(None, "--hedge", min=1, help="Send DISCOVER to the top N providers; first offer wins"),
+    hedge_delay: float | None = typer.Option(None, "--hedge-delay", min=0.0, help="Seconds before asking the next provider"),
+    retries: int | None = typer.Option(None, "--retries", min=0, help="Retries of a retryable EXECUTE error per provider"),
+    deadline: float | None = typer.Option(None, "--deadline", min=0.0, help="Time budget per item in seconds (0: none)"),
+    batch_id: str | None = typer.Option(None, "--batch-id", help="Batch id recorded with each evidence bundle (default: new)"),
+    resume: bool = typer.Option(False, "--resume", help="Skip items of --batch-id that already succeeded"),
+    prefer: str | None = typer.Option(None, "--prefer", help="Offer objective: balanced, cheapest, fastest or confident (default: config, balanced)"),
+) -> None:
+    """Run many inputs (NDJSON) concurrently; stream NDJSON results to stdout."""
+    from mrpd.commands.batch import batch
+
+    batch(input_path=input_path, intent=intent, capability=capability, policy=policy, registry=registry, manifest_url=manifest_url, max_tokens=max_tokens, max_cost=max_cost, concurrency=concurrency, use_cache=not no_cache, max_scan=max_scan, offline=offline, hedge=hedge, hedge_delay=hedge_delay, retries=retries, deadline=deadline, batch_id=batch_id, resume=resume, prefer=prefer)
 
 
 @app.command(name="publish")
@@ -82,6 +147,8 @@ def publish_cmd(
     poll_seconds: float = typer.Option(5.0, "--poll-seconds", min=1.0, max=60.0),
 ) -> None:
     """Self-register a provider in the public registry using HTTP-01 challenge."""
+    from mrpd.commands.publish import publish
+
     publish(manifest_url=manifest_url, registry=registry, poll_seconds=poll_seconds)
 
 
@@ -95,6 +162,8 @@ def init_provider_cmd(
     policy: list[str] = typer.Option([], "--policy", help="Policy strings (repeatable)")
 ) -> None:
     """Scaffold a minimal FastAPI MRP provider wrapper."""
+    from mrpd.commands.init_provider import init_provider
+
     init_provider(out_dir=out_dir, capability=capability, provider_id=provider_id, name=name, description=description, policy=policy)
 
 
@@ -107,6 +176,8 @@ def bridge_openapi_cmd(
     capability_prefix: str | None = typer.Option(None, "--capability-prefix", help="Prefix for generated capabilities (e.g. svc_)"),
 ) -> None:
     """Generate an MRP provider wrapper from an OpenAPI spec."""
+    from mrpd.commands.bridge_openapi import bridge_openapi
+
     bridge_openapi(spec=spec, out_dir=out_dir, provider_id=provider_id, backend_base_url=backend_base_url, capability_prefix=capability_prefix)
 
 
@@ -119,6 +190,8 @@ def bridge_mcp_cmd(
     mcp_args: list[str] = typer.Option([], "--mcp-arg", help="MCP server argument (repeatable)"),
 ) -> None:
     """Generate an MRP provider wrapper scaffold from an MCP tool list."""
+    from mrpd.commands.bridge_mcp import bridge_mcp
+
     bridge_mcp(tools_json=tools_json, out_dir=out_dir, provider_id=provider_id, mcp_command=mcp_command, mcp_args=mcp_args)
 
 
@@ -136,6 +209,8 @@ def mrpify_openapi_cmd(
     poll_seconds: float = typer.Option(5.0, "--poll-seconds", min=1.0, max=60.0),
 ) -> None:
     """Guided flow: OpenAPI -> MRP bridge -> (optional) publish commands."""
+    from mrpd.commands.mrpify_openapi import mrpify_openapi
+
     mrpify_openapi(
         spec=spec,
         out_dir=out_dir,
@@ -164,6 +239,8 @@ def mrpify_mcp_cmd(
     poll_seconds: float = typer.Option(5.0, "--poll-seconds", min=1.0, max=60.0),
 ) -> None:
     """Guided flow: MCP -> MRP bridge -> (optional) publish commands."""
+    from mrpd.commands.mrpify_mcp import mrpify_mcp
+
     mrpify_mcp(
         tools_json=tools_json,
         out_dir=out_dir,
@@ -178,5 +255,118 @@ def mrpify_mcp_cmd(
     )
 
 
+@evidence_app.command(name="list")
+def evidence_list_cmd(
+    capability: str | None = typer.Option(None, "--capability", help="Filter by capability"),
+    receiver: str | None = typer.Option(None, "--receiver", help="Filter by provider (receiver) id"),
+    status: str | None = typer.Option(None, "--status", help="Filter by status (ok/error)"),
+    since: str | None = typer.Option(None, "--since", help="Created at or after (RFC 3339 or date prefix)"),
+    until: str | None = typer.Option(None, "--until", help="Created before (RFC 3339 or date prefix)"),
+    batch: str | None = typer.Option(None, "--batch", help="Only bundles from this `mrpd batch` id"),
+    limit: int = typer.Option(50, "--limit", min=1),
+) -> None:
+    """List evidence bundles, newest first."""
+    from mrpd.commands.evidence import evidence_list
+
+    evidence_list(capability=capability, receiver=receiver, status=status, since=since, until=until, limit=limit, batch=batch)
+
+
+@evidence_app.command(name="show")
+def evidence_show_cmd(
+    job_id: str = typer.Argument(..., help="Job id"),
+) -> None:
+    """Print one evidence bundle."""
+    from mrpd.commands.evidence import evidence_show
+
+    evidence_show(job_id)
+
+
+@evidence_app.command(name="search")
+def evidence_search_cmd(
+    query: str | None = typer.Argument(None, help="Intent text to search for"),
+    artifact_hash: str | None = typer.Option(None, "--hash", help="Artifact hash (sha256:...)"),
+    limit: int = typer.Option(50, "--limit", min=1),
+) -> None:
+    """Search evidence bundles by intent text or artifact hash."""
+    from mrpd.commands.evidence import evidence_search
+
+    evidence_search(query, artifact_hash=artifact_hash, limit=limit)
+
+
+@evidence_app.command(name="import")
+def evidence_import_cmd() -> None:
+    """Index legacy per-job JSON bundles from the evidence dir."""
+    from mrpd.commands.evidence import evidence_import
+
+    evidence_import()
+
+
+@registry_app.command(name="sync")
+def registry_sync_cmd(
+    registry: str | None = typer.Option(None, "--registry", help="Registry base URL (default: configured registries, else https://www.moltrouter.dev)"),
+    full: bool = typer.Option(False, "--full", help="Re-pull everything and drop entries the registry no longer lists"),
+    page_size: int = typer.Option(200, "--page-size", min=1, max=1000),
+) -> None:
+    """Mirror registry entries locally (incremental after the first run)."""
+    from mrpd.commands.registry import registry_sync
+
+    registry_sync(registry=registry, full=full, page_size=page_size)
+
+
+@registry_app.command(name="status")
+def registry_status_cmd() -> None:
+    """Show local registry mirror status."""
+    from mrpd.commands.registry import registry_status
+
+    registry_status()
+
+
+@health_app.command(name="status")
+def health_status_cmd() -> None:
+    """Show observed provider latency, error rate and circuit state."""
+    from mrpd.commands.health import health_status
+
+    health_status()
+
+
+@health_app.command(name="probe")
+def health_probe_cmd(
+    watch: bool = typer.Option(False, "--watch", help="Keep probing in the background on jittered intervals"),
+    timeout: float = typer.Option(5.0, "--timeout", help="Per-probe timeout in seconds"),
+) -> None:
+    """Probe known providers (manifest + HELLO) and update their circuit breakers."""
+    from mrpd.commands.health import health_probe
+
+    health_probe(watch=watch, timeout=timeout)
+
+
+@daemon_app.command(name="start")
+def daemon_start_cmd(
+    background: bool = typer.Option(False, "--background", "-d", help="Detach and return once the daemon is listening"),
+    idle_timeout: float = typer.Option(0.0, "--idle-timeout", min=0.0, help="Exit after this many idle seconds (0: never)"),
+    probe: bool = typer.Option(False, "--probe", help="Also probe known providers in the background (like `health probe --watch`)"),
+) -> None:
+    """Start the daemon; route/run forward to it while it runs."""
+    from mrpd.commands.daemon import daemon_start
+
+    daemon_start(background=background, idle_timeout=idle_timeout, probe=probe)
+
+
+@daemon_app.command(name="status")
+def daemon_status_cmd() -> None:
+    """Show whether the daemon is running."""
+    from mrpd.commands.daemon import daemon_status
+
+    daemon_status()
+
+
+@daemon_app.command(name="stop")
+def daemon_stop_cmd() -> None:
+    """Stop the daemon after in-flight commands finish."""
+    from mrpd.commands.daemon import daemon_stop
+
+    daemon_stop()
+
+
 if __name__ == "__main__":
     app()
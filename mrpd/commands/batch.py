@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sys
+import time
+import uuid
+from typing import IO, Any, Optional
+
+import typer
+
+from mrpd.commands.run import dispatch_settings
+from mrpd.core.client import MRPClient
+from mrpd.core.config import default_config_path, load_config
+from mrpd.core.dispatch import Candidate
+from mrpd.core.evidence import EvidenceStore
+from mrpd.core.mirror import default_mirror_path
+from mrpd.core.offers import PREFERENCES
+from mrpd.core.runner import Job, JobResult, Runner
+
+
+def item_key(item: dict) -> str:
+    """Stable identity of a batch item: its `id`, else a hash of its content."""
+
+    if item.get("id") is not None:
+        return str(item["id"])
+    raw = json.dumps(item, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def _err(message: str) -> None:
+    typer.echo(message, err=True)
+
+
+def _reply_error(reply: Optional[dict]) -> Optional[str]:
+    if not reply or reply.get("msg_type") == "EVIDENCE":
+        return None
+    payload = reply.get("payload") or {}
+    return f"{payload.get('code') or reply.get('msg_type')}: {payload.get('message') or ''}".rstrip(": ")
+
+
+class _Progress:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.ok = 0
+        self.failed = 0
+        self.skipped = 0
+
+    def line(self) -> str:
+        done = self.ok + self.failed
+        elapsed = time.perf_counter() - self.started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        return (
+            f"[batch] {done} done ({self.ok} ok, {self.failed} failed, {self.skipped} skipped) "
+            f"in {elapsed:.1f}s, {rate:.1f} items/s"
+        )
+
+
+def batch(
+    input_path: str,
+    intent: str | None,
+    capability: str,
+    policy: str | None,
+    registry: str | None,
+    manifest_url: str | None,
+    max_tokens: int | None,
+    max_cost: float | None,
+    concurrency: int = 8,
+    use_cache: bool = True,
+    max_scan: int = 500,
+    offline: bool = False,
+    hedge: int | None = None,
+    hedge_delay: float | None = None,
+    retries: int | None = None,
+    deadline: float | None = None,
+    batch_id: str | None = None,
+    resume: bool = False,
+    prefer: str | None = None,
+) -> None:
+    """Run DISCOVER -> EXECUTE for every NDJSON item in a file (or stdin).
+
+    Each line is an object with `url` and optionally `id`, `intent`,
+    `capability`, `policy`, `max_tokens` and `max_cost` (defaulting to the
+    options). Providers are routed once per capability/policy (and intent,
+    when a mirror ranks by it), jobs run `concurrency` at a time over pooled
+    connections, and one NDJSON result line per item is written to stdout
+    as it completes. Progress goes to stderr. Every bundle is tagged with
+    the batch id, so `--resume` can skip items that already succeeded.
+    """
+
+    if resume and not batch_id:
+        _err("--resume needs the --batch-id of the batch to continue.")
+        raise typer.Exit(code=2)
+    if prefer is not None and prefer not in PREFERENCES:
+        _err(f"Unknown --prefer {prefer!r}; choose from: {', '.join(PREFERENCES)}")
+        raise typer.Exit(code=2)
+    config = load_config(default_config_path())
+    if offline and not default_mirror_path().exists():
+        _err("No local registry mirror yet. Run: mrpd registry sync")
+        raise typer.Exit(code=1)
+    settings = dispatch_settings(config, hedge=hedge, hedge_delay=hedge_delay, retries=retries, deadline=deadline)
+    batch_id = batch_id or str(uuid.uuid4())
+    completed: set[str] = set()
+    if resume:
+        with EvidenceStore() as store:
+            completed = store.batch_completed(batch_id)
+    _err(f"[batch] id {batch_id}" + (f", {len(completed)} item(s) already done" if resume else ""))
+
+    progress = _Progress()
+    # One routing pass per capability/policy (and intent, when it affects ranking),
+    # shared by every item that needs it.
+    routes: dict[tuple[str, Optional[str], Optional[str]], asyncio.Task[list[Candidate] | None]] = {}
+
+    def emit(result: dict[str, Any]) -> None:
+        sys.stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+    async def _route(runner: Runner, cap: str, pol: Optional[str], text: str) -> list[Candidate] | None:
+        return await runner.candidates(
+            capability=cap,
+            policy=pol,
+            intent=text,
+            registry=registry,
+            manifest_url=manifest_url,
+            max_scan=max_scan,
+            echo=lambda m: _err(f"[route {cap}] {m}"),
+        )
+
+    async def _one(runner: Runner, line_no: int, raw: str) -> None:
+        base: dict[str, Any] = {"line": line_no}
+        try:
+            item = json.loads(raw)
+            if not isinstance(item, dict) or not isinstance(item.get("url"), str):
+                raise ValueError("expected an object with a string 'url'")
+        except ValueError as ex:
+            progress.failed += 1
+            emit({**base, "status": "error", "error": f"invalid item: {ex}"})
+            return
+        key = item_key(item)
+        base.update(item=key, url=item["url"])
+        if key in completed:
+            progress.skipped += 1
+            return
+        text = item.get("intent") or intent
+        if not text:
+            progress.failed += 1
+            emit({**base, "status": "error", "error": "missing intent (set it per item or with --intent)"})
+            return
+        cap = item.get("capability") or capability
+        pol = item.get("policy") if "policy" in item else policy
+        job = Job(
+            text,
+            item["url"],
+            cap,
+            policy=pol,
+            max_tokens=item.get("max_tokens", max_tokens),
+            max_cost=item.get("max_cost", max_cost),
+        )
+
+        # Intent relevance comes from the mirror's index; without it, intents rank alike.
+        by_intent = runner.client.mirror is not None and config.intent.enabled
+        route_key = (cap, pol, text if by_intent else None)
+        task = routes.get(route_key)
+        if task is None:
+            task = routes[route_key] = asyncio.create_task(_route(runner, cap, pol, text))
+        # Every item gets a bundle (and a batch_items row), failed ones included.
+        extra = {"batch": {"id": batch_id, "item": key, "line": line_no}}
+        started = time.perf_counter()
+        result: Optional[JobResult] = None
+        try:
+            candidates = await task
+            if candidates is None:
+                error: Optional[str] = f"no usable provider for capability {cap}"
+                result = await runner.fail_job(job, error, started=started, extra=extra)
+            else:
+                result = await runner.run_job(job, candidates, started=started, extra=extra)
+                error = result.error or _reply_error(result.reply)
+        except Exception as ex:
+            error = str(ex) or type(ex).__name__
+            if result is None:
+                try:
+                    result = await runner.fail_job(job, error, started=started, extra=extra)
+                except Exception:
+                    pass
+        ok = result is not None and result.ok
+        if ok:
+            progress.ok += 1
+        else:
+            progress.failed += 1
+        emit(_result_line(base, result, ok, error))
+
+    async def _worker(runner: Runner, queue: asyncio.Queue[tuple[int, str] | None]) -> None:
+        while (got := await queue.get()) is not None:
+            await _one(runner, *got)
+
+    async def _report() -> None:
+        while True:
+            await asyncio.sleep(1.0)
+            _err(progress.line())
+
+    async def _read(fh: IO[str], queue: asyncio.Queue[tuple[int, str] | None]) -> None:
+        line_no = 0
+        while raw := await asyncio.to_thread(fh.readline):
+            line_no += 1
+            if raw.strip():
+                await queue.put((line_no, raw))
+
+    async def _run(client: MRPClient, fh: IO[str]) -> int:
+        workers_n = max(1, concurrency)
+        queue: asyncio.Queue[tuple[int, str] | None] = asyncio.Queue(maxsize=workers_n * 2)
+        async with Runner(client, settings=settings, prefer=prefer) as runner:
+            reporter = asyncio.create_task(_report())
+            workers = [asyncio.create_task(_worker(runner, queue)) for _ in range(workers_n)]
+            try:
+                await _read(fh, queue)
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                reporter.cancel()
+                for w in workers:
+                    w.cancel()
+        _err(progress.line())
+        if progress.failed:
+            _err(f"[batch] retry failed items with: mrpd batch {input_path} --batch-id {batch_id} --resume")
+        return 1 if progress.failed else 0
+
+    async def _main(fh: IO[str]) -> int:
+        max_connections = max(10, max(1, concurrency) * max(1, settings.hedge))
+        client = MRPClient(config, use_cache=use_cache, offline=offline, max_connections=max_connections)
+        async with client:
+            return await _run(client, fh)
+
+    if input_path == "-":
+        code = asyncio.run(_main(sys.stdin))
+    else:
+        with open(input_path, "r", encoding="utf-8") as fh:
+            code = asyncio.run(_main(fh))
+    raise typer.Exit(code=code)
+
+
+def _result_line(base: dict[str, Any], result: Optional[JobResult], ok: bool, error: Optional[str]) -> dict[str, Any]:
+    line: dict[str, Any] = {**base, "status": "ok" if ok else "error"}
+    if result is not None:
+        line.update(job_id=result.job_id, receiver=result.receiver, total_ms=result.total_ms)
+        payload = (result.reply or {}).get("payload") or {}
+        if ok:
+            line["outputs"] = payload.get("outputs") or []
+    if error:
+        line["error"] = error
+    return line
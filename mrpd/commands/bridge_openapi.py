@@ -94,12 +94,15 @@ def bridge_openapi(
     # Wrapper server
     app_py = '''from __future__ import annotations
 
+import asyncio
 import json
+import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 from urllib.parse import urlencode
 
 import httpx
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 
 APP_DIR = Path(__file__).resolve().parent
 MANIFEST_DIR = APP_DIR / "mrp_manifests"
@@ -107,35 +110,108 @@ MANIFEST_DIR = APP_DIR / "mrp_manifests"
 # Configure backend base URL here (or via env in a real deployment)
 BACKEND_BASE_URL = ("''' + base_url + '''").rstrip("/")
 
-app = FastAPI(title="MRP OpenAPI Bridge")
+# Re-read mrp_manifests/ when files change, checked every N seconds (0: load once at startup).
+RELOAD_SECONDS = float(os.getenv("MRP_BRIDGE_RELOAD_SECONDS", "0") or 0)
+
+
+class ManifestIndex:
+    """Every manifest in MANIFEST_DIR, parsed once and indexed for dict lookups."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.stamp: tuple = ()
+        self.by_capability: dict[str, dict] = {}
+        self.by_route: dict[str, dict] = {}
+        # One offer per manifest file, in file order; several files may share a capability.
+        self.offers: list[dict] = []
+        self.offers_by_capability: dict[str, list[dict]] = {}
+        self.capabilities: list[str] = []
+        self.load()
+
+    def _stamp(self) -> tuple:
+        # Names, sizes and mtimes: cheap to stat, and any edit changes them.
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json") and entry.is_file():
+                st = entry.stat()
+                files.append((entry.name, st.st_size, st.st_mtime_ns))
+        return tuple(sorted(files))
+
+    def load(self) -> None:
+        stamp = self._stamp()
+        by_capability: dict[str, dict] = {}
+        by_route: dict[str, dict] = {}
+        offers: list[dict] = []
+        offers_by_capability: dict[str, list[dict]] = {}
+        capabilities: list[str] = []
+        for name, _size, _mtime in stamp:
+            try:
+                m = json.loads((self.directory / name).read_text(encoding="utf-8"))
+            except Exception:
+                continue
+            cap = m.get("capability")
+            if not isinstance(cap, str):
+                continue
+            meta = (m.get("metadata") or {}).get("openapi") or {}
+            route_id = meta.get("route_id")
+            # /mrp/manifest/<cap> serves <cap>.json, else the first file declaring it.
+            if cap not in by_capability or name == f"{cap}.json":
+                by_capability[cap] = m
+            if route_id:
+                by_route[route_id] = meta
+            offer = {
+                "route_id": route_id,
+                "capability": cap,
+                "constraints": m.get("constraints") or {},
+                "cost": {"unit": "usd", "estimate": 0},
+                "latency_ms": 0,
+                "proofs": [],
+            }
+            offers.append(offer)
+            offers_by_capability.setdefault(cap, []).append(offer)
+            capabilities.append(cap)
+        # Swap whole indexes so requests never see a half-built one.
+        self.by_capability, self.by_route = by_capability, by_route
+        self.offers, self.offers_by_capability = offers, offers_by_capability
+        self.capabilities = capabilities
+        self.stamp = stamp
+
+    def reload_if_changed(self) -> bool:
+        if self._stamp() == self.stamp:
+            return False
+        self.load()
+        return True
 
 
-def _load_manifest(capability: str) -> dict:
-    fp = MANIFEST_DIR / f"{capability}.json"
-    return json.loads(fp.read_text(encoding="utf-8"))
+INDEX = ManifestIndex(MANIFEST_DIR)
+
+
+async def _watch_manifests() -> None:
+    while True:
+        await asyncio.sleep(RELOAD_SECONDS)
+        try:
+            await asyncio.to_thread(INDEX.reload_if_changed)
+        except OSError:
+            continue
 
 
-def _capability_from_route_id(route_id: str) -> str:
-    # route:openapi/<capability>@0.1
-    if not route_id.startswith("route:openapi/"):
-        raise ValueError("invalid route_id")
-    rest = route_id[len("route:openapi/"):]
-    cap = rest.split("@", 1)[0]
-    return cap
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    watcher = asyncio.create_task(_watch_manifests()) if RELOAD_SECONDS > 0 else None
+    try:
+        yield
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+
+
+app = FastAPI(title="MRP OpenAPI Bridge", lifespan=lifespan)
 
 
 @app.get("/.well-known/mrp.json")
 def well_known() -> dict:
     # NOTE: This lists multiple capabilities; manifests are per-capability.
-    caps = []
-    for fp in sorted(MANIFEST_DIR.glob("*.json")):
-        try:
-            m = json.loads(fp.read_text(encoding="utf-8"))
-            c = m.get("capability")
-            if isinstance(c, str):
-                caps.append(c)
-        except Exception:
-            continue
+    caps = INDEX.capabilities
 
     return {
         "mrp_version": "0.1",
@@ -148,7 +224,10 @@ def well_known() -> dict:
 
 @app.get("/mrp/manifest/{capability}")
 def mrp_manifest(capability: str) -> dict:
-    return _load_manifest(capability)
+    m = INDEX.by_capability.get(capability)
+    if m is None:
+        raise HTTPException(status_code=404, detail=f"unknown capability: {capability}")
+    return m
 
 
 @app.post("/mrp/discover")
@@ -159,22 +238,7 @@ def mrp_discover(envelope: dict) -> dict:
 
     wanted = constraints.get("capability")
 
-    offers = []
-    for fp in sorted(MANIFEST_DIR.glob("*.json")):
-        m = json.loads(fp.read_text(encoding="utf-8"))
-        cap = m.get("capability")
-        meta = (m.get("metadata") or {}).get("openapi") or {}
-        route_id = meta.get("route_id")
-        if wanted and cap != wanted:
-            continue
-        offers.append({
-            "route_id": route_id,
-            "capability": cap,
-            "constraints": m.get("constraints") or {},
-            "cost": {"unit": "usd", "estimate": 0},
-            "latency_ms": 0,
-            "proofs": [],
-        })
+    offers = INDEX.offers_by_capability.get(wanted, []) if wanted else INDEX.offers
 
     return {
         "mrp_version": "0.1",
@@ -195,10 +259,9 @@ def mrp_execute(envelope: dict) -> dict:
 
     payload = envelope.get("payload") or {}
     route_id = payload.get("route_id")
-    capability = _capability_from_route_id(route_id)
-
-    m = _load_manifest(capability)
-    meta = (m.get("metadata") or {}).get("openapi") or {}
+    meta = INDEX.by_route.get(route_id)
+    if meta is None:
+        raise ValueError(f"unknown route_id: {route_id}")
 
     method = meta.get("method")
     pth = meta.get("path")
@@ -262,6 +325,8 @@ def mrp_execute(envelope: dict) -> dict:
         "pip install fastapi uvicorn httpx pyyaml\n"
         "uvicorn app:app --host 127.0.0.1 --port 8787 --reload\n"
         "```\n\n"
+        "Manifests in `mrp_manifests/` are loaded once at startup. To pick up edits without a restart, "
+        "set `MRP_BRIDGE_RELOAD_SECONDS` (e.g. `5`) to re-scan the directory periodically.\n\n"
         "## Publish\n\n"
         "Each OpenAPI operationId becomes a capability. After deploying, publish each manifest you want discoverable:\n\n"
         "Example:\n\n"
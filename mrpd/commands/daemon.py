@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+import typer
+
+from mrpd.core.client import MRPClient
+from mrpd.core.config import Config, default_config_path, load_config
+from mrpd.core.daemon import FORWARDED, PROTOCOL, connect, default_socket_path, mrpd_env, request
+from mrpd.core.health import HealthStore
+from mrpd.core.mirror import default_mirror_path
+from mrpd.core.probe import probe_forever
+
+
+def _mtime(path: Path) -> float | None:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+class DaemonServer:
+    """Runs forwarded CLI commands over warm, shared MRP clients.
+
+    One `MRPClient` per (cache, offline) mode keeps its connection pool,
+    HTTP cache and mirror open between commands. The config file and mirror
+    are re-checked on each request; when either changes, new clients are
+    built and the old ones are closed once their in-flight commands finish.
+    """
+
+    def __init__(self, path: Path, *, probe: bool = False) -> None:
+        self.path = path
+        self.probe = probe
+        self.env = mrpd_env()
+        self.started = time.time()
+        self.last_active = time.monotonic()
+        self.served = 0
+        self.active = 0
+        self.stopping = asyncio.Event()
+        self._config: Config | None = None
+        self._stamp: tuple[Any, ...] | None = None
+        self._clients: dict[tuple[bool, bool], MRPClient] = {}
+        self._retired: list[MRPClient] = []
+        self._inflight: dict[MRPClient, int] = {}
+
+    def client(self, *, use_cache: bool, offline: bool) -> MRPClient:
+        config_path = default_config_path()
+        stamp = (_mtime(config_path), default_mirror_path().exists())
+        if stamp != self._stamp:
+            self._retired.extend(self._clients.values())
+            self._clients.clear()
+            self._config = load_config(config_path)
+            self._stamp = stamp
+        key = (use_cache, offline)
+        client = self._clients.get(key)
+        if client is None:
+            assert self._config is not None
+            client = self._clients[key] = MRPClient(self._config, use_cache=use_cache, offline=offline)
+        client.refresh_health()
+        return client
+
+    async def run_command(self, command: str, args: dict[str, Any], echo: Callable[[str], None]) -> int:
+        use_cache = bool(args.pop("use_cache", True))
+        offline = bool(args.pop("offline", False))
+        if offline and not default_mirror_path().exists():
+            echo("No local registry mirror yet. Run: mrpd registry sync")
+            return 1
+        client = self.client(use_cache=use_cache, offline=offline)
+        self._inflight[client] = self._inflight.get(client, 0) + 1
+        try:
+            if command == "route":
+                from mrpd.commands.route import route_async
+
+                return await route_async(client, echo=echo, **args)
+            from mrpd.commands.run import run_async
+
+            return await run_async(client, echo=echo, **args)
+        finally:
+            self._inflight[client] -= 1
+            if not self._inflight[client]:
+                del self._inflight[client]
+            await self.close_retired()
+
+    async def close_retired(self) -> None:
+        """Close replaced clients that no command is using any more."""
+
+        idle = [c for c in self._retired if c not in self._inflight]
+        self._retired = [c for c in self._retired if c in self._inflight]
+        for client in idle:
+            await client.aclose()
+
+    def status(self) -> str:
+        # `active` includes the status request itself.
+        return (
+            f"mrpd daemon pid={os.getpid()} uptime={time.time() - self.started:.0f}s "
+            f"served={self.served} active={self.active - 1} socket={self.path}"
+        )
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        def send(msg: dict[str, Any]) -> None:
+            if writer.is_closing():
+                # The CLI went away (Ctrl-C, `| head`): abort the command like a broken pipe would.
+                raise ConnectionResetError("mrpd client disconnected")
+            writer.write((json.dumps(msg, ensure_ascii=False) + "\n").encode("utf-8"))
+
+        self.active += 1
+        try:
+            try:
+                req = json.loads(await reader.readline())
+                command, args = req["command"], dict(req.get("args") or {})
+            except (ValueError, KeyError, TypeError):
+                return
+            if command == "status":
+                send({"out": self.status()})
+                send({"exit": 0})
+            elif command == "stop":
+                send({"out": f"mrpd daemon (pid {os.getpid()}) stopping"})
+                send({"exit": 0})
+                self.stopping.set()
+            elif command not in FORWARDED or req.get("v") != PROTOCOL or req.get("env") != self.env:
+                # The CLI runs it in-process instead.
+                send({"fallback": True})
+            else:
+                try:
+                    code = await self.run_command(command, args, lambda m: send({"out": m}))
+                except ConnectionError:
+                    raise
+                except Exception as ex:
+                    send({"err": f"{type(ex).__name__}: {ex}"})
+                    code = 1
+                self.served += 1
+                send({"exit": code})
+            await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.active -= 1
+            self.last_active = time.monotonic()
+            writer.close()
+
+    async def probe_providers(self) -> None:
+        """Keep known providers' circuits current, as `mrpd health probe --watch` does."""
+
+        config = load_config(default_config_path())
+        if not config.health.enabled:
+            return
+        try:
+            with HealthStore.from_config(config) as store:
+                async with httpx.AsyncClient(follow_redirects=False) as http:
+                    await probe_forever(store, http, config.health)
+        except Exception as ex:
+            # Probing is best effort; forwarded commands keep working without it.
+            typer.echo(f"mrpd daemon: provider probing stopped: {type(ex).__name__}: {ex}", err=True)
+
+    async def serve(self, idle_timeout: float = 0.0) -> None:
+        # Owner-only socket: commands run with this user's config and stores.
+        old_umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self.handle, path=str(self.path))
+        finally:
+            os.umask(old_umask)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stopping.set)
+        prober = asyncio.create_task(self.probe_providers()) if self.probe else None
+        try:
+            while not self.stopping.is_set():
+                try:
+                    await asyncio.wait_for(self.stopping.wait(), timeout=min(idle_timeout or 60.0, 60.0))
+                except asyncio.TimeoutError:
+                    idle = time.monotonic() - self.last_active
+                    if idle_timeout and not self.active and idle >= idle_timeout:
+                        break
+        finally:
+            server.close()
+            if prober is not None:
+                prober.cancel()
+            # Let in-flight commands finish (bounded) before their clients close.
+            deadline = time.monotonic() + 30.0
+            while self.active and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            for client in [*self._clients.values(), *self._retired]:
+                await client.aclose()
+            self.path.unlink(missing_ok=True)
+
+
+def _unix_sockets() -> bool:
+    return hasattr(socket, "AF_UNIX") and sys.platform != "win32"
+
+
+def daemon_start(background: bool = False, idle_timeout: float = 0.0, probe: bool = False) -> None:
+    """Serve `route` and `run` for the CLI over a Unix socket, keeping pools and caches warm."""
+
+    if not _unix_sockets():
+        typer.echo("mrpd daemon needs Unix domain sockets; commands run in-process on this platform.")
+        raise typer.Exit(code=1)
+    path = default_socket_path()
+    sock = connect(path)
+    if sock is not None:
+        sock.close()
+        typer.echo(f"mrpd daemon is already running on {path}")
+        raise typer.Exit(code=1)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Nothing answered: a socket file left behind by a crashed daemon.
+    path.unlink(missing_ok=True)
+
+    if background:
+        log_path = path.with_suffix(".log")
+        cmd = [sys.executable, "-m", "mrpd", "daemon", "start", "--idle-timeout", str(idle_timeout)]
+        if probe:
+            cmd.append("--probe")
+        with open(log_path, "ab") as log:
+            proc = subprocess.Popen(
+                cmd, stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True
+            )
+        for _ in range(100):
+            sock = connect(path)
+            if sock is not None:
+                sock.close()
+                typer.echo(f"mrpd daemon started (pid {proc.pid}) on {path}")
+                raise typer.Exit(code=0)
+            if proc.poll() is not None:
+                break
+            time.sleep(0.1)
+        typer.echo(f"mrpd daemon did not start; see {log_path}")
+        raise typer.Exit(code=1)
+
+    typer.echo(f"mrpd daemon listening on {path} (pid {os.getpid()})", err=True)
+    asyncio.run(DaemonServer(path, probe=probe).serve(idle_timeout=idle_timeout))
+
+
+def _ask(command: str) -> int:
+    path = default_socket_path()
+    sock = connect(path)
+    if sock is None:
+        typer.echo(f"mrpd daemon is not running ({path})")
+        return 1
+    with sock:
+        for msg in request(sock, command, {}):
+            if "out" in msg:
+                typer.echo(msg["out"])
+            elif "exit" in msg:
+                return int(msg["exit"])
+    return 1
+
+
+def daemon_status() -> None:
+    """Show whether the daemon is running and what it has served."""
+
+    raise typer.Exit(code=_ask("status"))
+
+
+def daemon_stop() -> None:
+    """Ask the daemon to finish in-flight commands and exit."""
+
+    raise typer.Exit(code=_ask("stop"))
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+
+import typer
+
+from mrpd.core.evidence import EvidenceStore
+
+
+def _echo_rows(rows: list[dict]) -> None:
+    if not rows:
+        typer.echo("No evidence bundles matched.")
+        return
+    for r in rows:
+        total = f"{r['total_ms']:.0f}ms" if r.get("total_ms") is not None else "-"
+        typer.echo(
+            f"{r['created_at']} {r['job_id']} status={r['status']} "
+            f"capability={r.get('capability') or '-'} receiver={r.get('receiver') or '-'} total={total}"
+        )
+        if r.get("intent"):
+            typer.echo(f"  intent: {r['intent']}")
+
+
+def evidence_list(
+    capability: str | None,
+    receiver: str | None,
+    status: str | None,
+    since: str | None,
+    until: str | None,
+    limit: int,
+    batch: str | None = None,
+) -> None:
+    """List indexed evidence bundles, newest first."""
+
+    with EvidenceStore() as store:
+        rows = store.list(
+            capability=capability, receiver=receiver, status=status, since=since, until=until, batch=batch, limit=limit
+        )
+    _echo_rows(rows)
+
+
+def evidence_show(job_id: str) -> None:
+    """Print a single evidence bundle as JSON."""
+
+    with EvidenceStore() as store:
+        bundle = store.get(job_id)
+    if bundle is None:
+        typer.echo(f"No evidence bundle for job: {job_id}")
+        raise typer.Exit(code=1)
+    typer.echo(json.dumps(bundle, indent=2, ensure_ascii=False))
+
+
+def evidence_search(query: str | None, artifact_hash: str | None, limit: int) -> None:
+    """Search bundles by intent text and/or artifact hash."""
+
+    if not query and not artifact_hash:
+        typer.echo("Provide a search query and/or --hash.")
+        raise typer.Exit(code=2)
+    with EvidenceStore() as store:
+        rows = store.search(query, artifact_hash=artifact_hash, limit=limit)
+    _echo_rows(rows)
+
+
+def evidence_import() -> None:
+    """Index legacy one-file-per-job bundles into the evidence store."""
+
+    with EvidenceStore() as store:
+        count = store.import_legacy()
+    typer.echo(f"Indexed {count} legacy evidence bundle(s).")
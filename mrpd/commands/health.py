@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Optional
+
+import httpx
+import typer
+
+from mrpd.core.config import default_config_path, load_config
+from mrpd.core.health import Circuit, HealthStore
+from mrpd.core.probe import probe_forever, probe_once
+
+
+def _echo_probe(c: Circuit, ok: bool, error: Optional[str]) -> None:
+    status = "ok" if ok else f"FAILED ({error})"
+    typer.echo(f"- {c.entry_id}: {status} -> circuit {c.state_at(time.time())}")
+
+
+def health_status() -> None:
+    """Show observed latency/error stats and circuit state per provider."""
+
+    config = load_config(default_config_path())
+    now = time.time()
+    with HealthStore.from_config(config) as store:
+        stats = store.get_many()
+        circuits = store.circuits()
+    if not stats and not circuits:
+        typer.echo("No provider health recorded yet (mrpd run records it).")
+        return
+    for entry_id in sorted(set(stats) | set(circuits)):
+        st = stats.get(entry_id)
+        c = circuits.get(entry_id)
+        line = f"- {entry_id}:"
+        if st:
+            line += f" ewma={st.ewma_ms:.0f}ms p95={st.p95_ms:.0f}ms errors={st.error_rate:.2f} samples={st.samples}"
+        if c:
+            state = c.state_at(now)
+            line += f" circuit={state}"
+            if state == "open" and c.open_until:
+                line += f" (retry in {c.open_until - now:.0f}s)"
+        typer.echo(line)
+
+
+def health_probe(watch: bool, timeout: float) -> None:
+    """Probe known providers once (or continuously with --watch) and update their circuits."""
+
+    config = load_config(default_config_path())
+
+    async def _run() -> int:
+        with HealthStore.from_config(config) as store:
+            async with httpx.AsyncClient(follow_redirects=False) as http:
+                if watch:
+                    typer.echo(f"Probing every ~{config.health.probe_interval:.0f}s (Ctrl-C to stop)")
+                    await probe_forever(store, http, config.health, timeout=timeout, on_result=_echo_probe)
+                    return 0
+                results = await probe_once(store, http, timeout=timeout, on_result=_echo_probe)
+        if not results:
+            typer.echo("No known providers to probe yet (mrpd run records them).")
+        return 0
+
+    try:
+        code = asyncio.run(_run())
+    except KeyboardInterrupt:
+        code = 0
+    raise typer.Exit(code=code)
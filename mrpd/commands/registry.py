@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+
+import typer
+
+from mrpd.core.config import default_config_path, load_config
+from mrpd.core.defaults import MRP_DEFAULT_REGISTRY_BASE
+from mrpd.core.mirror import RegistryMirror
+from mrpd.core.rawindex import open_raw_index
+from mrpd.core.registry import RegistryClient, raw_file_path
+
+
+def registry_sync(registry: str | None, full: bool, page_size: int) -> None:
+    """Mirror registry entries into the local SQLite store.
+
+    Syncs `--registry` if given, else every configured registry, else the
+    default public registry.
+    """
+
+    config = load_config(default_config_path())
+    if registry:
+        bases = [registry]
+    elif config.registries:
+        bases = [src.base_url for src in config.registries]
+    else:
+        bases = [MRP_DEFAULT_REGISTRY_BASE]
+
+    async def _run() -> int:
+        code = 0
+        with RegistryMirror() as mirror:
+            for base in bases:
+                client = RegistryClient(base, timeout=30.0)
+                try:
+                    res = await mirror.sync(client, full=full, page_size=page_size)
+                except Exception as ex:
+                    typer.echo(f"Sync failed for {base}: {ex} (progress saved; re-run to resume)")
+                    code = 1
+                    continue
+                mode = "full" if res.full else "delta"
+                if res.resumed:
+                    mode += ", resumed"
+                typer.echo(f"Synced {base} ({mode}): {res.upserted} upserted, {res.removed} removed")
+            typer.echo(f"Mirror: {mirror.path} ({mirror.count()} entries)")
+        return code
+
+    raise typer.Exit(code=asyncio.run(_run()))
+
+
+def registry_status() -> None:
+    """Show local mirror size, per-registry sync state and the bootstrap file index."""
+
+    with RegistryMirror() as mirror:
+        typer.echo(f"Mirror: {mirror.path}")
+        typer.echo(f"Entries: {mirror.count()}")
+        for st in mirror.states():
+            typer.echo(f"- {st['registry']}: last sync {st['last_sync_at'] or 'never'}")
+            if st.get("pending_cursor"):
+                typer.echo(f"  interrupted sync pending (cursor {st['pending_cursor']})")
+
+    path = raw_file_path()
+    if path is None:
+        return
+    try:
+        index = open_raw_index(path)
+    except (OSError, ValueError) as ex:
+        typer.echo(f"Bootstrap file: {path} (unreadable: {ex})")
+        return
+    typer.echo(f"Bootstrap file: {path} ({len(index.ids)} entries indexed)")
+    if index.skipped["invalid_id"]:
+        typer.echo(f"  skipped {index.skipped['invalid_id']} entries without a string id")
+    if index.skipped["duplicate_id"]:
+        typer.echo(f"  skipped {index.skipped['duplicate_id']} entries with a duplicate id")
+    if index.skipped["invalid_trust"]:
+        typer.echo(f"  skipped {index.skipped['invalid_trust']} entries with a trust score outside 0..1")
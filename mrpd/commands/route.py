@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 import asyncio
+from typing import Callable
 
 import typer
 
-from mrpd.core.registry import RegistryClient, fetch_manifest
-from mrpd.core.scoring import ScoreResult, rank_entries
+from mrpd.core.client import MRPClient
+from mrpd.core.config import default_config_path, load_config
+from mrpd.core.mirror import default_mirror_path
+from mrpd.core.registry import FederatedRegistryClient
+from mrpd.core.scoring import ScoreResult, materialize_valid
 
 
 def route(
@@ -15,6 +19,10 @@ def route(
     registry: str | None,
     limit: int,
     bootstrap_raw: str | None,
+    use_cache: bool = True,
+    concurrency: int = 8,
+    max_scan: int = 1000,
+    offline: bool = False,
 ) -> None:
     """Discover candidates for an intent from the registry and print ranked results.
 
@@ -22,128 +30,180 @@ def route(
     v1: negotiate/execute.
     """
 
-    def loss_reason(winner: ScoreResult, candidate: ScoreResult) -> str:
-        if candidate.missing:
-            return f"missing requirements: {', '.join(candidate.missing)}"
-        if candidate.score != winner.score:
-            return f"lower score ({candidate.score:.2f} vs {winner.score:.2f})"
-        if candidate.required_matches != winner.required_matches:
-            return "fewer required matches"
-        if candidate.trust_score != winner.trust_score:
-            return "lower trust score"
-        if candidate.proofs_count != winner.proofs_count:
-            return "fewer proofs"
-        if (candidate.entry.name or "").lower() != (winner.entry.name or "").lower():
-            return "tiebreaker: name order"
-        return "tiebreaker: id order"
-
-    async def _run() -> int:
-        if bootstrap_raw:
-            import os
-
-            os.environ["MRP_BOOTSTRAP_REGISTRY_RAW"] = bootstrap_raw
-        client = RegistryClient(base_url=registry) if registry else RegistryClient()
-        try:
-            res = await client.query(capability=capability, policy=policy, limit=limit)
-        except Exception as ex:
-            typer.echo(f"Registry query failed: {ex}")
-            return 1
+    config = load_config(default_config_path())
+    # The mirror answers offline queries and backs up an unreachable registry.
+    if offline and not default_mirror_path().exists():
+        typer.echo("No local registry mirror yet. Run: mrpd registry sync")
+        raise typer.Exit(code=1)
+    if bootstrap_raw:
+        import os
+
+        os.environ["MRP_BOOTSTRAP_REGISTRY_RAW"] = bootstrap_raw
+
+    async def _main() -> int:
+        async with MRPClient(
+            config, registry=registry, use_cache=use_cache, offline=offline, max_connections=max(1, concurrency)
+        ) as mrp:
+            return await route_async(
+                mrp, intent, capability, policy, registry, limit, concurrency=concurrency, max_scan=max_scan
+            )
 
-        entries = list(res.results)
-        if not entries and (capability or policy):
-            try:
-                res = await client.query(limit=limit)
-                entries = list(res.results)
-            except Exception as ex:
-                typer.echo(f"Registry query failed: {ex}")
-                return 1
-
-        if not entries:
-            typer.echo("No registry entries matched.")
-            return 1
-
-        # Registry may return mixed results. Only entries with manifest_url are routable.
-        leads = [e for e in entries if not getattr(e, "manifest_url", None)]
-        entries = [e for e in entries if getattr(e, "manifest_url", None)]
-
-        if not entries:
-            typer.echo("No routable providers found (no entries with manifest_url).")
-            if leads:
-                typer.echo(f"Indexed leads found: {len(leads)} (not MRP providers yet).")
-            return 1
-
-        ranked = rank_entries(entries, capability=capability, policy=policy)
-        satisfying = [r for r in ranked if r.satisfied]
-
-        typer.echo(f"Intent: {intent}")
-        if capability:
-            typer.echo(f"Filter capability: {capability}")
-        if policy:
-            typer.echo(f"Filter policy: {policy}")
-        typer.echo("")
-
-        if satisfying:
-            winner = satisfying[0]
-            typer.echo(
+    raise typer.Exit(code=asyncio.run(_main()))
+
+
+def _loss_reason(winner: ScoreResult, candidate: ScoreResult) -> str:
+    if candidate.missing:
+        return f"missing requirements: {', '.join(candidate.missing)}"
+    if candidate.score != winner.score:
+        return f"lower score ({candidate.score:.2f} vs {winner.score:.2f})"
+    if candidate.required_matches != winner.required_matches:
+        return "fewer required matches"
+    if candidate.trust_score != winner.trust_score:
+        return "lower trust score"
+    if candidate.proofs_count != winner.proofs_count:
+        return "fewer proofs"
+    if (candidate.entry.name or "").lower() != (winner.entry.name or "").lower():
+        return "tiebreaker: name order"
+    return "tiebreaker: id order"
+
+
+async def route_async(
+    mrp: MRPClient,
+    intent: str,
+    capability: str | None,
+    policy: str | None,
+    registry: str | None,
+    limit: int,
+    *,
+    concurrency: int = 8,
+    max_scan: int = 1000,
+    echo: Callable[[str], None] = typer.echo,
+) -> int:
+    """`mrpd route` over an open client; returns the exit code (also used by `mrpd daemon`)."""
+
+    client = mrp.registry_client(registry)
+    try:
+        scan = await mrp.scan(intent, capability, policy, limit=limit, registry=registry, max_scan=max_scan)
+        if not scan.top.seen and not scan.top.skipped and not scan.lead_count and (capability or policy):
+            # Nothing matched the filters: rank the whole registry against them for a near-miss list.
+            scan = await mrp.scan(
+                intent, capability, policy, limit=limit, registry=registry, max_scan=max_scan, unfiltered=True
+            )
+    except Exception as ex:
+        echo(f"Registry query failed: {ex}")
+        return 1
+    if scan.error:
+        echo(f"Registry scan stopped early: {scan.error}")
+    top, leads, lead_count = scan.top, scan.leads, scan.lead_count
+
+    if isinstance(client, FederatedRegistryClient):
+        for name, err in client.errors.items():
+            echo(f"Registry {name} unavailable: {err}")
+
+    if not top.seen and top.skipped:
+        echo(f"All {top.skipped} routable providers are failing (circuit open); skipped.")
+        echo("Check them with: mrpd health probe")
+        return 1
+
+    if not top.seen and not lead_count:
+        echo("No registry entries matched.")
+        return 1
+
+    if not top.seen:
+        echo("No routable providers found (no entries with manifest_url).")
+        echo(f"Indexed leads found: {lead_count} (not MRP providers yet).")
+        return 1
+
+    # Scanning works on compact rows; only what gets printed is fully validated.
+    ranked, invalid = materialize_valid(top.ranked())
+    satisfying, _ = materialize_valid(top.satisfying())
+
+    echo(f"Intent: {intent}")
+    if capability:
+        echo(f"Filter capability: {capability}")
+    if policy:
+        echo(f"Filter policy: {policy}")
+    echo(f"Scanned: {top.seen} routable entries")
+    if top.skipped:
+        echo(f"Skipped: {top.skipped} providers with an open circuit")
+    if invalid:
+        echo(f"Skipped: {len(invalid)} invalid registry entries ({', '.join(invalid)})")
+    echo("")
+
+    if satisfying:
+        shown = satisfying[:limit]
+        # Fetch every shown manifest concurrently; print in rank order as each resolves.
+        manifests = mrp.manifests([r.entry.manifest_url for r in shown], concurrency=concurrency)
+
+        try:
+            winner = shown[0]
+            echo(
                 f"Winner: score={winner.score:.2f} id={winner.entry.id} name={winner.entry.name}"
             )
             winner_reason = ", ".join(winner.reasons) if winner.reasons else "best tiebreaker"
-            typer.echo(f"Why winner won: {winner_reason}")
-            typer.echo(f"Manifest: {winner.entry.manifest_url}")
+            echo(f"Why winner won: {winner_reason}")
+            echo(f"Manifest: {winner.entry.manifest_url}")
             if winner.entry.repo:
-                typer.echo(f"Repo: {winner.entry.repo}")
+                echo(f"Repo: {winner.entry.repo}")
             try:
-                manifest = await fetch_manifest(winner.entry.manifest_url)
+                manifest = await manifests[0]
                 caps = manifest.get("capability") or manifest.get("capability_id")
-                typer.echo(f"Manifest capability: {caps}")
+                echo(f"Manifest capability: {caps}")
                 endpoints = manifest.get("endpoints") or {}
                 if endpoints:
-                    typer.echo(f"Endpoints: {endpoints}")
+                    echo(f"Endpoints: {endpoints}")
             except Exception as ex:
-                typer.echo(f"Manifest fetch FAILED: {ex}")
-            typer.echo("")
+                echo(f"Manifest fetch FAILED: {ex}")
+            echo("")
 
-            for r in satisfying[1:limit]:
-                typer.echo(f"- score={r.score:.2f} id={r.entry.id} name={r.entry.name}")
-                typer.echo(f"  why lost: {loss_reason(winner, r)}")
-                typer.echo(f"  manifest: {r.entry.manifest_url}")
+            for r, task in zip(shown[1:], manifests[1:]):
+                echo(f"- score={r.score:.2f} id={r.entry.id} name={r.entry.name}")
+                echo(f"  why lost: {_loss_reason(winner, r)}")
+                echo(f"  manifest: {r.entry.manifest_url}")
                 if r.entry.repo:
-                    typer.echo(f"  repo: {r.entry.repo}")
+                    echo(f"  repo: {r.entry.repo}")
                 try:
-                    manifest = await fetch_manifest(r.entry.manifest_url)
+                    manifest = await task
                     caps = manifest.get("capability") or manifest.get("capability_id")
-                    typer.echo(f"  manifest.capability: {caps}")
+                    echo(f"  manifest.capability: {caps}")
                     endpoints = manifest.get("endpoints") or {}
                     if endpoints:
-                        typer.echo(f"  endpoints: {endpoints}")
+                        echo(f"  endpoints: {endpoints}")
                 except Exception as ex:
-                    typer.echo(f"  manifest fetch FAILED: {ex}")
-                typer.echo("")
-        else:
-            typer.echo("No candidates satisfied the requested requirements. Near-miss list:")
-            typer.echo("")
-            for r in ranked[:limit]:
-                missing = ", ".join(r.missing) if r.missing else "none"
-                typer.echo(f"- score={r.score:.2f} id={r.entry.id} name={r.entry.name}")
-                typer.echo(f"  missing: {missing}")
-                typer.echo(f"  manifest: {r.entry.manifest_url}")
-                if r.entry.repo:
-                    typer.echo(f"  repo: {r.entry.repo}")
-                typer.echo("")
-
-        if leads:
-            typer.echo("Indexed leads (not MRP providers yet):")
-            for e in leads[: min(limit, 20)]:
-                url = e.metadata.get("url") if isinstance(e.metadata, dict) else None
-                trust = getattr(e, "trust", None)
-                level = trust.level if trust and getattr(trust, "level", None) else None
-                typer.echo(f"- id={e.id} name={e.name} canonical_id={getattr(e,'canonical_id',None)}")
-                if level:
-                    typer.echo(f"  trust.level: {level}")
-                if url:
-                    typer.echo(f"  url: {url}")
-            typer.echo("")
-
-        return 0
-
-    raise typer.Exit(code=asyncio.run(_run()))
+                    echo(f"  manifest fetch FAILED: {ex}")
+                echo("")
+        finally:
+            # Output may stop early (e.g. closed pipe); don't leave fetches dangling.
+            for task in manifests:
+                task.cancel()
+    else:
+        echo("No candidates satisfied the requested requirements. Near-miss list:")
+        echo("")
+        for r in ranked[:limit]:
+            missing = ", ".join(r.missing) if r.missing else "none"
+            echo(f"- score={r.score:.2f} id={r.entry.id} name={r.entry.name}")
+            echo(f"  missing: {missing}")
+            echo(f"  manifest: {r.entry.manifest_url}")
+            if r.entry.repo:
+                echo(f"  repo: {r.entry.repo}")
+            echo("")
+
+    if leads:
+        echo("Indexed leads (not MRP providers yet):")
+        for lead in leads[: min(limit, 20)]:
+            try:
+                e = lead.materialize()
+            except (ValueError, OSError):
+                echo(f"- id={lead.id} (invalid registry entry; skipped)")
+                continue
+            url = e.metadata.get("url") if isinstance(e.metadata, dict) else None
+            trust = getattr(e, "trust", None)
+            level = trust.level if trust and getattr(trust, "level", None) else None
+            echo(f"- id={e.id} name={e.name} canonical_id={getattr(e,'canonical_id',None)}")
+            if level:
+                echo(f"  trust.level: {level}")
+            if url:
+                echo(f"  url: {url}")
+        echo("")
+
+    return 0
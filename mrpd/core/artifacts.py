@@ -23,7 +23,11 @@ def store_bytes(data: bytes, *, mime: str, suffix: str = "") -> dict[str, Any]:
     h = sha256_hex(data)
     name = h + (suffix if suffix else "")
     path = d / name
-    path.write_bytes(data)
+    # Content-addressed: an existing file with the same name already holds these bytes.
+    if not (path.exists() and path.stat().st_size == len(data)):
+        tmp = path.with_name(f"{name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
 
     return {
         "type": "artifact",
@@ -37,3 +41,19 @@ def store_bytes(data: bytes, *, mime: str, suffix: str = "") -> dict[str, Any]:
 def store_json(obj: Any, *, suffix: str = ".json") -> dict[str, Any]:
     data = json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
     return store_bytes(data, mime="application/json", suffix=suffix)
+
+
+def load_bytes(hash_ref: str, *, uri: str | None = None) -> bytes:
+    """Read a stored artifact back by `sha256:<hex>` (or bare hex) hash."""
+
+    h = hash_ref.split(":", 1)[1] if hash_ref.startswith("sha256:") else hash_ref
+    candidates: list[Path] = []
+    if uri and uri.startswith("file://"):
+        candidates.append(Path(uri[len("file://") :]))
+    candidates.extend(sorted(default_artifact_dir().glob(f"{h}*")))
+    for path in candidates:
+        if path.is_file():
+            data = path.read_bytes()
+            if sha256_hex(data) == h:
+                return data
+    raise FileNotFoundError(f"artifact not found: sha256:{h}")
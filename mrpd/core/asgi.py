@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from typing import Any, Mapping
+
+import httpx
+
+
+ASGI_SCHEME = "asgi"
+# `asgi://mrpd/...` is the built-in demo provider (mrpd.api.app).
+BUILTIN_APP = "mrpd"
+
+
+def is_asgi_url(url: str) -> bool:
+    return url.startswith(f"{ASGI_SCHEME}://")
+
+
+def _builtin_app() -> Any:
+    from mrpd.api.app import app
+
+    return app
+
+
+class ASGIRouter(httpx.AsyncBaseTransport):
+    """Serves `asgi://<name>/...` URLs from ASGI apps in this process.
+
+    Requests go straight into the app's ASGI callable: no socket, no TCP or
+    HTTP/1.1 framing. `<name>` picks the app; `mrpd` is the built-in
+    provider, imported on first use. Mount others with `mount()`.
+    """
+
+    def __init__(self, apps: Mapping[str, Any] | None = None) -> None:
+        self._apps = dict(apps or {})
+        self._transports: dict[str, httpx.ASGITransport] = {}
+
+    def mount(self, name: str, app: Any) -> None:
+        self._apps[name] = app
+        self._transports.pop(name, None)
+
+    def _transport(self, request: httpx.Request) -> httpx.ASGITransport:
+        name = request.url.host
+        transport = self._transports.get(name)
+        if transport is None:
+            app = self._apps.get(name)
+            if app is None and name == BUILTIN_APP:
+                app = self._apps[name] = _builtin_app()
+            if app is None:
+                raise httpx.ConnectError(f"No in-process ASGI app named {name!r}", request=request)
+            transport = self._transports[name] = httpx.ASGITransport(app=app)
+        return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport(request).handle_async_request(request)
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+from urllib.parse import urlencode
+
+import httpx
+
+from mrpd.core.config import Config
+from mrpd.core.util import sha256_hex
+
+
+# Performs the actual GET; receives extra (conditional) request headers.
+Fetcher = Callable[[dict[str, str]], Awaitable[httpx.Response]]
+
+
+def default_cache_dir() -> Path:
+    root = os.getenv("MRPD_CACHE_DIR")
+    if root:
+        return Path(root)
+    return Path.home() / ".mrpd" / "cache"
+
+
+def cache_key(kind: str, url: str, params: dict[str, str] | None = None) -> str:
+    key = f"{kind}:{url}"
+    if params:
+        key += "?" + urlencode(sorted(params.items()))
+    return key
+
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+@dataclass
+class CacheEntry:
+    body: Any
+    fetched_at: float
+    ttl: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def age(self, now: float | None = None) -> float:
+        return (now if now is not None else time.time()) - self.fetched_at
+
+
+class HttpCache:
+    """Persistent JSON response cache with TTL, ETag revalidation and stale serving.
+
+    Lookups within `ttl` are served from disk. Within a further
+    `stale_while_revalidate` seconds the stale body is returned immediately
+    and refreshed in the background (call `drain()` before the event loop
+    ends). Past that, the entry is revalidated synchronously, and if the
+    origin is unreachable a body up to `stale_if_error` seconds old is used.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        *,
+        stale_while_revalidate: float = 600.0,
+        stale_if_error: float = 7 * 86400.0,
+    ) -> None:
+        self.directory = Path(directory).expanduser() if directory else default_cache_dir()
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
+        self._pending: dict[str, asyncio.Task[Any]] = {}
+
+    @classmethod
+    def from_config(cls, config: Config) -> "HttpCache":
+        return cls(
+            config.cache_dir,
+            stale_while_revalidate=config.cache.stale_while_revalidate,
+            stale_if_error=config.cache.stale_if_error,
+        )
+
+    def _path(self, key: str) -> Path:
+        kind = key.split(":", 1)[0]
+        return self.directory / kind / f"{sha256_hex(key.encode('utf-8'))}.json"
+
+    def load(self, key: str) -> CacheEntry | None:
+        try:
+            data = json.loads(self._path(key).read_text(encoding="utf-8"))
+            return CacheEntry(**data)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def store(self, key: str, entry: CacheEntry) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(asdict(entry), separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def delete(self, key: str) -> None:
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    async def get_json(self, key: str, fetch: Fetcher, *, ttl: float) -> Any:
+        entry = self.load(key)
+        if entry is not None:
+            age = entry.age()
+            if age < entry.ttl:
+                return entry.body
+            if age < entry.ttl + self.stale_while_revalidate:
+                if key not in self._pending:
+                    task = asyncio.create_task(self._revalidate(key, fetch, ttl, entry))
+                    self._pending[key] = task
+                    task.add_done_callback(lambda _t, k=key: self._pending.pop(k, None))
+                return entry.body
+
+        try:
+            return await self._revalidate(key, fetch, ttl, entry)
+        except Exception:
+            if entry is not None and entry.age() < entry.ttl + self.stale_if_error:
+                return entry.body
+            raise
+
+    async def _revalidate(self, key: str, fetch: Fetcher, ttl: float, entry: CacheEntry | None) -> Any:
+        headers: dict[str, str] = {}
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        r = await fetch(headers)
+        cache_control = r.headers.get("cache-control", "")
+        m = _MAX_AGE.search(cache_control)
+        fresh_for = float(m.group(1)) if m else ttl
+
+        if r.status_code == 304 and entry is not None:
+            entry.fetched_at = time.time()
+            entry.ttl = fresh_for
+            self.store(key, entry)
+            return entry.body
+
+        r.raise_for_status()
+        body = r.json()
+        if "no-store" not in cache_control:
+            self.store(
+                key,
+                CacheEntry(
+                    body=body,
+                    fetched_at=time.time(),
+                    ttl=fresh_for,
+                    etag=r.headers.get("etag"),
+                    last_modified=r.headers.get("last-modified"),
+                ),
+            )
+        return body
+
+    async def drain(self) -> None:
+        """Wait for background revalidations; failures keep the stale entry."""
+
+        if self._pending:
+            await asyncio.gather(*list(self._pending.values()), return_exceptions=True)
+
+
+class OfferCache:
+    """OFFER replies keyed by provider, capability and a hash of the constraints.
+
+    Lets repeat runs go straight to EXECUTE. Entries live next to the HTTP
+    cache (`offer/`) for `ttl` seconds; drop one with `invalidate()` when
+    the provider no longer knows its route.
+    """
+
+    def __init__(self, cache: HttpCache, ttl: float) -> None:
+        self.cache = cache
+        self.ttl = ttl
+
+    @staticmethod
+    def key(provider: str, capability: str, constraints: dict[str, Any]) -> str:
+        digest = sha256_hex(json.dumps(constraints, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+        return cache_key("offer", provider, {"capability": capability, "constraints": digest})
+
+    def get(self, provider: str, capability: str, constraints: dict[str, Any]) -> Any:
+        entry = self.cache.load(self.key(provider, capability, constraints))
+        if entry is None or entry.age() >= entry.ttl:
+            return None
+        return entry.body
+
+    def put(self, provider: str, capability: str, constraints: dict[str, Any], reply: Any) -> None:
+        entry = CacheEntry(body=reply, fetched_at=time.time(), ttl=self.ttl)
+        self.cache.store(self.key(provider, capability, constraints), entry)
+
+    def invalidate(self, provider: str, capability: str, constraints: dict[str, Any]) -> None:
+        self.cache.delete(self.key(provider, capability, constraints))
@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Mapping, Optional
+
+import httpx
+
+from mrpd.core.asgi import ASGIRouter, is_asgi_url
+from mrpd.core.cache import HttpCache
+from mrpd.core.compact import CompactEntry, CompactPage
+from mrpd.core.config import Config, default_config_path, load_config
+from mrpd.core.dispatch import MRP_HEADERS, post_envelope
+from mrpd.core.envelopes import mk_envelope
+from mrpd.core.health import HealthView
+from mrpd.core.intent import IntentView
+from mrpd.core.mirror import RegistryMirror, default_mirror_path
+from mrpd.core.registry import (
+    FederatedRegistryClient,
+    RegistryClient,
+    fetch_manifest,
+    fetch_manifests,
+    normalize_manifest_endpoints,
+    registry_client_for,
+)
+from mrpd.core.scoring import TopK
+
+
+def http2_available() -> bool:
+    """Whether httpx can speak HTTP/2 here (needs the `h2` package: `mrpd[http2]`)."""
+
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# Indexed leads kept per scan; the rest are only counted.
+MAX_LEADS = 20
+
+
+@dataclass
+class RegistryScan:
+    """The outcome of `MRPClient.scan`: the ranking, the leads, and why it ended early (if it did)."""
+
+    top: TopK
+    # Entries without a manifest_url (indexed, not MRP providers yet).
+    leads: list[CompactEntry] = field(default_factory=list)
+    lead_count: int = 0
+    # Set when a page after the first failed; `top` holds what came before it.
+    error: Optional[str] = None
+
+    def add(self, entries: list[CompactEntry]) -> None:
+        # Only entries with a manifest_url are routable.
+        self.top.extend([e for e in entries if e.manifest_url])
+        for e in entries:
+            if not e.manifest_url:
+                self.lead_count += 1
+                if len(self.leads) < MAX_LEADS:
+                    self.leads.append(e)
+
+
+class MRPClient:
+    """Async MRP client for embedding mrpd in an agent runtime.
+
+    Owns one long-lived pooled HTTP client (HTTP/2 when `h2` is installed),
+    the on-disk registry/manifest cache and the local registry mirror, so
+    repeated calls reuse warm connections. Use as an async context manager
+    or call `aclose()`. The CLI commands are thin wrappers over this.
+
+    `asgi://<name>/...` URLs are served in-process by the ASGI app mounted
+    as `<name>` (`apps=` or `mount_app()`); `asgi://mrpd` is the built-in
+    provider. This needs the client's own pool, not a passed-in `http`.
+
+        async with MRPClient() as client:
+            top = await client.rank("summarize a page", capability="summarize_url")
+            best = top.satisfying()[0].materialize().entry
+            manifest = await client.manifest(best.manifest_url)
+            offer = await client.discover(manifest["endpoints"]["discover"], {...}, receiver_id=best.id)
+    """
+
+    def __init__(
+        self,
+        config: Config | None = None,
+        *,
+        registry: str | None = None,
+        use_cache: bool = True,
+        cache: HttpCache | None = None,
+        mirror: RegistryMirror | None = None,
+        offline: bool = False,
+        http: httpx.AsyncClient | None = None,
+        http2: bool | None = None,
+        max_connections: int = 100,
+        timeout: float = 10.0,
+        apps: Mapping[str, Any] | None = None,
+    ) -> None:
+        self.config = config or load_config(default_config_path())
+        self.registry = registry
+        self.cache = cache if cache is not None else (HttpCache.from_config(self.config) if use_cache else None)
+        self._owns_mirror = mirror is None and default_mirror_path().exists()
+        if self._owns_mirror:
+            mirror = RegistryMirror()
+        if offline and mirror is None:
+            raise ValueError("offline MRPClient needs a local registry mirror (mrpd registry sync)")
+        self.mirror = mirror
+        self.offline = offline
+        self.health = HealthView.load(self.config.health)
+        self.http2 = http2_available() if http2 is None else http2
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.asgi = ASGIRouter(apps)
+        self._http = http
+        self._owns_http = http is None
+        self._registries: dict[Optional[str], RegistryClient | FederatedRegistryClient] = {}
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """The shared pooled client, opened on first use."""
+
+        if self._http is None:
+            limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+            self._http = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=False,
+                limits=limits,
+                http2=self.http2,
+                mounts={"asgi://": self.asgi},
+            )
+        return self._http
+
+    def refresh_health(self) -> None:
+        """Reload provider health, for clients that outlive many runs (e.g. `mrpd daemon`)."""
+
+        self.health = HealthView.load(self.config.health)
+
+    def mount_app(self, name: str, app: Any) -> None:
+        """Serve `asgi://<name>/...` from `app` in this process."""
+
+        self.asgi.mount(name, app)
+
+    async def aclose(self) -> None:
+        """Finish background cache refreshes, close the pooled client and the mirror it opened."""
+
+        try:
+            if self.cache is not None:
+                await self.cache.drain()
+        finally:
+            if self._owns_mirror and self.mirror is not None:
+                self.mirror.close()
+                self._owns_mirror = False
+            if self._http is not None and self._owns_http:
+                await self._http.aclose()
+                self._http = None
+
+    async def __aenter__(self) -> "MRPClient":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
+
+    # Registry
+
+    def registry_client(self, registry: str | None = None) -> RegistryClient | FederatedRegistryClient:
+        """Registry client for `registry` (default: the client's), sharing the pool and caches."""
+
+        registry = registry or self.registry
+        client = self._registries.get(registry)
+        if client is None:
+            client = registry_client_for(
+                self.config, registry, cache=self.cache, http=self.http, mirror=self.mirror, offline=self.offline
+            )
+            self._registries[registry] = client
+        return client
+
+    async def iter_pages(
+        self,
+        capability: str | None = None,
+        policy: str | None = None,
+        *,
+        registry: str | None = None,
+        page_size: int = 50,
+        max_entries: int = 500,
+    ) -> AsyncIterator[CompactPage]:
+        """Registry result pages (compact entries), following `next_page`."""
+
+        stream = self.registry_client(registry).iter_compact_pages(
+            capability=capability, policy=policy, page_size=page_size, max_entries=max_entries
+        )
+        async with aclosing(stream) as pages:
+            async for page in pages:
+                yield page
+
+    async def query(
+        self,
+        capability: str | None = None,
+        policy: str | None = None,
+        *,
+        registry: str | None = None,
+        max_entries: int = 500,
+    ) -> list[CompactEntry]:
+        """Up to `max_entries` registry entries matching the filters."""
+
+        out: list[CompactEntry] = []
+        async with aclosing(self.iter_pages(capability, policy, registry=registry, max_entries=max_entries)) as pages:
+            async for page in pages:
+                out.extend(page.results[: max_entries - len(out)])
+                if len(out) >= max_entries:
+                    break
+        return out
+
+    def intent_view(self, intent: str) -> Optional[IntentView]:
+        return IntentView.load(self.mirror, intent, self.config.intent)
+
+    async def rank(
+        self,
+        intent: str,
+        capability: str | None = None,
+        policy: str | None = None,
+        *,
+        limit: int = 10,
+        registry: str | None = None,
+        max_scan: int = 500,
+    ) -> TopK:
+        """Scan the registry and keep the best `limit` routable providers.
+
+        Ranking folds in provider health and (with a mirror) intent relevance;
+        the scan stops early once no unseen entry can place.
+        """
+
+        scan = await self.scan(intent, capability, policy, limit=limit, registry=registry, max_scan=max_scan)
+        return scan.top
+
+    async def scan(
+        self,
+        intent: str,
+        capability: str | None = None,
+        policy: str | None = None,
+        *,
+        limit: int = 10,
+        registry: str | None = None,
+        max_scan: int = 500,
+        unfiltered: bool = False,
+    ) -> RegistryScan:
+        """`rank`, also collecting leads and tolerating a partial scan.
+
+        With `unfiltered`, the whole registry is scanned but still ranked
+        against `capability`/`policy` (for a near-miss list). Offline, an
+        intent-only scan reads the mirror's intent matches instead. If a
+        page after the first fails, the walk stops there and the ranking so
+        far is kept, with the failure in `error`; a failure before anything
+        was seen still raises.
+        """
+
+        intent_view = self.intent_view(intent)
+        top = TopK(limit, capability=capability, policy=policy, health=self.health, intent=intent_view)
+        scan = RegistryScan(top)
+        cap, pol = (None, None) if unfiltered else (capability, policy)
+        if self.offline and intent_view is not None and not cap and not pol:
+            assert self.mirror is not None
+            scan.add(self.mirror.compact_by_ids(list(intent_view.relevance)[:max_scan]))
+            return scan
+        scanned = 0
+        try:
+            async with aclosing(self.iter_pages(cap, pol, registry=registry, max_entries=max_scan)) as pages:
+                async for page in pages:
+                    batch = page.results[: max_scan - scanned]
+                    scanned += len(batch)
+                    scan.add(batch)
+                    if top.settled() or scanned >= max_scan:
+                        break
+        except Exception as ex:
+            if not scanned:
+                raise
+            scan.error = str(ex) or type(ex).__name__
+        return scan
+
+    # Providers
+
+    async def manifest(self, manifest_url: str) -> dict:
+        """A provider manifest with endpoints resolved against its URL."""
+
+        # In-process apps answer immediately; don't pin their manifest on disk.
+        cache = None if is_asgi_url(manifest_url) else self.cache
+        manifest = await fetch_manifest(
+            manifest_url, cache=cache, cache_ttl=self.config.cache.manifest_ttl, http=self.http
+        )
+        return normalize_manifest_endpoints(manifest, manifest_url)
+
+    def manifests(self, manifest_urls: list[str], *, concurrency: int = 8) -> list[asyncio.Task[dict]]:
+        """Start fetching several (raw) manifests; one task per URL, in order."""
+
+        return fetch_manifests(
+            manifest_urls,
+            http=self.http,
+            concurrency=concurrency,
+            cache=self.cache,
+            cache_ttl=self.config.cache.manifest_ttl,
+        )
+
+    async def send(self, endpoint: str, envelope: dict, *, timeout: float = 20.0) -> dict:
+        """POST an envelope and return the reply envelope."""
+
+        return await post_envelope(self.http, endpoint, envelope, timeout=timeout)
+
+    async def discover(
+        self, endpoint: str, payload: dict, *, receiver_id: str | None = None, timeout: float = 20.0
+    ) -> dict:
+        return await self.send(endpoint, mk_envelope("DISCOVER", payload, receiver_id=receiver_id), timeout=timeout)
+
+    async def negotiate(
+        self, endpoint: str, payload: dict, *, receiver_id: str | None = None, timeout: float = 20.0
+    ) -> dict:
+        return await self.send(endpoint, mk_envelope("NEGOTIATE", payload, receiver_id=receiver_id), timeout=timeout)
+
+    async def execute(
+        self, endpoint: str, payload: dict, *, receiver_id: str | None = None, timeout: float = 60.0
+    ) -> dict:
+        return await self.send(endpoint, mk_envelope("EXECUTE", payload, receiver_id=receiver_id), timeout=timeout)
+
+    async def stream(
+        self, endpoint: str, payload: dict, *, receiver_id: str | None = None, timeout: float = 60.0
+    ) -> AsyncIterator[dict]:
+        """EXECUTE and yield reply envelopes as they arrive.
+
+        Providers that answer with `application/x-ndjson` can send progress
+        envelopes before the final EVIDENCE/ERROR; anything else is a single
+        JSON reply, yielded once.
+        """
+
+        env = mk_envelope("EXECUTE", payload, receiver_id=receiver_id)
+        headers = {**MRP_HEADERS, "Accept": "application/x-ndjson, application/mrp+json"}
+        async with self.http.stream("POST", endpoint, json=env, headers=headers, timeout=timeout) as r:
+            r.raise_for_status()
+            if "ndjson" not in r.headers.get("content-type", ""):
+                yield json.loads(await r.aread())
+                return
+            async for line in r.aiter_lines():
+                if line.strip():
+                    yield json.loads(line)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> Any:
+        """Escape hatch: a raw request over the pooled client (returns a coroutine)."""
+
+        return self.http.request(method, url, **kwargs)
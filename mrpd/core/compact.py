@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Optional, Union
+
+from mrpd.core.models import RegistryEntry, RegistryQueryResponse
+
+
+# Where a compact entry's full record comes from: the raw dict, an already
+# validated model, or a loader (e.g. a mirror row or a span in a raw file).
+EntrySource = Union[dict, RegistryEntry, Callable[[], RegistryEntry]]
+
+
+# Bounded, so a long-lived process (e.g. `mrpd daemon`) does not keep every list it ever saw.
+@lru_cache(maxsize=4096)
+def _shared(t: tuple[str, ...]) -> tuple[str, ...]:
+    return t
+
+
+def intern_strings(values: Any) -> tuple[str, ...]:
+    """Interned, shared tuple for a capability/policy list."""
+
+    if not values:
+        return ()
+    return _shared(tuple(sys.intern(v) for v in values if isinstance(v, str)))
+
+
+def trust_score(trust: Any) -> Optional[float]:
+    """`trust.score` of a raw entry; a number outside 0..1 raises ValueError, as `TrustInfo` would."""
+
+    score = trust.get("score") if isinstance(trust, dict) else None
+    if not isinstance(score, (int, float)) or isinstance(score, bool):
+        return None
+    if not 0.0 <= score <= 1.0:
+        raise ValueError(f"trust.score {score!r} is outside 0..1")
+    return float(score)
+
+
+class CompactEntry:
+    """Lightweight registry entry for bulk scoring.
+
+    Holds only what `score_entry` and ranking read; capability and policy
+    tuples are interned and shared between entries. The full
+    `RegistryEntry` is validated on first `materialize()`.
+    """
+
+    __slots__ = ("id", "name", "manifest_url", "capabilities", "policies", "trust_score", "proofs_count", "_source")
+
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        manifest_url: Optional[str],
+        capabilities: tuple[str, ...],
+        policies: tuple[str, ...],
+        trust_score: Optional[float],
+        proofs_count: int,
+        source: EntrySource,
+    ) -> None:
+        self.id = id
+        self.name = name
+        self.manifest_url = manifest_url
+        self.capabilities = capabilities
+        self.policies = policies
+        self.trust_score = trust_score
+        self.proofs_count = proofs_count
+        self._source = source
+
+    @classmethod
+    def from_data(cls, data: dict) -> "CompactEntry":
+        entry_id = data.get("id")
+        name = data.get("name")
+        if not isinstance(entry_id, str) or not isinstance(name, str):
+            raise ValueError("registry entry needs a string id and name")
+        score = trust_score(data.get("trust"))
+        proofs = data.get("proofs")
+        manifest_url = data.get("manifest_url")
+        return cls(
+            entry_id,
+            name,
+            manifest_url if isinstance(manifest_url, str) else None,
+            intern_strings(data.get("capabilities")),
+            intern_strings(data.get("policies")),
+            score,
+            len(proofs) if isinstance(proofs, list) else 0,
+            data,
+        )
+
+    @classmethod
+    def from_entry(cls, entry: RegistryEntry) -> "CompactEntry":
+        return cls(
+            entry.id,
+            entry.name,
+            entry.manifest_url,
+            intern_strings(entry.capabilities),
+            intern_strings(entry.policies),
+            entry.trust.score if entry.trust else None,
+            len(entry.proofs),
+            entry,
+        )
+
+    def materialize(self) -> RegistryEntry:
+        src = self._source
+        if isinstance(src, RegistryEntry):
+            return src
+        entry = RegistryEntry.model_validate(src) if isinstance(src, dict) else src()
+        self._source = entry
+        return entry
+
+    def __repr__(self) -> str:
+        return f"CompactEntry(id={self.id!r}, name={self.name!r})"
+
+
+@dataclass
+class CompactPage:
+    results: list[CompactEntry] = field(default_factory=list)
+    next_page: Optional[str] = None
+
+    @classmethod
+    def from_data(cls, data: Any) -> "CompactPage":
+        if not isinstance(data, dict) or not isinstance(data.get("results", []), list):
+            raise ValueError("registry query response is not an object with a results list")
+        next_page = data.get("next_page")
+        results: list[CompactEntry] = []
+        for d in data.get("results", []):
+            if not isinstance(d, dict):
+                continue
+            try:
+                results.append(CompactEntry.from_data(d))
+            except ValueError:
+                # Would fail validation anyway; keep it from taking a ranking slot.
+                continue
+        return cls(results=results, next_page=next_page if isinstance(next_page, str) else None)
+
+    @classmethod
+    def from_response(cls, res: RegistryQueryResponse) -> "CompactPage":
+        return cls(results=[CompactEntry.from_entry(e) for e in res.results], next_page=res.next_page)
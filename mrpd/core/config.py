@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 import yaml
 from pydantic import BaseModel, Field
@@ -10,14 +11,117 @@ from pydantic import BaseModel, Field
 class RegistrySource(BaseModel):
     name: str
     base_url: str
+    # Per-registry request timeout in seconds (default: client timeout).
+    timeout: float | None = None
+
+
+class CacheSettings(BaseModel):
+    # Seconds a registry query / manifest is served without revalidation.
+    registry_ttl: float = 60.0
+    manifest_ttl: float = 300.0
+    # Extra seconds a stale body is served while it is refreshed in the background.
+    stale_while_revalidate: float = 600.0
+    # How old a stale body may be and still be served when the origin is unreachable.
+    stale_if_error: float = 7 * 86400.0
+    # Seconds a provider's OFFER is reused for the same capability/constraints (0: always DISCOVER).
+    offer_ttl: float = 60.0
+
+
+class FederationSettings(BaseModel):
+    # Send a duplicate request to a registry that has not answered after this many seconds.
+    hedge_delay: float | None = 1.0
+    # Once one registry has answered, wait at most this long for the rest (None: wait for all).
+    straggler_grace: float | None = 2.0
+
+
+class HealthSettings(BaseModel):
+    # Fold latency/error rates observed by `mrpd run` into ranking.
+    enabled: bool = True
+    # EWMA weight of the newest observation.
+    alpha: float = 0.2
+    # Most score points a slow provider loses, and points lost at a 100% error rate.
+    latency_weight: float = 5.0
+    error_weight: float = 10.0
+    # Observed latency (ms) at which half of `latency_weight` applies.
+    latency_ref_ms: float = 1000.0
+    # Seconds after which an observation counts half as much (0: never decays).
+    half_life: float = 3 * 86400.0
+    # Consecutive failures that open a provider's circuit (it is then skipped).
+    failure_threshold: int = 3
+    # Seconds an open circuit waits before allowing a trial call; doubles per failed trial.
+    open_seconds: float = 30.0
+    max_open_seconds: float = 900.0
+    # Seconds the caller that takes a half-open circuit's trial holds it; others skip the provider meanwhile.
+    trial_seconds: float = 60.0
+    # `mrpd health probe --watch`: seconds between probes per provider, +/- this jitter fraction.
+    probe_interval: float = 30.0
+    probe_jitter: float = 0.2
+
+
+class IntentSettings(BaseModel):
+    # Rank by BM25 relevance of the free-text intent (needs `mrpd registry sync`).
+    enabled: bool = True
+    # Score points for the best-matching entry; others get a share by relevance.
+    weight: float = 15.0
+    # BM25 term-frequency saturation and length normalization.
+    k1: float = 1.2
+    b: float = 0.75
+    # Most intent matches considered per query.
+    candidates: int = 200
+
+
+class DispatchSettings(BaseModel):
+    # `mrpd run`: ask this many top-ranked providers for an offer (1: no hedging).
+    hedge: int = 1
+    # Seconds before asking the next provider (None: ask all `hedge` at once).
+    hedge_delay: float | None = None
+    discover_timeout: float = 20.0
+    execute_timeout: float = 60.0
+    # Retries of a retryable EXECUTE failure on the same provider before failing over.
+    execute_retries: int = 1
+    # Retry wait (doubling) when the provider sends no retry_after_ms; longer asks fail over.
+    retry_backoff: float = 0.25
+    max_retry_after: float = 30.0
+    # Next-ranked providers, beyond the hedged ones, that EXECUTE may fail over to.
+    failover: int = 2
+    # Seconds the whole run may take before no new request is started (None: no limit).
+    deadline: float | None = 120.0
+
+
+class OfferSettings(BaseModel):
+    # Objective for choosing among offers.
+    prefer: Literal["balanced", "cheapest", "fastest", "confident"] = "balanced"
+    # Weights of offer confidence, cost.estimate and latency.p50 in the objective.
+    confidence_weight: float = 1.0
+    cost_weight: float = 1.0
+    latency_weight: float = 1.0
+    # Cost (in the offer's unit) and latency (ms) that use up half of their weight.
+    cost_ref: float = 0.01
+    latency_ref_ms: float = 1000.0
+    # Hard limits: offers below/above these are never selected.
+    min_confidence: float = 0.0
+    max_latency_ms: float | None = None
 
 
 class Config(BaseModel):
     registries: list[RegistrySource] = Field(default_factory=list)
     cache_dir: str | None = None
+    cache: CacheSettings = Field(default_factory=CacheSettings)
+    federation: FederationSettings = Field(default_factory=FederationSettings)
+    health: HealthSettings = Field(default_factory=HealthSettings)
+    intent: IntentSettings = Field(default_factory=IntentSettings)
+    dispatch: DispatchSettings = Field(default_factory=DispatchSettings)
+    offers: OfferSettings = Field(default_factory=OfferSettings)
     # TODO: adapters, local tools, auth keys
 
 
+def default_config_path() -> Path:
+    path = os.getenv("MRPD_CONFIG")
+    if path:
+        return Path(path)
+    return Path.home() / ".mrpd" / "config.yaml"
+
+
 def load_config(path: str | Path) -> Config:
     p = Path(path)
     data: Any = {}
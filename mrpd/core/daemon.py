@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+# Kept free of heavy imports: the CLI loads this before deciding whether
+# to run a command itself.
+
+PROTOCOL = 1
+# Commands `mrpd daemon` runs on behalf of the CLI.
+FORWARDED = ("route", "run")
+# Variables holding a path or file:// URL, which resolve against the working directory.
+PATH_VARS = (
+    "MRPD_CONFIG",
+    "MRPD_CACHE_DIR",
+    "MRPD_MIRROR_PATH",
+    "MRPD_HEALTH_PATH",
+    "MRPD_EVIDENCE_DIR",
+    "MRPD_ARTIFACT_DIR",
+    "MRPD_DAEMON_SOCKET",
+    "MRP_BOOTSTRAP_REGISTRY_RAW",
+)
+
+
+def default_socket_path() -> Path:
+    path = os.getenv("MRPD_DAEMON_SOCKET")
+    if path:
+        return Path(path)
+    return Path.home() / ".mrpd" / "daemon.sock"
+
+
+def connect(path: Path | None = None, timeout: float = 1.0) -> Optional[socket.socket]:
+    """A connected socket to a running daemon, or None."""
+
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    path = path or default_socket_path()
+    if not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def absolute(value: str) -> str:
+    """A relative path, or relative file:// URL, made absolute against the current directory."""
+
+    if value.startswith("file://"):
+        path = value[len("file://") :]
+        # Windows file URLs may carry a drive (C:/...); those are absolute already.
+        if not path or os.path.isabs(path) or path[1:2] == ":":
+            return value
+        return "file://" + os.path.abspath(path)
+    if value and "://" not in value and not os.path.isabs(os.path.expanduser(value)):
+        return os.path.abspath(value)
+    return value
+
+
+def mrpd_env() -> dict[str, str]:
+    """The environment that changes what a command does (config, cache and store paths, bootstrap).
+
+    Paths are made absolute, so a CLI in another directory only matches a
+    daemon whose relative paths point at the same files.
+    """
+
+    return {
+        k: absolute(v) if k in PATH_VARS else v
+        for k, v in os.environ.items()
+        if k.startswith(("MRPD_", "MRP_")) and k != "MRPD_NO_DAEMON"
+    }
+
+
+def request(sock: socket.socket, command: str, args: dict[str, Any]):
+    """Send one request and yield the daemon's reply messages."""
+
+    line = json.dumps({"v": PROTOCOL, "command": command, "args": args, "env": mrpd_env()}) + "\n"
+    sock.sendall(line.encode("utf-8"))
+    with sock.makefile("r", encoding="utf-8") as fh:
+        for raw in fh:
+            if raw.strip():
+                yield json.loads(raw)
+
+
+def forward(command: str, args: dict[str, Any]) -> Optional[int]:
+    """Run a CLI command in the daemon, relaying its output.
+
+    Returns the exit code, or None when the command should run in-process:
+    no daemon (or `MRPD_NO_DAEMON=1`), or a daemon that declines it (other
+    protocol version or `MRPD_*` environment) or dies before answering.
+    """
+
+    if command not in FORWARDED or os.getenv("MRPD_NO_DAEMON") in ("1", "true", "yes"):
+        return None
+    if str(args.get("manifest_url") or "").startswith("file://"):
+        # The daemon has its own working directory.
+        args = {**args, "manifest_url": absolute(args["manifest_url"])}
+    sock = connect()
+    if sock is None:
+        return None
+    relayed = False
+    with sock:
+        try:
+            for msg in request(sock, command, args):
+                if msg.get("fallback") and not relayed:
+                    return None
+                relayed = True
+                if "exit" in msg:
+                    return int(msg["exit"])
+                try:
+                    if "out" in msg:
+                        sys.stdout.write(msg["out"] + "\n")
+                        sys.stdout.flush()
+                    elif "err" in msg:
+                        sys.stderr.write(msg["err"] + "\n")
+                except BrokenPipeError:
+                    # Reader went away (e.g. `| head`); stop like an in-process run would.
+                    return 1
+        except (OSError, ValueError):
+            pass
+    if not relayed:
+        return None
+    # The daemon went away mid-command; its output so far is already printed.
+    sys.stderr.write("mrpd daemon closed the connection\n")
+    return 1
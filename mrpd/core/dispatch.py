@@ -0,0 +1,415 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+import httpx
+
+
+MRP_HEADERS = {"Content-Type": "application/mrp+json"}
+
+# HTTP statuses worth retrying when the body is not an MRP ERROR envelope.
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+@dataclass
+class Candidate:
+    """A ranked provider with its (absolute-endpoint) manifest."""
+
+    entry_id: Optional[str]
+    receiver_id: str
+    manifest_url: str
+    manifest: dict
+    score: Optional[float] = None
+
+    @property
+    def discover_url(self) -> Optional[str]:
+        return (self.manifest.get("endpoints") or {}).get("discover")
+
+    @property
+    def execute_url(self) -> Optional[str]:
+        return (self.manifest.get("endpoints") or {}).get("execute")
+
+
+@dataclass
+class DiscoverAttempt:
+    entry_id: Optional[str]
+    endpoint: str
+    # Milliseconds from the start of the fan-out.
+    started_ms: float
+    elapsed_ms: Optional[float] = None
+    # winner | offer (accepted, but lost on rank) | cached | no_offer | error | cancelled
+    outcome: str = "pending"
+    error: Optional[str] = None
+
+
+@dataclass
+class DiscoverResult:
+    winner: Optional[Candidate]
+    request: Optional[dict]
+    reply: Optional[dict]
+    attempts: list[DiscoverAttempt] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+    # Acceptable offers that lost to a better-ranked one, as (candidate, reply).
+    spare_offers: list[tuple[Candidate, dict]] = field(default_factory=list)
+
+    @property
+    def winning_attempt(self) -> Optional[DiscoverAttempt]:
+        return next((a for a in self.attempts if a.outcome == "winner"), None)
+
+
+def first_offer(reply: dict) -> Optional[dict]:
+    """The first usable offer (one with a route_id) in an OFFER reply."""
+
+    if reply.get("msg_type") not in (None, "OFFER"):
+        return None
+    for offer in (reply.get("payload") or {}).get("offers") or []:
+        if isinstance(offer, dict) and offer.get("route_id"):
+            return offer
+    return None
+
+
+async def post_envelope(http: httpx.AsyncClient, url: str, envelope: dict, *, timeout: float) -> dict:
+    r = await http.post(url, json=envelope, headers=MRP_HEADERS, timeout=timeout)
+    r.raise_for_status()
+    return r.json()
+
+
+async def hedged_discover(
+    http: httpx.AsyncClient,
+    candidates: list[Candidate],
+    make_envelope: Callable[[Candidate], dict],
+    *,
+    hedge_delay: Optional[float] = None,
+    timeout: float = 20.0,
+    accept: Callable[[dict], Any] = first_offer,
+    admit: Callable[[Candidate], bool] | None = None,
+    reserve: list[Candidate] | None = None,
+) -> DiscoverResult:
+    """Send DISCOVER to several ranked providers; the first acceptable OFFER wins.
+
+    Without `hedge_delay` every candidate is asked at once. With it, the
+    next-ranked candidate is added each time `hedge_delay` seconds pass
+    without an acceptable offer, or as soon as an outstanding request fails.
+    Requests still in flight when a winner is found are cancelled. Offers
+    arriving together are resolved by rank. `accept` decides whether a reply
+    holds an acceptable offer; `admit`, asked right before a candidate's
+    request, may skip it (a half-open circuit whose trial is taken, say),
+    and the next of `reserve` takes its place.
+    """
+
+    t0 = time.perf_counter()
+    ms = lambda: round((time.perf_counter() - t0) * 1000.0, 3)  # noqa: E731
+    attempts: list[DiscoverAttempt] = []
+    inflight: dict[asyncio.Task[dict], tuple[int, dict, DiscoverAttempt]] = {}
+    queue = [c for c in candidates if c.discover_url]
+    spares = [c for c in reserve or () if c.discover_url]
+    launched = 0
+
+    def launch() -> None:
+        nonlocal launched
+        while launched < len(queue):
+            rank, c = launched, queue[launched]
+            if admit is not None and not admit(c):
+                if spares:
+                    queue[rank] = spares.pop(0)
+                else:
+                    del queue[rank]
+                continue
+            launched += 1
+            env = make_envelope(c)
+            attempt = DiscoverAttempt(entry_id=c.entry_id, endpoint=c.discover_url or "", started_ms=ms())
+            attempts.append(attempt)
+            task = asyncio.create_task(post_envelope(http, attempt.endpoint, env, timeout=timeout))
+            inflight[task] = (rank, env, attempt)
+            return
+
+    if not queue:
+        return DiscoverResult(None, None, None, attempts, ms())
+
+    launch()
+    while not hedge_delay and launched < len(queue):
+        launch()
+
+    best: Optional[tuple[int, dict, dict, DiscoverAttempt]] = None
+    offers: list[tuple[int, dict]] = []
+    try:
+        while inflight:
+            wait = hedge_delay if hedge_delay and launched < len(queue) else None
+            done, _ = await asyncio.wait(set(inflight), timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                launch()
+                continue
+            failed = 0
+            for task in sorted(done, key=lambda t: inflight[t][0]):
+                rank, env, attempt = inflight.pop(task)
+                attempt.elapsed_ms = round(ms() - attempt.started_ms, 3)
+                if task.exception() is not None:
+                    ex = task.exception()
+                    attempt.outcome, attempt.error = "error", str(ex) or type(ex).__name__
+                    failed += 1
+                    continue
+                reply = task.result()
+                if accept(reply):
+                    attempt.outcome = "offer"
+                    offers.append((rank, reply))
+                    if best is None or rank < best[0]:
+                        best = (rank, env, reply, attempt)
+                else:
+                    attempt.outcome = "error" if reply.get("msg_type") == "ERROR" else "no_offer"
+                    attempt.error = ((reply.get("payload") or {}).get("message")) if attempt.outcome == "error" else None
+                    failed += 1
+            if best is not None:
+                break
+            for _ in range(failed):
+                if launched < len(queue):
+                    launch()
+    finally:
+        for task, (_rank, _env, attempt) in inflight.items():
+            task.cancel()
+            attempt.outcome = "cancelled"
+            attempt.elapsed_ms = round(ms() - attempt.started_ms, 3)
+
+    if best is None:
+        return DiscoverResult(None, None, None, attempts, ms())
+    rank, env, reply, attempt = best
+    attempt.outcome = "winner"
+    spare = [(queue[r], rep) for r, rep in sorted(offers, key=lambda o: o[0]) if r != rank]
+    return DiscoverResult(queue[rank], env, reply, attempts, ms(), spare)
+
+
+@dataclass
+class Failure:
+    code: str
+    message: str
+    retryable: bool
+    retry_after_ms: Optional[int] = None
+
+
+def _retry_after_header(response: httpx.Response) -> Optional[int]:
+    raw = response.headers.get("Retry-After")
+    try:
+        return int(float(raw) * 1000) if raw else None
+    except ValueError:
+        return None
+
+
+def _error_payload(payload: dict) -> Failure:
+    retry_after = payload.get("retry_after_ms")
+    return Failure(
+        code=str(payload.get("code") or "MRP_ERROR"),
+        message=str(payload.get("message") or ""),
+        retryable=bool(payload.get("retryable")),
+        retry_after_ms=int(retry_after) if isinstance(retry_after, (int, float)) else None,
+    )
+
+
+def classify_failure(*, exc: BaseException | None = None, reply: dict | None = None) -> Failure:
+    """Describe a failed EXECUTE (an exception or a non-EVIDENCE reply) for retry decisions.
+
+    MRP ERROR payloads (see `mrpd.core.errors.mrp_error`) say whether they are
+    retryable; otherwise timeouts, connection errors and 408/425/429/5xx are.
+    """
+
+    if reply is not None:
+        if reply.get("msg_type") == "ERROR":
+            return _error_payload(reply.get("payload") or {})
+        return Failure("MRP_UNEXPECTED_REPLY", f"unexpected reply: {reply.get('msg_type')}", False)
+    if isinstance(exc, httpx.TimeoutException):
+        return Failure("TIMEOUT", str(exc) or type(exc).__name__, True)
+    if isinstance(exc, httpx.HTTPStatusError):
+        response = exc.response
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        if isinstance(body, dict) and body.get("msg_type") == "ERROR":
+            failure = _error_payload(body.get("payload") or {})
+        else:
+            failure = Failure(f"HTTP_{response.status_code}", str(exc), response.status_code in RETRYABLE_STATUS)
+        if failure.retry_after_ms is None:
+            failure.retry_after_ms = _retry_after_header(response)
+        return failure
+    if isinstance(exc, httpx.TransportError):
+        return Failure("TRANSPORT_ERROR", str(exc) or type(exc).__name__, True)
+    return Failure("CLIENT_ERROR", str(exc) or type(exc).__name__, False)
+
+
+_UNKNOWN_ROUTE = re.compile(r"unknown route|route(_id)? (not found|expired|unknown)", re.IGNORECASE)
+UNKNOWN_ROUTE_CODES = frozenset({"MRP_UNKNOWN_ROUTE", "MRP_ROUTE_NOT_FOUND", "MRP_ROUTE_EXPIRED"})
+
+
+def is_unknown_route(failure: Failure) -> bool:
+    """Whether a provider rejected EXECUTE because it does not know the route_id."""
+
+    return failure.code in UNKNOWN_ROUTE_CODES or bool(_UNKNOWN_ROUTE.search(failure.message))
+
+
+@dataclass
+class ExecuteAttempt:
+    entry_id: Optional[str]
+    endpoint: str
+    # discover (a failover provider's offer) | execute
+    phase: str
+    # 1-based try number on this provider.
+    attempt: int
+    # Milliseconds from the start of the failover sequence.
+    started_ms: float
+    elapsed_ms: Optional[float] = None
+    # evidence | error | no_offer
+    outcome: str = "pending"
+    code: Optional[str] = None
+    error: Optional[str] = None
+    retryable: Optional[bool] = None
+    retry_after_ms: Optional[int] = None
+
+
+@dataclass
+class FailoverPolicy:
+    # Extra tries on the same provider after a retryable error.
+    retries: int = 1
+    # Wait before a retry when the provider gives no retry_after_ms; doubles per retry.
+    backoff: float = 0.25
+    # A provider asking to wait longer than this is failed over instead.
+    max_retry_after: float = 30.0
+    # time.perf_counter() value after which no new request is started.
+    deadline: Optional[float] = None
+
+    def remaining(self) -> float:
+        return float("inf") if self.deadline is None else self.deadline - time.perf_counter()
+
+
+@dataclass
+class ExecuteResult:
+    candidate: Optional[Candidate]
+    request: Optional[dict]
+    reply: Optional[dict]
+    attempts: list[ExecuteAttempt] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.reply) and self.reply.get("msg_type") == "EVIDENCE"
+
+
+async def execute_with_failover(
+    http: httpx.AsyncClient,
+    providers: list[tuple[Candidate, Optional[dict]]],
+    make_discover: Callable[[Candidate], dict],
+    make_execute: Callable[[Candidate, str], dict],
+    *,
+    policy: FailoverPolicy,
+    discover_timeout: float = 20.0,
+    execute_timeout: float = 60.0,
+    on_attempt: Callable[[Candidate, ExecuteAttempt], None] | None = None,
+    choose: Callable[[dict], Optional[dict]] = first_offer,
+    on_offer: Callable[[Candidate, dict], None] | None = None,
+    rediscover: Callable[[Candidate, Failure], bool] | None = None,
+    admit: Callable[[Candidate], bool] | None = None,
+) -> ExecuteResult:
+    """EXECUTE against ranked providers until one returns EVIDENCE.
+
+    `providers` pairs each candidate with the OFFER it already made, or None
+    if it still has to be asked. A retryable failure is retried on the same
+    provider (after `retry_after_ms`, else exponential backoff), then the
+    next provider takes over. A non-retryable failure, or running out of
+    deadline, ends the sequence with the last reply. `choose` picks the
+    offer to execute from an OFFER reply (None: nothing acceptable).
+    `on_offer` sees each acceptable OFFER this sends DISCOVER for; when
+    `rediscover` returns True for a failure (a stale cached route, say),
+    the provider is asked for a fresh offer once before moving on.
+    `admit` is asked before each provider is tried; False skips it.
+    """
+
+    t0 = time.perf_counter()
+    ms = lambda: round((time.perf_counter() - t0) * 1000.0, 3)  # noqa: E731
+    result = ExecuteResult(None, None, None)
+
+    def finish(attempt: ExecuteAttempt, c: Candidate) -> None:
+        attempt.elapsed_ms = round(ms() - attempt.started_ms, 3)
+        result.attempts.append(attempt)
+        if on_attempt is not None:
+            on_attempt(c, attempt)
+
+    def fail(attempt: ExecuteAttempt, failure: Failure) -> None:
+        attempt.outcome = "error"
+        attempt.code, attempt.error = failure.code, failure.message
+        attempt.retryable, attempt.retry_after_ms = failure.retryable, failure.retry_after_ms
+
+    queue = list(providers)
+    rediscovered: set[int] = set()
+    while queue:
+        c, offer_reply = queue.pop(0)
+        if policy.remaining() <= 0:
+            break
+        if admit is not None and not admit(c):
+            continue
+        if offer_reply is None:
+            attempt = ExecuteAttempt(c.entry_id, c.discover_url or "", "discover", 1, ms())
+            try:
+                offer_reply = await post_envelope(
+                    http, attempt.endpoint, make_discover(c), timeout=min(discover_timeout, policy.remaining())
+                )
+            except Exception as ex:
+                fail(attempt, classify_failure(exc=ex))
+                finish(attempt, c)
+                continue
+            if not choose(offer_reply):
+                if offer_reply.get("msg_type") in (None, "OFFER"):
+                    attempt.outcome = "no_offer"
+                else:
+                    fail(attempt, classify_failure(reply=offer_reply))
+                finish(attempt, c)
+                continue
+            attempt.outcome = "offer"
+            finish(attempt, c)
+            if on_offer is not None:
+                on_offer(c, offer_reply)
+        offer = choose(offer_reply)
+        if offer is None:
+            continue
+        route_id = offer["route_id"]
+
+        for n in range(1, policy.retries + 2):
+            attempt = ExecuteAttempt(c.entry_id, c.execute_url or "", "execute", n, ms())
+            env = make_execute(c, route_id)
+            result.candidate, result.request, result.reply = c, env, None
+            try:
+                result.reply = await post_envelope(
+                    http, attempt.endpoint, env, timeout=min(execute_timeout, policy.remaining())
+                )
+            except Exception as ex:
+                failure = classify_failure(exc=ex)
+            else:
+                if result.ok:
+                    attempt.outcome = "evidence"
+                    finish(attempt, c)
+                    result.elapsed_ms = ms()
+                    return result
+                failure = classify_failure(reply=result.reply)
+            fail(attempt, failure)
+            finish(attempt, c)
+            if rediscover is not None and id(c) not in rediscovered and rediscover(c, failure):
+                rediscovered.add(id(c))
+                queue.insert(0, (c, None))
+                break
+            if not failure.retryable:
+                result.elapsed_ms = ms()
+                return result
+            if n > policy.retries:
+                break
+            if failure.retry_after_ms is not None:
+                wait = failure.retry_after_ms / 1000.0
+                if wait > policy.max_retry_after:
+                    break
+            else:
+                wait = policy.backoff * 2 ** (n - 1)
+            if wait >= policy.remaining():
+                break
+            await asyncio.sleep(wait)
+
+    result.elapsed_ms = ms()
+    return result
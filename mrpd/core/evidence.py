@@ -1,17 +1,684 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import os
+import sqlite3
+import time
+import zlib
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
+
+from mrpd.core.artifacts import load_bytes, store_bytes
+
+
+FsyncPolicy = Literal["always", "interval", "never"]
+
+DEFAULT_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+
+# Output values larger than this (encoded bytes) move into the artifact store.
+DEFAULT_INLINE_MAX_BYTES = 1024
 
 
 def evidence_dir() -> Path:
+    root = os.getenv("MRPD_EVIDENCE_DIR")
+    if root:
+        return Path(root)
     return Path.home() / ".mrpd" / "evidence"
 
 
+def default_fsync_policy() -> FsyncPolicy:
+    policy = os.getenv("MRPD_EVIDENCE_FSYNC") or "interval"
+    if policy not in ("always", "interval", "never"):
+        raise ValueError(f"invalid MRPD_EVIDENCE_FSYNC: {policy}")
+    return policy  # type: ignore[return-value]
+
+
+def default_inline_max_bytes() -> int:
+    raw = os.getenv("MRPD_EVIDENCE_INLINE_MAX")
+    return int(raw) if raw else DEFAULT_INLINE_MAX_BYTES
+
+
+def _envelope_outputs(bundle: dict[str, Any]) -> list[Any] | None:
+    env = bundle.get("evidence_envelope")
+    payload = env.get("payload") if isinstance(env, dict) else None
+    outputs = payload.get("outputs") if isinstance(payload, dict) else None
+    return outputs if isinstance(outputs, list) else None
+
+
+def _with_outputs(bundle: dict[str, Any], outputs: list[Any]) -> dict[str, Any]:
+    env = bundle["evidence_envelope"]
+    return {**bundle, "evidence_envelope": {**env, "payload": {**env["payload"], "outputs": outputs}}}
+
+
+def dehydrate_bundle(bundle: dict[str, Any], *, inline_max: int | None = None) -> dict[str, Any]:
+    """Move large evidence output values into the content-addressed artifact store.
+
+    Each moved value is replaced by a `value_ref` ({hash, size, encoding}), so
+    repeated identical outputs are stored once no matter how many runs saw them.
+    """
+
+    outputs = _envelope_outputs(bundle)
+    if not outputs:
+        return bundle
+    limit = default_inline_max_bytes() if inline_max is None else inline_max
+
+    changed = False
+    new_outputs: list[Any] = []
+    for out in outputs:
+        if not isinstance(out, dict) or "value" not in out:
+            new_outputs.append(out)
+            continue
+        value = out["value"]
+        if isinstance(value, str):
+            data, encoding, mime = value.encode("utf-8"), "utf-8", "text/plain"
+        else:
+            data = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            encoding, mime = "json", "application/json"
+        if len(data) <= limit:
+            new_outputs.append(out)
+            continue
+        ref = store_bytes(data, mime=mime, suffix=".txt" if encoding == "utf-8" else ".json")
+        slim = {k: v for k, v in out.items() if k != "value"}
+        slim["value_ref"] = {"hash": ref["hash"], "size": ref["size"], "encoding": encoding, "uri": ref["uri"]}
+        new_outputs.append(slim)
+        changed = True
+
+    return _with_outputs(bundle, new_outputs) if changed else bundle
+
+
+def rehydrate_bundle(bundle: dict[str, Any]) -> dict[str, Any]:
+    """Inverse of `dehydrate_bundle`: inline `value_ref` outputs from the artifact store."""
+
+    outputs = _envelope_outputs(bundle)
+    if not outputs or not any(isinstance(o, dict) and "value_ref" in o for o in outputs):
+        return bundle
+
+    new_outputs: list[Any] = []
+    for out in outputs:
+        ref = out.get("value_ref") if isinstance(out, dict) else None
+        if not isinstance(ref, dict):
+            new_outputs.append(out)
+            continue
+        data = load_bytes(ref["hash"], uri=ref.get("uri"))
+        full = {k: v for k, v in out.items() if k != "value_ref"}
+        full["value"] = data.decode("utf-8") if ref.get("encoding") == "utf-8" else json.loads(data)
+        new_outputs.append(full)
+    return _with_outputs(bundle, new_outputs)
+
+
+# Bumped when the index layout changes; `EvidenceStore` migrates older stores on open.
+# 1: bodies as zlib-compressed JSON in `bundles.body`; 2: bodies in the segment log.
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bundles (
+    job_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    intent TEXT,
+    capability TEXT,
+    policy TEXT,
+    receiver TEXT,
+    discover_endpoint TEXT,
+    execute_endpoint TEXT,
+    discover_ms REAL,
+    execute_ms REAL,
+    total_ms REAL,
+    segment TEXT NOT NULL,
+    seg_offset INTEGER NOT NULL,
+    seg_length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bundles_created_at ON bundles(created_at);
+CREATE INDEX IF NOT EXISTS bundles_capability ON bundles(capability, created_at);
+CREATE INDEX IF NOT EXISTS bundles_receiver ON bundles(receiver, created_at);
+CREATE INDEX IF NOT EXISTS bundles_status ON bundles(status, created_at);
+CREATE TABLE IF NOT EXISTS bundle_artifacts (
+    hash TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    PRIMARY KEY (hash, job_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS bundle_artifacts_job ON bundle_artifacts(job_id);
+CREATE TABLE IF NOT EXISTS batch_items (
+    batch_id TEXT NOT NULL,
+    item TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (batch_id, item)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS batch_items_job ON batch_items(job_id);
+"""
+
+_META_COLUMNS = (
+    "job_id",
+    "created_at",
+    "status",
+    "intent",
+    "capability",
+    "policy",
+    "receiver",
+    "discover_endpoint",
+    "execute_endpoint",
+    "discover_ms",
+    "execute_ms",
+    "total_ms",
+)
+
+
+def bundle_meta(bundle: dict[str, Any]) -> dict[str, Any]:
+    """Extract the indexed columns from an evidence bundle."""
+
+    transcript = bundle.get("transcript") or {}
+    discover = transcript.get("discover") or {}
+    execute = transcript.get("execute") or {}
+    receiver = ((execute.get("request") or {}).get("receiver") or {}).get("id")
+    timings = bundle.get("timings") or {}
+
+    status = bundle.get("status")
+    if not status:
+        env = bundle.get("evidence_envelope") or {}
+        status = "ok" if env.get("msg_type") == "EVIDENCE" else "error"
+
+    return {
+        "job_id": bundle.get("job_id"),
+        "created_at": bundle.get("created_at") or "",
+        "status": status,
+        "intent": transcript.get("intent"),
+        "capability": transcript.get("capability"),
+        "policy": transcript.get("policy"),
+        "receiver": receiver,
+        "discover_endpoint": discover.get("endpoint"),
+        "execute_endpoint": execute.get("endpoint"),
+        "discover_ms": timings.get("discover_ms"),
+        "execute_ms": timings.get("execute_ms"),
+        "total_ms": timings.get("total_ms"),
+    }
+
+
+def _artifact_hashes(bundle: dict[str, Any]) -> list[str]:
+    refs = list(bundle.get("artifact_refs") or [])
+    refs.extend(o["value_ref"] for o in _envelope_outputs(bundle) or [] if isinstance(o, dict) and "value_ref" in o)
+    hashes: list[str] = []
+    for ref in refs:
+        h = ref.get("hash") if isinstance(ref, dict) else None
+        if isinstance(h, str) and h not in hashes:
+            hashes.append(h)
+    return hashes
+
+
+def _encode_line(bundle: dict[str, Any]) -> bytes:
+    return json.dumps(bundle, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class SegmentLog:
+    """Append-only NDJSON segment files (`seg-00000001.ndjson`, ...).
+
+    Callers must serialize appends; `EvidenceStore` does so by holding the
+    SQLite write lock, which also covers other processes.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES,
+        fsync: FsyncPolicy = "interval",
+        fsync_interval: float = 1.0,
+    ) -> None:
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self._last_fsync = 0.0
+
+    def _current(self) -> tuple[str, int]:
+        names = sorted(p.name for p in self.directory.glob("seg-*.ndjson"))
+        if not names:
+            return "seg-00000001.ndjson", 0
+        name = names[-1]
+        return name, (self.directory / name).stat().st_size
+
+    @staticmethod
+    def _next(name: str) -> str:
+        n = int(name[len("seg-") : -len(".ndjson")])
+        return f"seg-{n + 1:08d}.ndjson"
+
+    def append(self, lines: list[bytes]) -> list[tuple[str, int, int]]:
+        """Append lines, rotating segments as needed; return (segment, offset, length) per line."""
+
+        locations: list[tuple[str, int, int]] = []
+        name, size = self._current()
+        i = 0
+        while i < len(lines):
+            if size and size + len(lines[i]) > self.max_bytes:
+                name, size = self._next(name), 0
+            chunk: list[bytes] = []
+            while i < len(lines) and (not chunk or size + len(lines[i]) <= self.max_bytes):
+                locations.append((name, size, len(lines[i])))
+                size += len(lines[i])
+                chunk.append(lines[i])
+                i += 1
+            with open(self.directory / name, "ab") as f:
+                f.write(b"".join(chunk))
+                f.flush()
+                if self._should_fsync():
+                    os.fsync(f.fileno())
+                    self._last_fsync = time.monotonic()
+        return locations
+
+    def mark(self) -> tuple[str, int]:
+        """The current end of the log, for `rollback()`."""
+
+        return self._current()
+
+    def rollback(self, mark: tuple[str, int]) -> None:
+        """Drop everything appended after `mark` (an append whose index insert failed)."""
+
+        name, size = mark
+        for fp in self.directory.glob("seg-*.ndjson"):
+            if fp.name > name:
+                fp.unlink(missing_ok=True)
+        fp = self.directory / name
+        if not fp.exists():
+            return
+        if size:
+            with open(fp, "r+b") as f:
+                f.truncate(size)
+        else:
+            fp.unlink()
+
+    def _should_fsync(self) -> bool:
+        if self.fsync == "always":
+            return True
+        if self.fsync == "never":
+            return False
+        return time.monotonic() - self._last_fsync >= self.fsync_interval
+
+    def read(self, name: str, offset: int, length: int) -> bytes:
+        with open(self.directory / name, "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+
+class EvidenceStore:
+    """SQLite-indexed evidence store.
+
+    Bundle metadata (job, intent, capability, receiver, endpoints, timings,
+    artifact hashes) is indexed for fast listing; bodies are appended as
+    compact NDJSON to a rotating segment log and located by offset. Large
+    output values are deduplicated into the artifact store on write and
+    rehydrated on read.
+    """
+
+    def __init__(
+        self,
+        root: str | Path | None = None,
+        *,
+        fsync: FsyncPolicy | None = None,
+        fsync_interval: float = 1.0,
+        segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES,
+        inline_max: int | None = None,
+    ) -> None:
+        self.root = Path(root) if root else evidence_dir()
+        self.inline_max = default_inline_max_bytes() if inline_max is None else inline_max
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / "index.sqlite3"
+        self.segments = SegmentLog(
+            self.root / "segments",
+            max_bytes=segment_max_bytes,
+            fsync=fsync or default_fsync_policy(),
+            fsync_interval=fsync_interval,
+        )
+        # The async writer drives the store from worker threads, one call at a time.
+        self._db = sqlite3.connect(str(self.index_path), check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        try:
+            self._db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS bundles_fts USING fts5(intent)")
+            self._fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5; search falls back to LIKE scans.
+            self._fts = False
+        self._migrate()
+
+    def _migrate(self) -> None:
+        if self._db.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        self._db.execute("BEGIN IMMEDIATE")
+        mark = self.segments.mark()
+        try:
+            columns = {r["name"] for r in self._db.execute("PRAGMA table_info(bundles)")}
+            if "body" in columns:
+                self._migrate_bodies()
+            self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            self.segments.rollback(mark)
+            raise
+
+    def _migrate_bodies(self) -> None:
+        # Version 1 kept bodies in the index: move them to the segment log and rebuild the table.
+        self._db.execute("ALTER TABLE bundles RENAME TO bundles_v1")
+        for index in ("bundles_created_at", "bundles_capability", "bundles_receiver", "bundles_status"):
+            self._db.execute(f"DROP INDEX IF EXISTS {index}")
+        # executescript() would commit the open transaction; run the DDL one statement at a time.
+        for statement in _SCHEMA.split(";"):
+            if statement.strip():
+                self._db.execute(statement)
+        self._db.execute("DELETE FROM bundle_artifacts")
+        if self._fts:
+            self._db.execute("DELETE FROM bundles_fts")
+        cur = self._db.execute("SELECT body FROM bundles_v1 ORDER BY rowid")
+        while True:
+            rows = cur.fetchmany(500)
+            if not rows:
+                break
+            self._insert(*self._prepare([json.loads(zlib.decompress(r["body"]).decode("utf-8")) for r in rows]))
+        self._db.execute("DROP TABLE bundles_v1")
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> "EvidenceStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def put(self, bundle: dict[str, Any]) -> None:
+        self.put_many([bundle])
+
+    def put_many(self, bundles: list[dict[str, Any]]) -> None:
+        if not bundles:
+            return
+        prepared = self._prepare(bundles)
+
+        # Take the write lock first so segment offsets stay consistent across processes.
+        self._db.execute("BEGIN IMMEDIATE")
+        mark = self.segments.mark()
+        try:
+            self._insert(*prepared)
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            # Nothing references the appended lines any more; cut them off again.
+            self.segments.rollback(mark)
+            raise
+
+    def _prepare(
+        self, bundles: list[dict[str, Any]]
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[bytes]]:
+        metas = [bundle_meta(b) for b in bundles]
+        if any(not m["job_id"] for m in metas):
+            raise ValueError("evidence bundle is missing job_id")
+        bundles = [dehydrate_bundle(b, inline_max=self.inline_max) for b in bundles]
+        return bundles, metas, [_encode_line(b) for b in bundles]
+
+    def _insert(self, bundles: list[dict[str, Any]], metas: list[dict[str, Any]], lines: list[bytes]) -> None:
+        # Runs inside the caller's write transaction.
+        locations = self.segments.append(lines)
+        for bundle, meta, loc in zip(bundles, metas, locations):
+            job_id = meta["job_id"]
+            self._delete(job_id)
+            cur = self._db.execute(
+                f"INSERT INTO bundles ({', '.join(_META_COLUMNS)}, segment, seg_offset, seg_length) "
+                f"VALUES ({', '.join('?' for _ in _META_COLUMNS)}, ?, ?, ?)",
+                [meta[c] for c in _META_COLUMNS] + list(loc),
+            )
+            if self._fts:
+                self._db.execute(
+                    "INSERT INTO bundles_fts (rowid, intent) VALUES (?, ?)",
+                    (cur.lastrowid, meta["intent"] or ""),
+                )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO bundle_artifacts (hash, job_id) VALUES (?, ?)",
+                [(h, job_id) for h in _artifact_hashes(bundle)],
+            )
+            batch = bundle.get("batch")
+            if isinstance(batch, dict) and batch.get("id") and batch.get("item"):
+                # Latest outcome per batch item; `mrpd batch --resume` skips the ok ones.
+                self._db.execute(
+                    "INSERT OR REPLACE INTO batch_items (batch_id, item, job_id, status) VALUES (?, ?, ?, ?)",
+                    (batch["id"], batch["item"], job_id, meta["status"]),
+                )
+
+    def _delete(self, job_id: str) -> None:
+        row = self._db.execute("SELECT rowid FROM bundles WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return
+        if self._fts:
+            self._db.execute("DELETE FROM bundles_fts WHERE rowid = ?", (row[0],))
+        self._db.execute("DELETE FROM bundle_artifacts WHERE job_id = ?", (job_id,))
+        self._db.execute("DELETE FROM bundles WHERE job_id = ?", (job_id,))
+
+    def get(self, job_id: str, *, rehydrate: bool = True) -> dict[str, Any] | None:
+        row = self._db.execute(
+            "SELECT segment, seg_offset, seg_length FROM bundles WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        if row is not None:
+            bundle = json.loads(self.segments.read(row["segment"], row["seg_offset"], row["seg_length"]))
+            return rehydrate_bundle(bundle) if rehydrate else bundle
+        # Bundles written before the index existed live as one JSON file per job.
+        legacy = self.root / f"{job_id}.json"
+        if legacy.exists():
+            return json.loads(legacy.read_text(encoding="utf-8"))
+        return None
+
+    def artifact_hashes(self, job_id: str) -> list[str]:
+        rows = self._db.execute("SELECT hash FROM bundle_artifacts WHERE job_id = ? ORDER BY hash", (job_id,))
+        return [r["hash"] for r in rows]
+
+    def batch_completed(self, batch_id: str) -> set[str]:
+        """Items of a batch whose latest bundle succeeded."""
+
+        rows = self._db.execute("SELECT item FROM batch_items WHERE batch_id = ? AND status = 'ok'", (batch_id,))
+        return {r["item"] for r in rows}
+
+    def list(
+        self,
+        *,
+        capability: str | None = None,
+        receiver: str | None = None,
+        status: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        batch: str | None = None,
+        limit: int = 50,
+    ) -> list[dict[str, Any]]:
+        """Return bundle metadata, newest first. `since`/`until` compare RFC 3339 prefixes."""
+
+        where: list[str] = []
+        params: list[Any] = []
+        if batch:
+            where.append("job_id IN (SELECT job_id FROM batch_items WHERE batch_id = ?)")
+            params.append(batch)
+        if capability:
+            where.append("capability = ?")
+            params.append(capability)
+        if receiver:
+            where.append("receiver = ?")
+            params.append(receiver)
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if since:
+            where.append("created_at >= ?")
+            params.append(since)
+        if until:
+            where.append("created_at < ?")
+            params.append(until)
+        return self._select(where, params, limit)
+
+    def search(self, text: str | None = None, *, artifact_hash: str | None = None, limit: int = 50) -> list[dict[str, Any]]:
+        """Find bundles by intent text and/or artifact hash, newest first."""
+
+        where: list[str] = []
+        params: list[Any] = []
+        if text:
+            if self._fts:
+                terms = " ".join('"' + t.replace('"', '""') + '"' for t in text.split())
+                where.append("rowid IN (SELECT rowid FROM bundles_fts WHERE bundles_fts MATCH ?)")
+                params.append(terms)
+            else:
+                where.append("intent LIKE ?")
+                params.append(f"%{text}%")
+        if artifact_hash:
+            if not artifact_hash.startswith("sha256:"):
+                artifact_hash = f"sha256:{artifact_hash}"
+            where.append("job_id IN (SELECT job_id FROM bundle_artifacts WHERE hash = ?)")
+            params.append(artifact_hash)
+        return self._select(where, params, limit)
+
+    def _select(self, where: list[str], params: list[Any], limit: int) -> list[dict[str, Any]]:
+        sql = f"SELECT {', '.join(_META_COLUMNS)} FROM bundles"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        rows = self._db.execute(sql, [*params, limit]).fetchall()
+        return [dict(r) for r in rows]
+
+    def import_legacy(self) -> int:
+        """Index pre-existing `<job_id>.json` bundles from the evidence dir."""
+
+        bundles: list[dict[str, Any]] = []
+        for fp in sorted(self.root.glob("*.json")):
+            try:
+                bundle = json.loads(fp.read_text(encoding="utf-8"))
+            except Exception:
+                continue
+            if isinstance(bundle, dict):
+                bundle.setdefault("job_id", fp.stem)
+                bundles.append(bundle)
+        self.put_many(bundles)
+        return len(bundles)
+
+
+class AsyncEvidenceWriter:
+    """Queue evidence bundles and write them to the store in batches.
+
+    Serialization and file/SQLite I/O run in a worker thread so the event
+    loop never blocks on evidence. Use as an async context manager, or call
+    `start()` / `close()`; `close()` flushes everything still queued.
+    """
+
+    def __init__(
+        self,
+        root: str | Path | None = None,
+        *,
+        max_batch: int = 256,
+        max_delay: float = 0.05,
+        max_queue: int = 10000,
+        fsync: FsyncPolicy | None = None,
+        fsync_interval: float = 1.0,
+        segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES,
+        inline_max: int | None = None,
+    ) -> None:
+        self._store_args = dict(
+            root=root,
+            fsync=fsync,
+            fsync_interval=fsync_interval,
+            segment_max_bytes=segment_max_bytes,
+            inline_max=inline_max,
+        )
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=max_queue)
+        self._store: EvidenceStore | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._error: BaseException | None = None
+        self._flushing = asyncio.Event()
+        self.written = 0
+
+    @property
+    def store(self) -> EvidenceStore:
+        if self._store is None:
+            raise RuntimeError("AsyncEvidenceWriter is not started")
+        return self._store
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._store = await asyncio.to_thread(lambda: EvidenceStore(**self._store_args))
+        self._task = asyncio.create_task(self._drain())
+
+    async def submit(self, bundle: dict[str, Any]) -> None:
+        """Enqueue a bundle; waits only when the queue is full (backpressure)."""
+
+        if self._error is not None:
+            raise self._error
+        if self._task is None:
+            await self.start()
+        await self._queue.put(bundle)
+
+    async def flush(self) -> None:
+        """Wait until every submitted bundle has been written."""
+
+        self._flushing.set()
+        try:
+            await self._queue.join()
+        finally:
+            self._flushing.clear()
+        if self._error is not None:
+            raise self._error
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        try:
+            await self.flush()
+        finally:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await asyncio.to_thread(self.store.close)
+            self._store = None
+
+    async def __aenter__(self) -> "AsyncEvidenceWriter":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
+
+    def _take_ready(self, batch: list[dict[str, Any]]) -> None:
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                return
+
+    async def _drain(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            self._take_ready(batch)
+            if len(batch) < self.max_batch and self.max_delay > 0 and not self._flushing.is_set():
+                # Linger briefly so bursts coalesce into one write; a flush cuts it short.
+                try:
+                    await asyncio.wait_for(self._flushing.wait(), self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+                self._take_ready(batch)
+            try:
+                await asyncio.to_thread(self.store.put_many, batch)
+                self.written += len(batch)
+            except Exception as ex:
+                self._error = ex
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
 def write_evidence_bundle(job_id: str, bundle: dict[str, Any]) -> Path:
-    directory = evidence_dir()
-    directory.mkdir(parents=True, exist_ok=True)
-    path = directory / f"{job_id}.json"
-    path.write_text(json.dumps(bundle, indent=2), encoding="utf-8")
-    return path
+    """Store a bundle in the evidence store and return the index path."""
+
+    bundle = {**bundle, "job_id": job_id}
+    with EvidenceStore() as store:
+        store.put(bundle)
+        return store.index_path
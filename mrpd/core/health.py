@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Literal, Optional
+
+from mrpd.core.config import Config, HealthSettings
+
+
+def default_health_path() -> Path:
+    path = os.getenv("MRPD_HEALTH_PATH")
+    if path:
+        return Path(path)
+    return Path.home() / ".mrpd" / "health.sqlite3"
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS provider_health (
+    entry_id TEXT PRIMARY KEY,
+    samples INTEGER NOT NULL,
+    ewma_ms REAL NOT NULL,
+    error_rate REAL NOT NULL,
+    p95_ms REAL NOT NULL,
+    window TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS circuits (
+    entry_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    failures INTEGER NOT NULL,
+    open_until REAL,
+    cooldown REAL,
+    manifest_url TEXT,
+    checked_at REAL NOT NULL,
+    trial_until REAL
+);
+"""
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+@dataclass(frozen=True)
+class HealthStats:
+    entry_id: str
+    samples: int
+    ewma_ms: float
+    error_rate: float
+    p95_ms: float
+    updated_at: float
+
+
+@dataclass(frozen=True)
+class Circuit:
+    entry_id: str
+    state: CircuitState
+    failures: int
+    open_until: Optional[float]
+    cooldown: Optional[float]
+    manifest_url: Optional[str]
+    checked_at: float
+    # Set while a caller holds the half-open trial (`HealthStore.claim_trials`).
+    trial_until: Optional[float] = None
+
+    def state_at(self, now: float) -> CircuitState:
+        # An open circuit turns half-open once its cooldown has passed: one trial call is let through.
+        if self.state == "open" and self.open_until is not None and now >= self.open_until:
+            # Everyone else still sees it open until that trial resolves (or its lease runs out).
+            if self.trial_until is not None and now < self.trial_until:
+                return "open"
+            return "half_open"
+        return self.state
+
+
+def _p95(window: list[float]) -> float:
+    ordered = sorted(window)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+class HealthStore:
+    """Observed provider latency and error rate, keyed by registry entry id.
+
+    Each `record()` folds one call into an EWMA of latency and of the error
+    rate (`alpha` is the newest sample's weight) and into a window of recent
+    latencies from which p95 is taken.
+
+    Every outcome (calls and probes) also drives a per-provider
+    circuit breaker: `failure_threshold` consecutive failures open it, and
+    after `open_seconds` it is half-open. The caller that claims the trial
+    (`claim_trials`) holds it for up to `trial_seconds`; its outcome
+    decides. A failed trial re-opens it with the cooldown doubled (up to
+    `max_open_seconds`); any success closes it.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        alpha: float = 0.2,
+        window: int = 100,
+        failure_threshold: int = 3,
+        open_seconds: float = 30.0,
+        max_open_seconds: float = 900.0,
+        trial_seconds: float = 60.0,
+    ) -> None:
+        self.path = Path(path) if path else default_health_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.alpha = alpha
+        self.window = window
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.trial_seconds = trial_seconds
+        self._db = sqlite3.connect(str(self.path), isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        columns = {r[1] for r in self._db.execute("PRAGMA table_info(circuits)")}
+        if "trial_until" not in columns:
+            # Stores created before trial leases existed.
+            self._db.execute("ALTER TABLE circuits ADD COLUMN trial_until REAL")
+
+    @classmethod
+    def from_config(cls, config: Config) -> "HealthStore":
+        h = config.health
+        return cls(
+            alpha=h.alpha,
+            failure_threshold=h.failure_threshold,
+            open_seconds=h.open_seconds,
+            max_open_seconds=h.max_open_seconds,
+            trial_seconds=h.trial_seconds,
+        )
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> "HealthStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def record(
+        self,
+        entry_id: str,
+        *,
+        latency_ms: float,
+        ok: bool,
+        at: float | None = None,
+        manifest_url: str | None = None,
+    ) -> HealthStats:
+        """Fold one provider call into its stats and circuit."""
+
+        at = time.time() if at is None else at
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute(
+                "SELECT samples, ewma_ms, error_rate, window FROM provider_health WHERE entry_id = ?", (entry_id,)
+            ).fetchone()
+            err = 0.0 if ok else 1.0
+            if row is None:
+                samples, ewma_ms, error_rate, window = 1, latency_ms, err, [latency_ms]
+            else:
+                a = self.alpha
+                samples = row[0] + 1
+                ewma_ms = a * latency_ms + (1 - a) * row[1]
+                error_rate = a * err + (1 - a) * row[2]
+                window = (json.loads(row[3]) + [latency_ms])[-self.window :]
+            stats = HealthStats(entry_id, samples, ewma_ms, error_rate, _p95(window), at)
+            self._db.execute(
+                "INSERT OR REPLACE INTO provider_health "
+                "(entry_id, samples, ewma_ms, error_rate, p95_ms, window, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (entry_id, samples, ewma_ms, error_rate, stats.p95_ms, json.dumps(window), at),
+            )
+            self._update_circuit(entry_id, ok=ok, at=at, manifest_url=manifest_url)
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+        return stats
+
+    def record_probe(self, entry_id: str, *, ok: bool, at: float | None = None) -> Circuit:
+        """Fold a probe into the circuit only (probes don't skew latency stats)."""
+
+        at = time.time() if at is None else at
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            circuit = self._update_circuit(entry_id, ok=ok, at=at, manifest_url=None)
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+        return circuit
+
+    def claim_trials(self, entry_ids: Iterable[str], *, at: float | None = None) -> set[str]:
+        """Take the trial slot of every half-open circuit among `entry_ids`.
+
+        Returns the ids the caller may not call: circuits that are open,
+        including half-open ones whose trial another caller already holds.
+        The lease ends when the trial's outcome is recorded, or after
+        `trial_seconds` if it never is.
+        """
+
+        at = time.time() if at is None else at
+        denied: set[str] = set()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            for c in self.circuits(entry_ids).values():
+                state = c.state_at(at)
+                if state == "open":
+                    denied.add(c.entry_id)
+                elif state == "half_open":
+                    self._db.execute(
+                        "UPDATE circuits SET trial_until = ? WHERE entry_id = ?", (at + self.trial_seconds, c.entry_id)
+                    )
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+        return denied
+
+    def _update_circuit(self, entry_id: str, *, ok: bool, at: float, manifest_url: Optional[str]) -> Circuit:
+        prev = self.circuits([entry_id]).get(entry_id)
+        url = manifest_url or (prev.manifest_url if prev else None)
+        failures = 0 if ok else (prev.failures if prev else 0) + 1
+        state: CircuitState = "closed"
+        open_until: Optional[float] = None
+        cooldown = prev.cooldown if prev and prev.cooldown else self.open_seconds
+        if ok:
+            cooldown = self.open_seconds
+        elif prev is not None and prev.state == "open" and prev.open_until is not None and at >= prev.open_until:
+            # A failed trial (leased or not).
+            cooldown = min(self.max_open_seconds, cooldown * 2)
+            state, open_until = "open", at + cooldown
+        elif prev is not None and prev.state == "open":
+            state, open_until = "open", prev.open_until
+        elif failures >= self.failure_threshold:
+            state, open_until = "open", at + cooldown
+        # Any recorded outcome ends a trial lease.
+        circuit = Circuit(entry_id, state, failures, open_until, cooldown, url, at)
+        self._db.execute(
+            "INSERT OR REPLACE INTO circuits "
+            "(entry_id, state, failures, open_until, cooldown, manifest_url, checked_at, trial_until) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, NULL)",
+            (entry_id, state, failures, open_until, cooldown, url, at),
+        )
+        return circuit
+
+    def circuits(self, entry_ids: Iterable[str] | None = None) -> dict[str, Circuit]:
+        cols = "entry_id, state, failures, open_until, cooldown, manifest_url, checked_at, trial_until"
+        if entry_ids is None:
+            rows = self._db.execute(f"SELECT {cols} FROM circuits").fetchall()
+        else:
+            ids = list(entry_ids)
+            rows = []
+            for i in range(0, len(ids), 500):
+                chunk = ids[i : i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows += self._db.execute(f"SELECT {cols} FROM circuits WHERE entry_id IN ({marks})", chunk).fetchall()
+        return {r[0]: Circuit(*r) for r in rows}
+
+    def get(self, entry_id: str) -> Optional[HealthStats]:
+        return self.get_many([entry_id]).get(entry_id)
+
+    def get_many(self, entry_ids: Iterable[str] | None = None) -> dict[str, HealthStats]:
+        cols = "entry_id, samples, ewma_ms, error_rate, p95_ms, updated_at"
+        if entry_ids is None:
+            rows = self._db.execute(f"SELECT {cols} FROM provider_health").fetchall()
+        else:
+            ids = list(entry_ids)
+            rows = []
+            for i in range(0, len(ids), 500):
+                chunk = ids[i : i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows += self._db.execute(
+                    f"SELECT {cols} FROM provider_health WHERE entry_id IN ({marks})", chunk
+                ).fetchall()
+        return {r[0]: HealthStats(*r) for r in rows}
+
+
+class HealthView:
+    """Snapshot of health stats plus scoring weights for one ranking pass.
+
+    The penalty for an entry is `latency_weight * ewma / (ewma + latency_ref_ms)`
+    plus `error_weight * error_rate`, scaled down by the age of the last
+    observation (halved every `half_life` seconds). `now` is fixed at
+    construction so every score in a pass uses the same decay and circuit
+    states; entries whose circuit is open are skipped by ranking.
+    """
+
+    def __init__(
+        self,
+        stats: dict[str, HealthStats],
+        settings: HealthSettings,
+        *,
+        circuits: dict[str, Circuit] | None = None,
+        now: float | None = None,
+    ) -> None:
+        self.stats = stats
+        self.settings = settings
+        self.now = time.time() if now is None else now
+        self.open_ids = frozenset(
+            c.entry_id for c in (circuits or {}).values() if c.state_at(self.now) == "open"
+        )
+        # Callers must claim these before calling (`HealthStore.claim_trials`).
+        self.half_open_ids = frozenset(
+            c.entry_id for c in (circuits or {}).values() if c.state_at(self.now) == "half_open"
+        )
+
+    def is_open(self, entry_id: str) -> bool:
+        return entry_id in self.open_ids
+
+    @classmethod
+    def load(cls, settings: HealthSettings, path: str | Path | None = None) -> Optional["HealthView"]:
+        """All recorded stats, or None if telemetry is disabled or nothing is recorded yet."""
+
+        if not settings.enabled:
+            return None
+        p = Path(path) if path else default_health_path()
+        if not p.exists():
+            return None
+        with HealthStore(p) as store:
+            stats = store.get_many()
+            circuits = store.circuits()
+        return cls(stats, settings, circuits=circuits) if stats or circuits else None
+
+    def penalty(self, entry_id: str) -> tuple[float, tuple[str, ...]]:
+        st = self.stats.get(entry_id)
+        if st is None:
+            return 0.0, ()
+        s = self.settings
+        age = max(0.0, self.now - st.updated_at)
+        decay = 0.5 ** (age / s.half_life) if s.half_life > 0 else 1.0
+        latency = s.latency_weight * st.ewma_ms / (st.ewma_ms + s.latency_ref_ms) if st.ewma_ms > 0 else 0.0
+        errors = s.error_weight * st.error_rate
+        reasons = (
+            f"observed latency: {st.ewma_ms:.0f}ms (p95 {st.p95_ms:.0f}ms)",
+            f"observed error rate: {st.error_rate:.2f}",
+        )
+        return decay * (latency + errors), reasons
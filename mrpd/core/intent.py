@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import TYPE_CHECKING, Optional
+
+from mrpd.core.config import IntentSettings
+from mrpd.core.models import RegistryEntry
+
+if TYPE_CHECKING:
+    from mrpd.core.mirror import RegistryMirror
+
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or the this to with".split()
+)
+
+
+def _stem(token: str) -> str:
+    # Light plural folding so "summarizes"/"summarize", "urls"/"url" meet.
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens; snake/kebab-case identifiers split into words."""
+
+    return [_stem(t) for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def entry_terms(entry: RegistryEntry) -> Counter[str]:
+    """Term frequencies over name, description, capabilities and tags."""
+
+    parts = [entry.name, entry.description or "", *entry.capabilities]
+    tags = entry.metadata.get("tags") if isinstance(entry.metadata, dict) else None
+    if isinstance(tags, list):
+        parts.extend(t for t in tags if isinstance(t, str))
+    return Counter(tokenize(" ".join(parts)))
+
+
+class IntentView:
+    """Intent relevance for one ranking pass.
+
+    `relevance` maps entry id to BM25 relevance normalized to the best match
+    (0..1]; an entry gains up to `weight` score points.
+    """
+
+    def __init__(self, relevance: dict[str, float], weight: float) -> None:
+        self.relevance = relevance
+        self.weight = weight
+
+    @classmethod
+    def from_scores(cls, scores: dict[str, float], weight: float) -> "IntentView":
+        best = max(scores.values(), default=0.0)
+        relevance = {k: v / best for k, v in scores.items()} if best > 0 else {}
+        return cls(relevance, weight)
+
+    @classmethod
+    def load(cls, mirror: "RegistryMirror | None", text: str, settings: IntentSettings) -> Optional["IntentView"]:
+        """Relevance of mirrored entries to `text`, or None without a mirror or any match."""
+
+        if mirror is None or not settings.enabled or not text.strip():
+            return None
+        scores = mirror.intent_scores(text, limit=settings.candidates, k1=settings.k1, b=settings.b)
+        return cls.from_scores(scores, settings.weight) if scores else None
+
+    def bonus(self, entry_id: str) -> tuple[float, tuple[str, ...]]:
+        rel = self.relevance.get(entry_id)
+        if rel is None:
+            return 0.0, ()
+        return self.weight * rel, (f"intent match: {rel:.2f}",)
@@ -0,0 +1,378 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from mrpd.core.compact import CompactEntry, CompactPage, intern_strings
+from mrpd.core.intent import entry_terms, tokenize
+from mrpd.core.models import RegistryEntry, RegistryQueryResponse
+from mrpd.core.util import utc_now_rfc3339
+
+if TYPE_CHECKING:
+    from mrpd.core.registry import RegistryClient
+
+
+def default_mirror_path() -> Path:
+    path = os.getenv("MRPD_MIRROR_PATH")
+    if path:
+        return Path(path)
+    return Path.home() / ".mrpd" / "registry" / "mirror.sqlite3"
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id TEXT PRIMARY KEY,
+    canonical_id TEXT,
+    kind TEXT,
+    name TEXT NOT NULL,
+    manifest_url TEXT,
+    trust_score REAL,
+    trust_level TEXT,
+    proofs_count INTEGER NOT NULL DEFAULT 0,
+    registry TEXT NOT NULL,
+    synced_at TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_canonical_id ON entries(canonical_id);
+CREATE INDEX IF NOT EXISTS entries_trust_level ON entries(trust_level);
+CREATE INDEX IF NOT EXISTS entries_trust_score ON entries(trust_score);
+CREATE INDEX IF NOT EXISTS entries_registry ON entries(registry, synced_at);
+CREATE TABLE IF NOT EXISTS entry_capabilities (
+    capability TEXT NOT NULL,
+    entry_id TEXT NOT NULL,
+    PRIMARY KEY (capability, entry_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS entry_policies (
+    policy TEXT NOT NULL,
+    entry_id TEXT NOT NULL,
+    PRIMARY KEY (policy, entry_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entry_capabilities_entry ON entry_capabilities(entry_id);
+CREATE INDEX IF NOT EXISTS entry_policies_entry ON entry_policies(entry_id);
+CREATE TABLE IF NOT EXISTS intent_terms (
+    term TEXT NOT NULL,
+    entry_id TEXT NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, entry_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS intent_terms_entry ON intent_terms(entry_id);
+CREATE TABLE IF NOT EXISTS intent_docs (
+    entry_id TEXT PRIMARY KEY,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    registry TEXT PRIMARY KEY,
+    last_sync_at TEXT,
+    pending_since TEXT,
+    pending_started_at TEXT,
+    pending_cursor TEXT
+);
+"""
+
+
+_COMPACT_SELECT = (
+    "SELECT id, name, manifest_url, trust_score, proofs_count, "
+    "(SELECT group_concat(capability, char(31)) FROM entry_capabilities WHERE entry_id = e.id) AS caps, "
+    "(SELECT group_concat(policy, char(31)) FROM entry_policies WHERE entry_id = e.id) AS pols"
+)
+
+
+@dataclass(frozen=True)
+class SyncResult:
+    registry: str
+    upserted: int
+    removed: int
+    full: bool
+    resumed: bool
+
+
+class RegistryMirror:
+    """Local SQLite copy of registry entries for offline, index-backed routing.
+
+    Capabilities and policies live in their own indexed tables so filtered
+    queries are index lookups. A BM25 inverted index over name, description,
+    capabilities and tags is kept in step with every upsert. `sync()` walks the registry with cursors and
+    records progress after every page, so an interrupted sync resumes where
+    it stopped; later syncs ask only for entries changed since the last one.
+    """
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.path = Path(path) if path else default_mirror_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> "RegistryMirror":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def count(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def upsert(self, entries: Iterable[RegistryEntry], *, registry: str, synced_at: str | None = None) -> int:
+        synced_at = synced_at or utc_now_rfc3339()
+        n = 0
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            for e in entries:
+                trust = e.trust
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries "
+                    "(id, canonical_id, kind, name, manifest_url, trust_score, trust_level, proofs_count, registry, synced_at, body) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        e.id,
+                        e.canonical_id,
+                        e.kind,
+                        e.name,
+                        e.manifest_url,
+                        trust.score if trust else None,
+                        trust.level if trust else None,
+                        len(e.proofs),
+                        registry,
+                        synced_at,
+                        json.dumps(e.model_dump(mode="json"), separators=(",", ":")),
+                    ),
+                )
+                self._db.execute("DELETE FROM entry_capabilities WHERE entry_id = ?", (e.id,))
+                self._db.execute("DELETE FROM entry_policies WHERE entry_id = ?", (e.id,))
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO entry_capabilities (capability, entry_id) VALUES (?, ?)",
+                    [(c, e.id) for c in e.capabilities],
+                )
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO entry_policies (policy, entry_id) VALUES (?, ?)",
+                    [(p, e.id) for p in e.policies],
+                )
+                self._index_intent(e)
+                n += 1
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+        return n
+
+    def _remove_stale(self, registry: str, before: str) -> int:
+        stale = "SELECT id FROM entries WHERE registry = ? AND synced_at < ?"
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            # Dependents first, while the stale rows still identify them.
+            for table in ("entry_capabilities", "entry_policies", "intent_terms", "intent_docs"):
+                self._db.execute(f"DELETE FROM {table} WHERE entry_id IN ({stale})", (registry, before))
+            n = self._db.execute(
+                "DELETE FROM entries WHERE registry = ? AND synced_at < ?", (registry, before)
+            ).rowcount
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+        return n
+
+    def _index_intent(self, e: RegistryEntry) -> None:
+        terms = entry_terms(e)
+        self._db.execute("DELETE FROM intent_terms WHERE entry_id = ?", (e.id,))
+        self._db.executemany(
+            "INSERT INTO intent_terms (term, entry_id, tf) VALUES (?, ?, ?)",
+            [(t, e.id, tf) for t, tf in terms.items()],
+        )
+        self._db.execute(
+            "INSERT OR REPLACE INTO intent_docs (entry_id, length) VALUES (?, ?)", (e.id, sum(terms.values()))
+        )
+
+    def index_intents(self) -> None:
+        """Index entries missing from the intent index (mirrors synced before it existed)."""
+
+        indexed = self._db.execute("SELECT COUNT(*) FROM intent_docs").fetchone()[0]
+        if indexed >= self.count():
+            return
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self._db.execute(
+                "SELECT body FROM entries WHERE id NOT IN (SELECT entry_id FROM intent_docs)"
+            ).fetchall()
+            for r in rows:
+                self._index_intent(RegistryEntry.model_validate_json(r["body"]))
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def intent_scores(self, text: str, *, limit: int = 200, k1: float = 1.2, b: float = 0.75) -> dict[str, float]:
+        """Okapi BM25 scores of the best `limit` entries for free text, best first.
+
+        Read-only: entries missing from the index (see `index_intents`) are
+        left out until the next sync indexes them.
+        """
+
+        terms = sorted(set(tokenize(text)))
+        if not terms:
+            return {}
+        n_docs, avgdl = self._db.execute("SELECT COUNT(*), AVG(length) FROM intent_docs").fetchone()
+        if not n_docs:
+            return {}
+        marks = ",".join("?" * len(terms))
+        df = dict(
+            self._db.execute(
+                f"SELECT term, COUNT(*) FROM intent_terms WHERE term IN ({marks}) GROUP BY term", terms
+            ).fetchall()
+        )
+        idf = [(t, math.log(1 + (n_docs - df[t] + 0.5) / (df[t] + 0.5))) for t in terms if t in df]
+        if not idf:
+            return {}
+        values = ",".join("(?, ?)" for _ in idf)
+        rows = self._db.execute(
+            f"WITH q(term, idf) AS (VALUES {values}) "
+            "SELECT t.entry_id, SUM(q.idf * t.tf * (? + 1) / (t.tf + ? * (1 - ? + ? * d.length / ?))) AS s "
+            "FROM q JOIN intent_terms t ON t.term = q.term JOIN intent_docs d ON d.entry_id = t.entry_id "
+            "GROUP BY t.entry_id ORDER BY s DESC, t.entry_id LIMIT ?",
+            [*(v for pair in idf for v in pair), k1, k1, b, b, max(avgdl, 1e-9), limit],
+        ).fetchall()
+        return {r[0]: r[1] for r in rows}
+
+    def _where(
+        self, capability: Optional[str], policy: Optional[str], cursor: Optional[str]
+    ) -> tuple[str, list[object]]:
+        where: list[str] = []
+        params: list[object] = []
+        if capability:
+            where.append("id IN (SELECT entry_id FROM entry_capabilities WHERE capability = ?)")
+            params.append(capability)
+        if policy:
+            where.append("id IN (SELECT entry_id FROM entry_policies WHERE policy = ?)")
+            params.append(policy)
+        if cursor:
+            where.append("id > ?")
+            params.append(cursor)
+        return (" WHERE " + " AND ".join(where)) if where else "", params
+
+    def query(
+        self,
+        *,
+        capability: Optional[str] = None,
+        policy: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> RegistryQueryResponse:
+        """Answer a registry query locally; `cursor` is the last id of the previous page."""
+
+        where, params = self._where(capability, policy, cursor)
+        sql = f"SELECT id, body FROM entries{where} ORDER BY id LIMIT ?"
+        rows = self._db.execute(sql, [*params, limit + 1]).fetchall()
+
+        results = [RegistryEntry.model_validate_json(r["body"]) for r in rows[:limit]]
+        next_page = rows[limit - 1]["id"] if len(rows) > limit else None
+        return RegistryQueryResponse(results=results, next_page=next_page)
+
+    def query_compact(
+        self,
+        *,
+        capability: Optional[str] = None,
+        policy: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> CompactPage:
+        """Like `query`, but built from indexed columns; bodies load on `materialize()`."""
+
+        where, params = self._where(capability, policy, cursor)
+        sql = f"{_COMPACT_SELECT} FROM entries e{where} ORDER BY id LIMIT ?"
+        rows = self._db.execute(sql, [*params, limit + 1]).fetchall()
+        results = [self._compact_row(r) for r in rows[:limit]]
+        next_page = rows[limit - 1]["id"] if len(rows) > limit else None
+        return CompactPage(results=results, next_page=next_page)
+
+    def compact_by_ids(self, entry_ids: list[str]) -> list[CompactEntry]:
+        """Compact rows for `entry_ids`, in that order (unknown ids are dropped)."""
+
+        found: dict[str, CompactEntry] = {}
+        for i in range(0, len(entry_ids), 500):
+            chunk = entry_ids[i : i + 500]
+            marks = ",".join("?" * len(chunk))
+            for r in self._db.execute(f"{_COMPACT_SELECT} FROM entries e WHERE id IN ({marks})", chunk):
+                found[r["id"]] = self._compact_row(r)
+        return [found[i] for i in entry_ids if i in found]
+
+    def _compact_row(self, r: sqlite3.Row) -> CompactEntry:
+        return CompactEntry(
+            r["id"],
+            r["name"],
+            r["manifest_url"],
+            intern_strings(r["caps"].split("\x1f") if r["caps"] else ()),
+            intern_strings(r["pols"].split("\x1f") if r["pols"] else ()),
+            r["trust_score"],
+            r["proofs_count"],
+            lambda entry_id=r["id"]: self.get(entry_id),
+        )
+
+    def get(self, entry_id: str) -> RegistryEntry:
+        row = self._db.execute("SELECT body FROM entries WHERE id = ?", (entry_id,)).fetchone()
+        if row is None:
+            raise KeyError(entry_id)
+        return RegistryEntry.model_validate_json(row["body"])
+
+    def state(self, registry: str) -> dict | None:
+        row = self._db.execute("SELECT * FROM sync_state WHERE registry = ?", (registry,)).fetchone()
+        return dict(row) if row else None
+
+    def states(self) -> list[dict]:
+        return [dict(r) for r in self._db.execute("SELECT * FROM sync_state ORDER BY registry")]
+
+    def _save_state(self, registry: str, **fields: Optional[str]) -> None:
+        self._db.execute("INSERT OR IGNORE INTO sync_state (registry) VALUES (?)", (registry,))
+        for k, v in fields.items():
+            self._db.execute(f"UPDATE sync_state SET {k} = ? WHERE registry = ?", (v, registry))
+
+    async def sync(self, client: "RegistryClient", *, full: bool = False, page_size: int = 200) -> SyncResult:
+        """Pull entries from `client`'s registry into the mirror.
+
+        Delta syncs pass `updated_since` (the start of the last completed
+        sync); registries that ignore it simply return everything, which is
+        still correct. A full sync also removes entries the registry no
+        longer lists.
+        """
+
+        registry = client.base_url
+        state = self.state(registry) or {}
+        resumed = bool(state.get("pending_cursor")) and not full
+        if resumed:
+            since = state.get("pending_since")
+            started_at = state["pending_started_at"]
+            cursor = state["pending_cursor"]
+        else:
+            since = None if full else state.get("last_sync_at")
+            started_at = utc_now_rfc3339()
+            cursor = None
+            self._save_state(registry, pending_since=since, pending_started_at=started_at, pending_cursor=None)
+        full = full or since is None
+
+        upserted = 0
+        while True:
+            page = await client.query_api(limit=page_size, cursor=cursor, updated_since=since)
+            upserted += self.upsert(page.results, registry=registry, synced_at=started_at)
+            cursor = page.next_page if page.results else None
+            self._save_state(registry, pending_cursor=cursor)
+            if not cursor:
+                break
+
+        removed = self._remove_stale(registry, started_at) if full else 0
+        self.index_intents()
+        self._save_state(
+            registry,
+            last_sync_at=started_at,
+            pending_since=None,
+            pending_started_at=None,
+            pending_cursor=None,
+        )
+        return SyncResult(registry=registry, upserted=upserted, removed=removed, full=full, resumed=resumed)
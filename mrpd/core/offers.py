@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from mrpd.core.config import OfferSettings
+
+# Weight multipliers (confidence, cost, latency) applied on top of the configured weights.
+PREFERENCES: dict[str, tuple[float, float, float]] = {
+    "balanced": (1.0, 1.0, 1.0),
+    "cheapest": (0.5, 4.0, 0.5),
+    "fastest": (0.5, 0.5, 4.0),
+    "confident": (4.0, 0.5, 0.5),
+}
+
+_DURATION = re.compile(r"^\s*([0-9]*\.?[0-9]+)\s*(ms|s|sec|secs|m|min)?\s*$", re.IGNORECASE)
+_AMOUNT = re.compile(r"[0-9]*\.?[0-9]+")
+_TO_MS = {None: 1.0, "ms": 1.0, "s": 1000.0, "sec": 1000.0, "secs": 1000.0, "m": 60000.0, "min": 60000.0}
+
+
+def parse_duration_ms(value: Any) -> Optional[float]:
+    """Milliseconds from 250, "250ms", "1.5s" or "2m"; bare numbers are ms."""
+
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value >= 0 else None
+    if isinstance(value, str):
+        m = _DURATION.match(value)
+        if m:
+            unit = m.group(2).lower() if m.group(2) else None
+            return float(m.group(1)) * _TO_MS[unit]
+    return None
+
+
+def parse_amount(value: Any) -> Optional[float]:
+    """A non-negative cost from 0.01, "0.01" or "$0.01"."""
+
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value >= 0 else None
+    if isinstance(value, str):
+        m = _AMOUNT.search(value)
+        return float(m.group(0)) if m else None
+    return None
+
+
+@dataclass(frozen=True)
+class ParsedOffer:
+    """The fields of an OFFER entry that selection looks at, normalized."""
+
+    route_id: str
+    capability: Optional[str]
+    confidence: Optional[float]
+    cost: Optional[float]
+    cost_unit: Optional[str]
+    latency_ms: Optional[float]
+    policies: tuple[str, ...]
+    raw: dict = field(compare=False, repr=False)
+
+    @classmethod
+    def parse(cls, raw: Any) -> Optional["ParsedOffer"]:
+        if not isinstance(raw, dict) or not isinstance(raw.get("route_id"), str) or not raw["route_id"]:
+            return None
+        conf = raw.get("confidence")
+        confidence = min(1.0, max(0.0, float(conf))) if isinstance(conf, (int, float)) and not isinstance(conf, bool) else None
+        cost_obj = raw.get("cost")
+        cost, unit = None, None
+        if isinstance(cost_obj, dict):
+            cost = parse_amount(cost_obj.get("estimate", cost_obj.get("max")))
+            unit = cost_obj.get("unit") if isinstance(cost_obj.get("unit"), str) else None
+        elif cost_obj is not None:
+            cost = parse_amount(cost_obj)
+        latency = raw.get("latency")
+        latency_ms = None
+        if isinstance(latency, dict):
+            latency_ms = parse_duration_ms(latency.get("p50", latency.get("p50_ms")))
+        if latency_ms is None:
+            latency_ms = parse_duration_ms(raw.get("latency_ms", latency if not isinstance(latency, dict) else None))
+        policies = tuple(p for p in raw.get("policy") or () if isinstance(p, str)) if isinstance(raw.get("policy"), list) else ()
+        capability = raw.get("capability") if isinstance(raw.get("capability"), str) else None
+        return cls(raw["route_id"], capability, confidence, cost, unit, latency_ms, policies, raw)
+
+
+@dataclass(frozen=True)
+class OfferConstraints:
+    """Hard limits; an offer that breaks one is never selected.
+
+    Unknown values (an offer without a cost, say) pass: the provider was
+    sent the same limits in DISCOVER.
+    """
+
+    max_cost: Optional[float] = None
+    policy: Optional[str] = None
+    capability: Optional[str] = None
+    max_latency_ms: Optional[float] = None
+    min_confidence: Optional[float] = None
+
+
+@dataclass
+class ScoredOffer:
+    offer: ParsedOffer
+    score: float
+    violations: tuple[str, ...] = ()
+
+    @property
+    def acceptable(self) -> bool:
+        return not self.violations
+
+    def summary(self) -> dict:
+        o = self.offer
+        return {
+            "route_id": o.route_id,
+            "confidence": o.confidence,
+            "cost": o.cost,
+            "latency_ms": o.latency_ms,
+            "score": round(self.score, 4),
+            "violations": list(self.violations),
+        }
+
+
+class OfferSelector:
+    """Ranks the offers in OFFER replies on a weighted objective.
+
+    score = wc*confidence - wk*cost/(cost+cost_ref) - wl*latency/(latency+latency_ref)
+
+    Each term is in 0..1 before weighting; a missing value counts as the
+    midpoint (0.5), so an offer is neither rewarded nor punished for
+    leaving a field out. Build one per run (or batch) and reuse it per reply.
+    """
+
+    def __init__(self, settings: OfferSettings, prefer: str | None = None) -> None:
+        prefer = prefer or settings.prefer
+        if prefer not in PREFERENCES:
+            raise ValueError(f"unknown offer preference: {prefer} (choose from {', '.join(PREFERENCES)})")
+        mc, mk, ml = PREFERENCES[prefer]
+        self.prefer = prefer
+        self.confidence_weight = settings.confidence_weight * mc
+        self.cost_weight = settings.cost_weight * mk
+        self.latency_weight = settings.latency_weight * ml
+        self.cost_ref = settings.cost_ref
+        self.latency_ref_ms = settings.latency_ref_ms
+        self.min_confidence = settings.min_confidence
+        self.max_latency_ms = settings.max_latency_ms
+
+    def constraints(
+        self, *, max_cost: float | None = None, policy: str | None = None, capability: str | None = None
+    ) -> OfferConstraints:
+        return OfferConstraints(
+            max_cost=max_cost,
+            policy=policy,
+            capability=capability,
+            max_latency_ms=self.max_latency_ms,
+            min_confidence=self.min_confidence or None,
+        )
+
+    def score(self, offer: ParsedOffer, constraints: OfferConstraints) -> ScoredOffer:
+        violations: list[str] = []
+        c = constraints
+        if c.max_cost is not None and offer.cost is not None and offer.cost > c.max_cost:
+            violations.append(f"cost {offer.cost:g} > max_cost {c.max_cost:g}")
+        if c.policy and offer.policies and c.policy not in offer.policies:
+            violations.append(f"policy {c.policy} not offered")
+        if c.capability and offer.capability and offer.capability != c.capability:
+            violations.append(f"capability {offer.capability} != {c.capability}")
+        if c.max_latency_ms is not None and offer.latency_ms is not None and offer.latency_ms > c.max_latency_ms:
+            violations.append(f"latency {offer.latency_ms:g}ms > {c.max_latency_ms:g}ms")
+        if c.min_confidence is not None and offer.confidence is not None and offer.confidence < c.min_confidence:
+            violations.append(f"confidence {offer.confidence:g} < {c.min_confidence:g}")
+
+        conf = offer.confidence if offer.confidence is not None else 0.5
+        cost = offer.cost / (offer.cost + self.cost_ref) if offer.cost is not None and self.cost_ref > 0 else 0.5
+        lat = (
+            offer.latency_ms / (offer.latency_ms + self.latency_ref_ms)
+            if offer.latency_ms is not None and self.latency_ref_ms > 0
+            else 0.5
+        )
+        value = self.confidence_weight * conf - self.cost_weight * cost - self.latency_weight * lat
+        return ScoredOffer(offer, value, tuple(violations))
+
+    def evaluate(self, reply: dict, constraints: OfferConstraints) -> list[ScoredOffer]:
+        """Score every offer in an OFFER reply, best acceptable first (stable for ties)."""
+
+        if reply.get("msg_type") not in (None, "OFFER"):
+            return []
+        parsed = [ParsedOffer.parse(o) for o in (reply.get("payload") or {}).get("offers") or []]
+        scored = [self.score(o, constraints) for o in parsed if o is not None]
+        return sorted(scored, key=lambda s: (not s.acceptable, -s.score))
+
+    def select(self, reply: dict, constraints: OfferConstraints) -> Optional[ScoredOffer]:
+        scored = self.evaluate(reply, constraints)
+        return scored[0] if scored and scored[0].acceptable else None
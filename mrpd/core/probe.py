@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import Callable, Optional
+
+import httpx
+
+from mrpd.core.config import HealthSettings
+from mrpd.core.envelopes import mk_envelope
+from mrpd.core.health import Circuit, HealthStore
+from mrpd.core.registry import fetch_manifest, normalize_manifest_endpoints
+
+
+# Called with (circuit after the probe, ok, error message) for each probe.
+ProbeCallback = Callable[[Circuit, bool, Optional[str]], None]
+
+
+async def probe_provider(http: httpx.AsyncClient, manifest_url: str, *, timeout: float = 5.0) -> Optional[str]:
+    """Check one provider; returns None if healthy, else a short error.
+
+    Fetches the manifest and, if it lists a `hello` endpoint, sends HELLO.
+    """
+
+    try:
+        # Uncached, so the probe sees the provider as it is now; file:// manifests work too.
+        raw = await fetch_manifest(manifest_url, timeout, http=http)
+        manifest = normalize_manifest_endpoints(raw, manifest_url)
+        hello_url = (manifest.get("endpoints") or {}).get("hello")
+        if hello_url:
+            env = mk_envelope("HELLO", {"schemas": ["0.1"]})
+            r = await http.post(
+                hello_url, json=env, headers={"Content-Type": "application/mrp+json"}, timeout=timeout
+            )
+            r.raise_for_status()
+            if r.json().get("msg_type") != "HELLO":
+                return f"unexpected reply: {r.json().get('msg_type')}"
+    except Exception as ex:
+        return str(ex) or type(ex).__name__
+    return None
+
+
+async def probe_once(
+    store: HealthStore,
+    http: httpx.AsyncClient,
+    *,
+    timeout: float = 5.0,
+    concurrency: int = 16,
+    on_result: ProbeCallback | None = None,
+    entry_ids: list[str] | None = None,
+) -> list[Circuit]:
+    """Probe every known provider (or `entry_ids`) concurrently and update circuits."""
+
+    targets = [c for c in store.circuits(entry_ids).values() if c.manifest_url]
+    # A half-open circuit gets one trial: skip those a run (or another prober) is already trying.
+    now = time.time()
+    targets = [c for c in targets if c.trial_until is None or c.trial_until <= now]
+    half_open = [c.entry_id for c in targets if c.state_at(now) == "half_open"]
+    if half_open:
+        denied = store.claim_trials(half_open, at=now)
+        targets = [c for c in targets if c.entry_id not in denied]
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(c: Circuit) -> Circuit:
+        assert c.manifest_url is not None
+        async with sem:
+            error = await probe_provider(http, c.manifest_url, timeout=timeout)
+        after = store.record_probe(c.entry_id, ok=error is None)
+        if on_result is not None:
+            on_result(after, error is None, error)
+        return after
+
+    return list(await asyncio.gather(*(_one(c) for c in targets)))
+
+
+async def probe_forever(
+    store: HealthStore,
+    http: httpx.AsyncClient,
+    settings: HealthSettings,
+    *,
+    timeout: float = 5.0,
+    on_result: ProbeCallback | None = None,
+) -> None:
+    """Keep probing known providers, each on its own jittered schedule.
+
+    Jitter (`probe_jitter` of `probe_interval`) spreads probes out so many
+    daemons don't hit a provider in lockstep. Providers recorded by later
+    runs are picked up on the next round.
+    """
+
+    due: dict[str, float] = {}
+
+    def _next(now: float) -> float:
+        j = settings.probe_jitter
+        return now + settings.probe_interval * random.uniform(1 - j, 1 + j)
+
+    while True:
+        now = time.time()
+        for entry_id, c in store.circuits().items():
+            if c.manifest_url and entry_id not in due:
+                # First probe lands anywhere in the first interval.
+                due[entry_id] = now + settings.probe_interval * random.random()
+        ready = [entry_id for entry_id, t in due.items() if t <= now]
+        if ready:
+            await probe_once(store, http, timeout=timeout, on_result=on_result, entry_ids=ready)
+            now = time.time()
+            for entry_id in ready:
+                due[entry_id] = _next(now)
+        wake = min(due.values(), default=now + settings.probe_interval)
+        await asyncio.sleep(max(0.05, min(wake - time.time(), settings.probe_interval)))
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import heapq
+from typing import TYPE_CHECKING, Sequence
+
+from mrpd.core.scoring import AnyEntry, ScoreResult, _features, score_entry
+
+if TYPE_CHECKING:
+    from mrpd.core.health import HealthView
+    from mrpd.core.intent import IntentView
+
+try:  # Optional: batch scoring is vectorized when NumPy is installed.
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised without the extra
+    np = None  # type: ignore[assignment]
+
+
+class RankIndex:
+    """Columnar scoring index for ranking a fixed set of entries many times.
+
+    Capabilities and policies become integer posting lists, trust and proof
+    counts become columns. `top_k` computes every score in one batch (NumPy
+    when available), keeps only candidates at or above the k-th best score,
+    and orders those by the full `ScoreResult.rank_key`, so results match
+    `rank_entries` exactly (intent bonuses and health penalties included,
+    open circuits left out). Without NumPy it falls back to a heap selection.
+    """
+
+    def __init__(self, entries: Sequence[AnyEntry]) -> None:
+        self.entries = entries
+        n = len(entries)
+        caps: dict[str, list[int]] = {}
+        pols: dict[str, list[int]] = {}
+        trust = [0.0] * n
+        proofs = [0] * n
+        for i, e in enumerate(entries):
+            c, p, t, pc = _features(e)
+            for cap in c:
+                caps.setdefault(cap, []).append(i)
+            for pol in p:
+                pols.setdefault(pol, []).append(i)
+            if t is not None:
+                trust[i] = float(t)
+            proofs[i] = pc
+        self._caps = caps
+        self._pols = pols
+        self._trust = trust
+        self._proofs = proofs
+        self._names = [(e.name or "").lower() for e in entries]
+        self._ids = [e.id for e in entries]
+        self._arrays: dict[str, object] | None = None
+        self._by_id: dict[str, list[int]] | None = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def top_k(
+        self,
+        k: int,
+        *,
+        capability: str | None,
+        policy: str | None,
+        health: "HealthView | None" = None,
+        intent: "IntentView | None" = None,
+    ) -> tuple[list[ScoreResult], list[ScoreResult]]:
+        """Best `k` satisfying results and best `k` overall, each in rank order."""
+
+        if not self.entries:
+            return [], []
+        bonuses = self._bonuses(intent)
+        penalties = self._penalties(health)
+        excluded = self._excluded(health)
+        if np is not None:
+            satisfying, ranked = self._select_numpy(k, capability, policy, bonuses, penalties, excluded)
+        else:
+            satisfying, ranked = self._select_python(k, capability, policy, bonuses, penalties, excluded)
+
+        def score(i: int) -> ScoreResult:
+            return score_entry(self.entries[i], capability=capability, policy=policy, health=health, intent=intent)
+
+        return [score(i) for i in satisfying], [score(i) for i in ranked]
+
+    def _bonuses(self, intent: "IntentView | None") -> dict[int, float]:
+        if intent is None or not intent.relevance:
+            return {}
+        out: dict[int, float] = {}
+        for entry_id in intent.relevance:
+            for i in self._positions(entry_id):
+                out[i] = intent.bonus(entry_id)[0]
+        return out
+
+    def _positions(self, entry_id: str) -> list[int]:
+        if self._by_id is None:
+            self._by_id = {}
+            for i, eid in enumerate(self._ids):
+                self._by_id.setdefault(eid, []).append(i)
+        return self._by_id.get(entry_id, [])
+
+    def _penalties(self, health: "HealthView | None") -> dict[int, float]:
+        if health is None or not health.stats:
+            return {}
+        out: dict[int, float] = {}
+        for entry_id in health.stats:
+            for i in self._positions(entry_id):
+                out[i] = health.penalty(entry_id)[0]
+        return out
+
+    def _excluded(self, health: "HealthView | None") -> set[int]:
+        if health is None or not health.open_ids:
+            return set()
+        return {i for entry_id in health.open_ids for i in self._positions(entry_id)}
+
+    def _select_numpy(
+        self,
+        k: int,
+        capability: str | None,
+        policy: str | None,
+        bonuses: dict[int, float],
+        penalties: dict[int, float],
+        excluded: set[int],
+    ) -> tuple[list[int], list[int]]:
+        if self._arrays is None:
+            self._arrays = {
+                "trust": np.asarray(self._trust, dtype=np.float64),
+                "proofs": np.asarray(self._proofs, dtype=np.int64),
+                "names": np.asarray(self._names, dtype=np.str_),
+                "ids": np.asarray(self._ids, dtype=np.str_),
+            }
+        a = self._arrays
+        n = len(self.entries)
+        has_cap = np.zeros(n, dtype=bool)
+        has_pol = np.zeros(n, dtype=bool)
+        if capability and capability in self._caps:
+            has_cap[self._caps[capability]] = True
+        if policy and policy in self._pols:
+            has_pol[self._pols[policy]] = True
+
+        # Same additions, in the same order, as score_entry (bit-identical floats).
+        score = np.zeros(n, dtype=np.float64)
+        required = np.zeros(n, dtype=np.int64)
+        satisfied = np.ones(n, dtype=bool)
+        if capability:
+            score += np.where(has_cap, 50.0, 0.0)
+            required += has_cap
+            satisfied &= has_cap
+        if policy:
+            score += np.where(has_pol, 20.0, 0.0)
+            required += has_pol
+            satisfied &= has_pol
+        score += 10.0 * a["trust"]
+        if capability and policy:
+            score += np.where(has_cap & has_pol, 5.0, 0.0)
+        if bonuses:
+            bonus = np.zeros(n, dtype=np.float64)
+            bonus[list(bonuses)] = list(bonuses.values())
+            score += bonus
+        if penalties:
+            pen = np.zeros(n, dtype=np.float64)
+            pen[list(penalties)] = list(penalties.values())
+            score -= pen
+
+        def _best(idx: "np.ndarray") -> list[int]:
+            if idx.size == 0:
+                return []
+            s = score[idx]
+            if idx.size > k:
+                # Threshold at the k-th best score; keep every tie so the full key decides.
+                kth = np.partition(s, idx.size - k)[idx.size - k]
+                idx = idx[s >= kth]
+            order = np.lexsort(
+                (a["ids"][idx], a["names"][idx], -a["proofs"][idx], -a["trust"][idx], -required[idx], -score[idx])
+            )
+            return idx[order[:k]].tolist()
+
+        usable = np.ones(n, dtype=bool)
+        if excluded:
+            usable[list(excluded)] = False
+        return _best(np.flatnonzero(satisfied & usable)), _best(np.flatnonzero(usable))
+
+    def _select_python(
+        self,
+        k: int,
+        capability: str | None,
+        policy: str | None,
+        bonuses: dict[int, float],
+        penalties: dict[int, float],
+        excluded: set[int],
+    ) -> tuple[list[int], list[int]]:
+        n = len(self.entries)
+        has_cap = set(self._caps.get(capability, ())) if capability else set()
+        has_pol = set(self._pols.get(policy, ())) if policy else set()
+
+        def key(i: int) -> tuple:
+            c = i in has_cap
+            p = i in has_pol
+            score = 0.0
+            if c:
+                score += 50.0
+            if p:
+                score += 20.0
+            score += 10.0 * self._trust[i]
+            if c and p:
+                score += 5.0
+            if i in bonuses:
+                score += bonuses[i]
+            if i in penalties:
+                score -= penalties[i]
+            return (-score, -(c + p), -self._trust[i], -self._proofs[i], self._names[i], self._ids[i])
+
+        if capability and policy:
+            sat: Sequence[int] = sorted(has_cap & has_pol)
+        elif capability:
+            sat = sorted(has_cap)
+        elif policy:
+            sat = sorted(has_pol)
+        else:
+            sat = range(n)
+        if excluded:
+            sat = [i for i in sat if i not in excluded]
+        usable = [i for i in range(n) if i not in excluded] if excluded else range(n)
+        return heapq.nsmallest(k, sat, key=key), heapq.nsmallest(k, usable, key=key)
+
+
+def rank_top_k(
+    entries: Sequence[AnyEntry],
+    k: int,
+    *,
+    capability: str | None,
+    policy: str | None,
+    health: "HealthView | None" = None,
+    intent: "IntentView | None" = None,
+) -> tuple[list[ScoreResult], list[ScoreResult]]:
+    """One-shot `RankIndex(entries).top_k(...)`."""
+
+    return RankIndex(entries).top_k(k, capability=capability, policy=policy, health=health, intent=intent)
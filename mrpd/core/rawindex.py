@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import codecs
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Optional
+
+from mrpd.core.compact import CompactEntry, intern_strings, trust_score
+from mrpd.core.models import RegistryEntry
+
+
+INDEX_SUFFIX = ".mrpidx"
+INDEX_VERSION = 4
+_CHUNK = 1 << 20
+_WS = re.compile(r"[ \t\n\r]*")
+
+
+class JsonArrayReader:
+    """Incremental parser for a top-level JSON array.
+
+    Feed raw bytes as they arrive; each complete item is returned together
+    with its byte offset and length in the source, so callers can index
+    items without holding the whole document in memory.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._byte_pos = 0
+        self._started = False
+        self.done = False
+
+    def feed(self, chunk: bytes, *, final: bool = False) -> list[tuple[Any, int, int]]:
+        self._buf = self._buf[self._pos :] + self._utf8.decode(chunk, final=final)
+        self._pos = 0
+        out: list[tuple[Any, int, int]] = []
+        buf = self._buf
+        while not self.done:
+            self._skip(_WS)
+            if self._pos >= len(buf):
+                break
+            ch = buf[self._pos]
+            if not self._started:
+                if ch != "[":
+                    raise ValueError("bootstrap registry did not return a list")
+                self._started = True
+                self._advance(1)
+                continue
+            if ch == "]":
+                self._advance(1)
+                self.done = True
+                break
+            if ch == ",":
+                self._advance(1)
+                continue
+            try:
+                obj, end = self._decoder.raw_decode(buf, self._pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break
+            # A value ending exactly at the buffer edge may be truncated (e.g. a number).
+            if end >= len(buf) and not final:
+                break
+            length = len(buf[self._pos : end].encode("utf-8"))
+            out.append((obj, self._byte_pos, length))
+            self._pos = end
+            self._byte_pos += length
+        if final and not self.done:
+            raise ValueError("bootstrap registry list is truncated")
+        return out
+
+    def _skip(self, pattern: re.Pattern[str]) -> None:
+        m = pattern.match(self._buf, self._pos)
+        if m:
+            self._advance(m.end() - self._pos)
+
+    def _advance(self, n: int) -> None:
+        # Only ASCII structural characters and whitespace are skipped this way.
+        self._pos += n
+        self._byte_pos += n
+
+
+def _str_list(value: Any) -> list[str]:
+    return [v for v in value if isinstance(v, str)] if isinstance(value, list) else []
+
+
+class RawRegistryIndex:
+    """Capability/policy index over a local bootstrap registry file.
+
+    The file is parsed once, streaming, and the index (byte spans per entry
+    plus capability and policy postings) is saved next to it as
+    `<file>.mrpidx`. Later loads reuse it while the file's size and mtime
+    are unchanged, or its sha256 still matches; queries then only read and
+    validate the matching entries. Items without a string `id`, repeats of
+    an id already indexed and trust scores outside 0..1 are left out and
+    counted in `skipped`.
+    """
+
+    def __init__(self, path: Path, meta: dict[str, Any]) -> None:
+        self.path = path
+        self.meta = meta
+        self.ids: list[str] = meta["ids"]
+        self.spans: list[list[int]] = meta["spans"]
+        self.capabilities: dict[str, list[int]] = meta["capabilities"]
+        self.policies: dict[str, list[int]] = meta["policies"]
+        # Per-entry columns for compact scoring, in the same order as `ids`.
+        self.names: list[str] = meta["names"]
+        self.manifest_urls: list[str] = meta["manifest_urls"]
+        self.trust: list[Optional[float]] = meta["trust"]
+        self.proofs: list[int] = meta["proofs"]
+        # {"invalid_id": n, "duplicate_id": n}: items left out of the index.
+        self.skipped: dict[str, int] = meta["skipped"]
+        self._entry_caps: Optional[list[tuple[str, ...]]] = None
+        self._entry_pols: Optional[list[tuple[str, ...]]] = None
+
+    @staticmethod
+    def index_path(path: Path) -> Path:
+        return path.with_name(path.name + INDEX_SUFFIX)
+
+    @classmethod
+    def open(cls, path: str | Path) -> "RawRegistryIndex":
+        path = Path(path)
+        st = path.stat()
+        idx_path = cls.index_path(path)
+        meta = cls._load_meta(idx_path)
+        if meta is not None and meta["size"] == st.st_size:
+            if meta["mtime_ns"] == st.st_mtime_ns:
+                return cls(path, meta)
+            # Touched but possibly unchanged: confirm by content hash.
+            if meta["sha256"] == _file_sha256(path):
+                meta["mtime_ns"] = st.st_mtime_ns
+                _save_meta(idx_path, meta)
+                return cls(path, meta)
+        meta = cls._build(path)
+        _save_meta(idx_path, meta)
+        return cls(path, meta)
+
+    @staticmethod
+    def _load_meta(idx_path: Path) -> Optional[dict[str, Any]]:
+        try:
+            meta = json.loads(idx_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(meta, dict) or meta.get("version") != INDEX_VERSION:
+            return None
+        return meta
+
+    @staticmethod
+    def _build(path: Path) -> dict[str, Any]:
+        st = path.stat()
+        digest = hashlib.sha256()
+        reader = JsonArrayReader()
+        ids: list[str] = []
+        spans: list[list[int]] = []
+        names: list[str] = []
+        manifest_urls: list[str] = []
+        trust: list[Optional[float]] = []
+        proofs: list[int] = []
+        seen: set[str] = set()
+        capabilities: dict[str, list[int]] = {}
+        policies: dict[str, list[int]] = {}
+        skipped = {"invalid_id": 0, "duplicate_id": 0, "invalid_trust": 0}
+
+        def _add(items: list[tuple[Any, int, int]]) -> None:
+            for item, offset, length in items:
+                if not isinstance(item, dict) or not item.get("manifest_url"):
+                    continue
+                entry_id = item.get("id")
+                if not isinstance(entry_id, str):
+                    skipped["invalid_id"] += 1
+                    continue
+                if entry_id in seen:
+                    skipped["duplicate_id"] += 1
+                    continue
+                try:
+                    score = trust_score(item.get("trust"))
+                except ValueError:
+                    skipped["invalid_trust"] += 1
+                    continue
+                seen.add(entry_id)
+                n = len(ids)
+                ids.append(entry_id)
+                spans.append([offset, length])
+                name = item.get("name")
+                names.append(name if isinstance(name, str) else "")
+                manifest_urls.append(str(item["manifest_url"]))
+                trust.append(score)
+                p = item.get("proofs")
+                proofs.append(len(p) if isinstance(p, list) else 0)
+                for cap in dict.fromkeys(_str_list(item.get("capabilities"))):
+                    capabilities.setdefault(cap, []).append(n)
+                for pol in dict.fromkeys(_str_list(item.get("policies"))):
+                    policies.setdefault(pol, []).append(n)
+
+        with path.open("rb") as f:
+            while chunk := f.read(_CHUNK):
+                digest.update(chunk)
+                _add(reader.feed(chunk))
+            _add(reader.feed(b"", final=True))
+
+        return {
+            "version": INDEX_VERSION,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": digest.hexdigest(),
+            "ids": ids,
+            "spans": spans,
+            "capabilities": capabilities,
+            "policies": policies,
+            "names": names,
+            "manifest_urls": manifest_urls,
+            "trust": trust,
+            "proofs": proofs,
+            "skipped": skipped,
+        }
+
+    def lookup(self, *, capability: Optional[str] = None, policy: Optional[str] = None) -> list[int]:
+        """Ordinals (file order) of entries matching both filters."""
+
+        postings: list[list[int]] = []
+        if capability:
+            postings.append(self.capabilities.get(capability, []))
+        if policy:
+            postings.append(self.policies.get(policy, []))
+        if not postings:
+            return list(range(len(self.ids)))
+        postings.sort(key=len)
+        result = postings[0]
+        for other in postings[1:]:
+            keep = set(other)
+            result = [n for n in result if n in keep]
+        return result
+
+    def entries(self, ordinals: list[int]) -> list[RegistryEntry]:
+        out: list[RegistryEntry] = []
+        with self.path.open("rb") as f:
+            for n in ordinals:
+                offset, length = self.spans[n]
+                f.seek(offset)
+                out.append(RegistryEntry.model_validate_json(f.read(length)))
+        return out
+
+    def entry(self, n: int) -> RegistryEntry:
+        return self.entries([n])[0]
+
+    def _invert_postings(self) -> None:
+        caps: list[list[str]] = [[] for _ in self.ids]
+        pols: list[list[str]] = [[] for _ in self.ids]
+        for cap, ords in self.capabilities.items():
+            for n in ords:
+                caps[n].append(cap)
+        for pol, ords in self.policies.items():
+            for n in ords:
+                pols[n].append(pol)
+        self._entry_caps = [intern_strings(c) for c in caps]
+        self._entry_pols = [intern_strings(p) for p in pols]
+
+    def compact(self, *, capability: Optional[str] = None, policy: Optional[str] = None) -> list[CompactEntry]:
+        """Matching entries as `CompactEntry` rows; nothing is read from the file until materialized."""
+
+        if self._entry_caps is None:
+            self._invert_postings()
+        assert self._entry_caps is not None and self._entry_pols is not None
+        return [
+            CompactEntry(
+                self.ids[n],
+                self.names[n],
+                self.manifest_urls[n],
+                self._entry_caps[n],
+                self._entry_pols[n],
+                self.trust[n],
+                self.proofs[n],
+                lambda n=n: self.entry(n),
+            )
+            for n in self.lookup(capability=capability, policy=policy)
+        ]
+
+    def query(self, *, capability: Optional[str] = None, policy: Optional[str] = None) -> list[RegistryEntry]:
+        return self.entries(self.lookup(capability=capability, policy=policy))
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _save_meta(idx_path: Path, meta: dict[str, Any]) -> None:
+    # Best effort: a read-only directory just means re-indexing next time.
+    tmp = idx_path.with_name(f"{idx_path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_text(json.dumps(meta, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, idx_path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+_open_indexes: dict[Path, RawRegistryIndex] = {}
+
+
+def open_raw_index(path: str | Path) -> RawRegistryIndex:
+    """Open (or reuse within this process) the index for a bootstrap file."""
+
+    path = Path(path).resolve()
+    st = path.stat()
+    idx = _open_indexes.get(path)
+    if idx is None or idx.meta["size"] != st.st_size or idx.meta["mtime_ns"] != st.st_mtime_ns:
+        idx = RawRegistryIndex.open(path)
+        _open_indexes[path] = idx
+    return idx
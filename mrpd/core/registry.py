@@ -1,14 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
-from typing import Optional
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, TypeVar
 from urllib.parse import urlparse
 
 import httpx
 
+from mrpd.core.cache import HttpCache, cache_key
+from mrpd.core.compact import CompactEntry, CompactPage
+from mrpd.core.config import Config, RegistrySource
 from mrpd.core.defaults import MRP_BOOTSTRAP_REGISTRY_RAW, MRP_DEFAULT_REGISTRY_BASE
+from mrpd.core.mirror import RegistryMirror
 from mrpd.core.models import RegistryEntry, RegistryQueryResponse
+from mrpd.core.rawindex import JsonArrayReader, open_raw_index
 
 
 def normalize_manifest_endpoints(manifest: dict, manifest_url: str) -> dict:
@@ -32,9 +39,28 @@ def normalize_manifest_endpoints(manifest: dict, manifest_url: str) -> dict:
 
 
 class RegistryClient:
-    def __init__(self, base_url: str = MRP_DEFAULT_REGISTRY_BASE, timeout: float = 10.0) -> None:
+    def __init__(
+        self,
+        base_url: str = MRP_DEFAULT_REGISTRY_BASE,
+        timeout: float = 10.0,
+        *,
+        cache: HttpCache | None = None,
+        cache_ttl: float = 60.0,
+        http: httpx.AsyncClient | None = None,
+        mirror: RegistryMirror | None = None,
+        offline: bool = False,
+    ) -> None:
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        # Optional shared (pooled) client; otherwise one is opened per request.
+        self.http = http
+        # Local mirror: the only source when offline, else a fallback before the raw list.
+        self.mirror = mirror
+        self.offline = offline
+        if offline and mirror is None:
+            raise ValueError("offline RegistryClient needs a mirror")
 
     async def query(
         self,
@@ -44,8 +70,65 @@ class RegistryClient:
         limit: int = 50,
         cursor: Optional[str] = None,
     ) -> RegistryQueryResponse:
-        """Query the MRP registry API. Falls back to raw GitHub JSON if API is unavailable."""
+        """Query the MRP registry API. Falls back to raw GitHub JSON if API is unavailable.
+
+        With a cache, fresh or stale-but-usable responses are served from disk first.
+        """
+
+        try:
+            return await self.query_api(capability=capability, policy=policy, limit=limit, cursor=cursor)
+        except Exception:
+            if self.mirror is not None and self.mirror.count():
+                return self.mirror.query(capability=capability, policy=policy, limit=limit)
+            return await self.query_raw(capability=capability, policy=policy)
+
+    async def query_api(
+        self,
+        *,
+        capability: Optional[str] = None,
+        policy: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        updated_since: Optional[str] = None,
+    ) -> RegistryQueryResponse:
+        """Query the registry API only; raises if it (and the cache) cannot answer.
+
+        Offline clients answer from the local mirror instead.
+        """
+
+        if self.offline:
+            assert self.mirror is not None
+            return self.mirror.query(capability=capability, policy=policy, limit=limit, cursor=cursor)
+        data = await self._query_data(
+            capability=capability, policy=policy, limit=limit, cursor=cursor, updated_since=updated_since
+        )
+        return RegistryQueryResponse.model_validate(data)
+
+    async def query_compact(
+        self,
+        *,
+        capability: Optional[str] = None,
+        policy: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> CompactPage:
+        """`query_api`, but returning unvalidated `CompactEntry` rows."""
+
+        if self.offline:
+            assert self.mirror is not None
+            return self.mirror.query_compact(capability=capability, policy=policy, limit=limit, cursor=cursor)
+        data = await self._query_data(capability=capability, policy=policy, limit=limit, cursor=cursor)
+        return CompactPage.from_data(data)
 
+    async def _query_data(
+        self,
+        *,
+        capability: Optional[str],
+        policy: Optional[str],
+        limit: int,
+        cursor: Optional[str],
+        updated_since: Optional[str] = None,
+    ) -> Any:
         url = f"{self.base_url}/mrp/registry/query"
         params = {"limit": str(limit)}
         if capability:
@@ -54,62 +137,557 @@ class RegistryClient:
             params["policy"] = policy
         if cursor:
             params["cursor"] = cursor
+        if updated_since:
+            params["updated_since"] = updated_since
 
-        try:
+        async def _get(extra_headers: dict[str, str]) -> httpx.Response:
+            headers = {"Accept": "application/json", **extra_headers}
+            if self.http is not None:
+                return await self.http.get(url, params=params, headers=headers, timeout=self.timeout)
             async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=False) as client:
-                r = await client.get(url, params=params, headers={"Accept": "application/json"})
-                r.raise_for_status()
-                return RegistryQueryResponse.model_validate(r.json())
-        except Exception:
-            entries = await self._fetch_raw_entries()
-            if capability:
-                entries = [e for e in entries if capability in e.capabilities]
-            if policy:
-                entries = [e for e in entries if policy in e.policies]
+                return await client.get(url, params=params, headers=headers)
+
+        if self.cache is not None:
+            data = await self.cache.get_json(cache_key("registry", url, params), _get, ttl=self.cache_ttl)
+        else:
+            r = await _get({})
+            r.raise_for_status()
+            data = r.json()
+        return data
+
+    async def iter_pages(
+        self,
+        *,
+        capability: Optional[str] = None,
+        policy: Optional[str] = None,
+        page_size: int = 50,
+        max_entries: Optional[int] = None,
+    ) -> AsyncIterator[RegistryQueryResponse]:
+        """Follow `next_page` cursors, prefetching the next page while the caller works.
+
+        If the first page cannot be fetched from the API, the local mirror
+        (if populated) or the bootstrap raw list answers instead, as `query`
+        does. Stops after `max_entries`.
+        """
+
+        async def _page(cursor: Optional[str]) -> RegistryQueryResponse:
+            return await self.query_api(capability=capability, policy=policy, limit=page_size, cursor=cursor)
+
+        async def _fallback() -> AsyncIterator[RegistryQueryResponse]:
+            if self.mirror is not None and self.mirror.count():
+                # Walk the mirror instead (it pages by cursor too).
+                offline = RegistryClient(self.base_url, mirror=self.mirror, offline=True)
+                async for page in offline.iter_pages(
+                    capability=capability, policy=policy, page_size=page_size, max_entries=max_entries
+                ):
+                    yield page
+                return
+            yield await self.query_raw(capability=capability, policy=policy)
+
+        async for page in _follow(_page, _fallback, max_entries):
+            yield page
+
+    async def iter_compact_pages(
+        self,
+        *,
+        capability: Optional[str] = None,
+        policy: Optional[str] = None,
+        page_size: int = 50,
+        max_entries: Optional[int] = None,
+    ) -> AsyncIterator[CompactPage]:
+        """`iter_pages` yielding `CompactPage`s, for bulk scoring."""
+
+        async def _page(cursor: Optional[str]) -> CompactPage:
+            return await self.query_compact(capability=capability, policy=policy, limit=page_size, cursor=cursor)
+
+        async def _fallback() -> AsyncIterator[CompactPage]:
+            if self.mirror is not None and self.mirror.count():
+                offline = RegistryClient(self.base_url, mirror=self.mirror, offline=True)
+                async for page in offline.iter_compact_pages(
+                    capability=capability, policy=policy, page_size=page_size, max_entries=max_entries
+                ):
+                    yield page
+                return
+            path = raw_file_path()
+            if path is not None:
+                index = await asyncio.to_thread(open_raw_index, path)
+                yield CompactPage(results=index.compact(capability=capability, policy=policy))
+                return
+            yield CompactPage.from_response(await self.query_raw(capability=capability, policy=policy))
+
+        async for page in _follow(_page, _fallback, max_entries):
+            yield page
+
+    async def iter_entries(
+        self,
+        *,
+        capability: Optional[str] = None,
+        policy: Optional[str] = None,
+        page_size: int = 50,
+        max_entries: Optional[int] = None,
+    ) -> AsyncIterator[RegistryEntry]:
+        """Stream registry entries across pages (see `iter_pages`)."""
+
+        count = 0
+        async for page in self.iter_pages(
+            capability=capability, policy=policy, page_size=page_size, max_entries=max_entries
+        ):
+            for e in page.results:
+                if max_entries is not None and count >= max_entries:
+                    return
+                count += 1
+                yield e
+
+    async def iter_compact(
+        self,
+        *,
+        capability: Optional[str] = None,
+        policy: Optional[str] = None,
+        page_size: int = 50,
+        max_entries: Optional[int] = None,
+    ) -> AsyncIterator[CompactEntry]:
+        """Stream `CompactEntry` rows across pages (see `iter_compact_pages`)."""
+
+        count = 0
+        async for page in self.iter_compact_pages(
+            capability=capability, policy=policy, page_size=page_size, max_entries=max_entries
+        ):
+            for e in page.results:
+                if max_entries is not None and count >= max_entries:
+                    return
+                count += 1
+                yield e
+
+    async def query_raw(self, *, capability: Optional[str] = None, policy: Optional[str] = None) -> RegistryQueryResponse:
+        """Answer a query from the bootstrap raw registry list (if configured).
+
+        Local files are served from a persisted capability/policy index, so
+        only matching entries are read and validated.
+        """
+
+        path = raw_file_path()
+        if path is not None:
+            index = await asyncio.to_thread(open_raw_index, path)
+            entries = await asyncio.to_thread(index.query, capability=capability, policy=policy)
             return RegistryQueryResponse(results=entries)
 
+        entries = await self._fetch_raw_entries()
+        if capability:
+            entries = [e for e in entries if capability in e.capabilities]
+        if policy:
+            entries = [e for e in entries if policy in e.policies]
+        return RegistryQueryResponse(results=entries)
+
     async def _fetch_raw_entries(self) -> list[RegistryEntry]:
         raw_url = os.getenv("MRP_BOOTSTRAP_REGISTRY_RAW") or MRP_BOOTSTRAP_REGISTRY_RAW
         if not raw_url:
             # No bootstrap configured; callers should rely on the hosted registry API.
             return []
 
-        if raw_url.startswith("file://"):
-            path = raw_url[len("file://") :]
-            # Windows file URLs sometimes come through as /C:/...
-            if len(path) >= 3 and path[0] == "/" and path[2] == ":":
-                path = path[1:]
-            payload = json.loads(open(path, "r", encoding="utf-8").read())
-        else:
-            async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=False) as client:
-                r = await client.get(raw_url, headers={"Accept": "application/json"})
-                r.raise_for_status()
-                payload = r.json()
+        path = raw_file_path()
+        if path is not None:
+            index = await asyncio.to_thread(open_raw_index, path)
+            return await asyncio.to_thread(index.query)
 
-        if not isinstance(payload, list):
-            raise ValueError("bootstrap registry did not return a list")
+        # Parse the remote list as it streams in rather than buffering the whole body.
+        reader = JsonArrayReader()
+        dedup: dict[str, RegistryEntry] = {}
 
-        entries: list[RegistryEntry] = []
-        for item in payload:
-            if not isinstance(item, dict) or not item.get("manifest_url"):
-                continue
-            entries.append(RegistryEntry.model_validate(item))
+        def _add(items: list[tuple[object, int, int]]) -> None:
+            for item, _offset, _length in items:
+                if not isinstance(item, dict) or not item.get("manifest_url"):
+                    continue
+                e = RegistryEntry.model_validate(item)
+                if e.id not in dedup:
+                    dedup[e.id] = e
 
-        dedup: dict[str, RegistryEntry] = {}
-        for e in entries:
-            if e.id not in dedup:
-                dedup[e.id] = e
+        async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=False) as client:
+            async with client.stream("GET", raw_url, headers={"Accept": "application/json"}) as r:
+                r.raise_for_status()
+                async for chunk in r.aiter_bytes():
+                    _add(reader.feed(chunk))
+        _add(reader.feed(b"", final=True))
         return list(dedup.values())
 
 
-async def fetch_manifest(manifest_url: str, timeout: float = 10.0) -> dict:
+_Page = TypeVar("_Page", RegistryQueryResponse, CompactPage)
+
+
+async def _follow(
+    fetch: Callable[[Optional[str]], Awaitable[_Page]],
+    fallback: Callable[[], AsyncIterator[_Page]],
+    max_entries: Optional[int],
+) -> AsyncIterator[_Page]:
+    # Cursor walk with one page of prefetch; `fallback` answers if the first page fails.
+    try:
+        first = await fetch(None)
+    except Exception:
+        async for page in fallback():
+            yield page
+        return
+
+    page: Optional[_Page] = first
+    next_task: Optional[asyncio.Task[_Page]] = None
+    fetched = 0
+    try:
+        while page is not None:
+            fetched += len(page.results)
+            if page.next_page and page.results and (max_entries is None or fetched < max_entries):
+                next_task = asyncio.create_task(fetch(page.next_page))
+            yield page
+            if next_task is None:
+                break
+            page, next_task = await next_task, None
+    finally:
+        if next_task is not None:
+            next_task.cancel()
+
+
+def raw_file_path() -> Optional[str]:
+    """Local path of the bootstrap raw list, if `MRP_BOOTSTRAP_REGISTRY_RAW` is a file:// URL."""
+
+    raw_url = os.getenv("MRP_BOOTSTRAP_REGISTRY_RAW") or MRP_BOOTSTRAP_REGISTRY_RAW
+    if not raw_url or not raw_url.startswith("file://"):
+        return None
+    path = raw_url[len("file://") :]
+    # Windows file URLs sometimes come through as /C:/...
+    if len(path) >= 3 and path[0] == "/" and path[2] == ":":
+        path = path[1:]
+    return path
+
+
+def merge_key(entry: RegistryEntry) -> str:
+    return entry.canonical_id or entry.id
+
+
+def _merge_rank(entry: RegistryEntry, source_index: int) -> tuple[int, int]:
+    # Lower is better: provider records beat indexed ones, then earlier-configured registries win.
+    return (0 if entry.kind == "provider" else 1 if entry.kind is None else 2, source_index)
+
+
+class FederatedRegistryClient:
+    """Query several registries concurrently and merge results by `canonical_id`.
+
+    Each registry gets its own timeout. A registry that has not answered
+    within `hedge_delay` seconds is sent a second, identical request and the
+    first reply wins. Merging prefers `provider` over `indexed` entries, then
+    registries in configuration order, so the merged set is deterministic
+    regardless of arrival order.
+    """
+
+    def __init__(
+        self,
+        sources: list[RegistrySource],
+        *,
+        timeout: float = 10.0,
+        hedge_delay: float | None = 1.0,
+        straggler_grace: float | None = None,
+        cache: HttpCache | None = None,
+        cache_ttl: float = 60.0,
+        http: httpx.AsyncClient | None = None,
+        mirror: RegistryMirror | None = None,
+    ) -> None:
+        if not sources:
+            raise ValueError("FederatedRegistryClient needs at least one registry source")
+        self.sources = list(sources)
+        self.clients = [
+            RegistryClient(
+                src.base_url,
+                src.timeout or timeout,
+                cache=cache,
+                cache_ttl=cache_ttl,
+                http=http,
+            )
+            for src in self.sources
+        ]
+        self.hedge_delay = hedge_delay
+        self.straggler_grace = straggler_grace
+        # Local mirror: answers (before the raw list) when no registry does.
+        self.mirror = mirror
+        self.errors: dict[str, str] = {}
+
+    async def _hedged(self, client: RegistryClient, **query: object) -> RegistryQueryResponse:
+        first = asyncio.create_task(client.query_api(**query))  # type: ignore[arg-type]
+        tasks = [first]
+        try:
+            if self.hedge_delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay)
+                if not done:
+                    tasks.append(asyncio.create_task(client.query_api(**query)))  # type: ignore[arg-type]
+            pending = set(tasks)
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    if t.exception() is None:
+                        return t.result()
+                    error = t.exception()
+            assert error is not None
+            raise error
+        finally:
+            for t in tasks:
+                t.cancel()
+
+    async def iter_query(
+        self,
+        *,
+        capability: Optional[str] = None,
+        policy: Optional[str] = None,
+        limit: int = 50,
+        max_entries: Optional[int] = None,
+    ) -> AsyncIterator[tuple[str, list[RegistryEntry]]]:
+        """Yield `(registry name, merged entries so far)` each time a registry answers a page.
+
+        Each registry's `next_page` cursor is followed (`limit` entries per
+        request) until it has returned `max_entries`, so consumers can start
+        ranking on the first snapshot. With `straggler_grace` set, requests
+        still outstanding that long after the latest answer are abandoned.
+        A registry whose later page fails keeps the entries it already gave.
+        """
+
+        self.errors = {}
+        merged: dict[str, tuple[tuple[int, int], RegistryEntry]] = {}
+        fetched = [0] * len(self.clients)
+
+        async def _one(i: int, cursor: Optional[str]) -> tuple[int, RegistryQueryResponse]:
+            client = self.clients[i]
+            res = await asyncio.wait_for(
+                self._hedged(client, capability=capability, policy=policy, limit=limit, cursor=cursor),
+                timeout=client.timeout,
+            )
+            return i, res
+
+        tasks = {asyncio.create_task(_one(i, None)): i for i in range(len(self.clients))}
+        pending = set(tasks)
+        answered = False
+        try:
+            while pending:
+                timeout = self.straggler_grace if answered else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    for t in pending:
+                        self.errors[self.sources[tasks[t]].name] = "abandoned (slower than straggler grace)"
+                    break
+                for t in done:
+                    name = self.sources[tasks[t]].name
+                    if t.exception() is not None:
+                        self.errors[name] = str(t.exception()) or type(t.exception()).__name__
+                        continue
+                    i, res = t.result()
+                    fetched[i] += len(res.results)
+                    if res.next_page and res.results and (max_entries is None or fetched[i] < max_entries):
+                        nxt = asyncio.create_task(_one(i, res.next_page))
+                        tasks[nxt] = i
+                        pending.add(nxt)
+                    for e in res.results:
+                        rank = _merge_rank(e, i)
+                        key = merge_key(e)
+                        if key not in merged or rank < merged[key][0]:
+                            merged[key] = (rank, e)
+                    answered = True
+                    yield name, [e for _, e in merged.values()]
+        finally:
+            for t in pending:
+                t.cancel()
+
+    async def query(
+        self,
+        *,
+        capability: Optional[str] = None,
+        policy: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> RegistryQueryResponse:
+        """Merged query (up to `limit` entries per registry); the mirror or raw list if none answer.
+
+        `cursor` is accepted for interface parity with `RegistryClient` but
+        ignored: per-registry cursors cannot be combined into one.
+        """
+
+        entries: list[RegistryEntry] | None = None
+        async for _name, snapshot in self.iter_query(
+            capability=capability, policy=policy, limit=limit, max_entries=limit
+        ):
+            entries = snapshot
+        if entries is None:
+            if self.mirror is not None and self.mirror.count():
+                return self.mirror.query(capability=capability, policy=policy, limit=limit)
+            return await self.clients[0].query_raw(capability=capability, policy=policy)
+        return RegistryQueryResponse(results=entries)
+
+    async def iter_entries(
+        self,
+        *,
+        capability: Optional[str] = None,
+        policy: Optional[str] = None,
+        page_size: int = 50,
+        max_entries: Optional[int] = None,
+    ) -> AsyncIterator[RegistryEntry]:
+        """Stream merged entries as registries answer (see `iter_compact_pages`)."""
+
+        async for page in self._iter_merged_pages(
+            capability=capability, policy=policy, page_size=page_size, max_entries=max_entries
+        ):
+            for e in page.results:
+                yield e
+
+    async def iter_compact_pages(
+        self,
+        *,
+        capability: Optional[str] = None,
+        policy: Optional[str] = None,
+        page_size: int = 50,
+        max_entries: Optional[int] = None,
+    ) -> AsyncIterator[CompactPage]:
+        """One `CompactPage` per registry answer, holding the entries it added to the merge.
+
+        A provider is yielded once, in the best version known when it first
+        arrives; a better record found later (e.g. its `provider` entry from
+        a slower registry) only shows in `query()`. Stops after `max_entries`.
+        """
+
+        async for page in self._iter_merged_pages(
+            capability=capability, policy=policy, page_size=page_size, max_entries=max_entries
+        ):
+            yield CompactPage.from_response(page)
+
+    async def _iter_merged_pages(
+        self,
+        *,
+        capability: Optional[str],
+        policy: Optional[str],
+        page_size: int,
+        max_entries: Optional[int],
+    ) -> AsyncIterator[RegistryQueryResponse]:
+        seen: set[str] = set()
+        answered = False
+        snapshots = self.iter_query(capability=capability, policy=policy, limit=page_size, max_entries=max_entries)
+        # Closing the stream early cancels the registry requests still in flight.
+        async with aclosing(snapshots) as stream:
+            async for _name, snapshot in stream:
+                answered = True
+                delta = [e for e in snapshot if merge_key(e) not in seen]
+                if max_entries is not None:
+                    delta = delta[: max_entries - len(seen)]
+                seen.update(merge_key(e) for e in delta)
+                if delta:
+                    yield RegistryQueryResponse(results=delta)
+                if max_entries is not None and len(seen) >= max_entries:
+                    return
+        if not answered:
+            # No registry answered: the local mirror, else the bootstrap raw list, like `query()`.
+            if self.mirror is not None and self.mirror.count():
+                offline = RegistryClient(self.clients[0].base_url, mirror=self.mirror, offline=True)
+                async for page in offline.iter_pages(
+                    capability=capability, policy=policy, page_size=page_size, max_entries=max_entries
+                ):
+                    yield page
+                return
+            res = await self.clients[0].query_raw(capability=capability, policy=policy)
+            yield RegistryQueryResponse(results=res.results[:max_entries])
+
+    async def iter_compact(
+        self,
+        *,
+        capability: Optional[str] = None,
+        policy: Optional[str] = None,
+        page_size: int = 50,
+        max_entries: Optional[int] = None,
+    ) -> AsyncIterator[CompactEntry]:
+        """`iter_entries` as `CompactEntry` rows."""
+
+        async for page in self.iter_compact_pages(
+            capability=capability, policy=policy, page_size=page_size, max_entries=max_entries
+        ):
+            for e in page.results:
+                yield e
+
+
+def registry_client_for(
+    config: Config,
+    registry: str | None = None,
+    *,
+    cache: HttpCache | None = None,
+    http: httpx.AsyncClient | None = None,
+    mirror: RegistryMirror | None = None,
+    offline: bool = False,
+) -> RegistryClient | FederatedRegistryClient:
+    """Pick the registry client for a command.
+
+    Offline, the local mirror answers everything. Otherwise an explicit
+    `--registry` wins; then all `Config.registries` are federated; then the
+    default public registry is used.
+    """
+
+    if offline or registry or not config.registries:
+        return RegistryClient(
+            registry or MRP_DEFAULT_REGISTRY_BASE,
+            cache=cache,
+            cache_ttl=config.cache.registry_ttl,
+            http=http,
+            mirror=mirror,
+            offline=offline,
+        )
+    return FederatedRegistryClient(
+        config.registries,
+        hedge_delay=config.federation.hedge_delay,
+        straggler_grace=config.federation.straggler_grace,
+        cache=cache,
+        cache_ttl=config.cache.registry_ttl,
+        http=http,
+        mirror=mirror,
+    )
+
+
+async def fetch_manifest(
+    manifest_url: str,
+    timeout: float = 10.0,
+    *,
+    cache: HttpCache | None = None,
+    cache_ttl: float = 300.0,
+    http: httpx.AsyncClient | None = None,
+) -> dict:
     if manifest_url.startswith("file://"):
         path = manifest_url[len("file://") :]
         if len(path) >= 3 and path[0] == "/" and path[2] == ":":
             path = path[1:]
         return json.loads(open(path, "r", encoding="utf-8").read())
 
-    async with httpx.AsyncClient(timeout=timeout, follow_redirects=False) as client:
-        r = await client.get(manifest_url, headers={"Accept": "application/mrp-manifest+json, application/json"})
-        r.raise_for_status()
-        return r.json()
+    async def _get(extra_headers: dict[str, str]) -> httpx.Response:
+        headers = {"Accept": "application/mrp-manifest+json, application/json", **extra_headers}
+        if http is not None:
+            return await http.get(manifest_url, headers=headers, timeout=timeout)
+        async with httpx.AsyncClient(timeout=timeout, follow_redirects=False) as client:
+            return await client.get(manifest_url, headers=headers)
+
+    if cache is not None:
+        return await cache.get_json(cache_key("manifest", manifest_url), _get, ttl=cache_ttl)
+
+    r = await _get({})
+    r.raise_for_status()
+    return r.json()
+
+
+def fetch_manifests(
+    manifest_urls: list[str],
+    *,
+    http: httpx.AsyncClient,
+    concurrency: int = 8,
+    timeout: float = 10.0,
+    cache: HttpCache | None = None,
+    cache_ttl: float = 300.0,
+) -> list[asyncio.Task[dict]]:
+    """Start fetching manifests concurrently over a shared client.
+
+    Returns one task per URL, in input order, so callers can await them in
+    rank order while later fetches are still in flight. At most `concurrency`
+    requests run at once.
+    """
+
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(url: str) -> dict:
+        async with sem:
+            return await fetch_manifest(url, timeout, cache=cache, cache_ttl=cache_ttl, http=http)
+
+    return [asyncio.create_task(_one(u)) for u in manifest_urls]
@@ -0,0 +1,515 @@
+from __future__ import annotations
+
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional
+
+import httpx
+
+from mrpd.core.cache import OfferCache
+from mrpd.core.client import MRPClient
+from mrpd.core.config import DispatchSettings
+from mrpd.core.dispatch import (
+    Candidate,
+    DiscoverAttempt,
+    DiscoverResult,
+    ExecuteAttempt,
+    Failure,
+    FailoverPolicy,
+    execute_with_failover,
+    hedged_discover,
+    is_unknown_route,
+)
+from mrpd.core.envelopes import mk_envelope
+from mrpd.core.evidence import AsyncEvidenceWriter
+from mrpd.core.health import HealthStore
+from mrpd.core.offers import OfferConstraints, OfferSelector
+from mrpd.core.registry import normalize_manifest_endpoints
+from mrpd.core.scoring import materialize_valid
+from mrpd.core.util import utc_now_rfc3339
+
+
+Echo = Callable[[str], None]
+
+
+def _quiet(_message: str) -> None:
+    pass
+
+
+@dataclass
+class Job:
+    """One DISCOVER -> EXECUTE request."""
+
+    intent: str
+    url: str
+    capability: str
+    policy: Optional[str] = None
+    max_tokens: Optional[int] = None
+    max_cost: Optional[float] = None
+
+    def discover_payload(self) -> dict:
+        payload: dict = {
+            "intent": self.intent,
+            "inputs": [{"type": "url", "value": self.url}],
+            "constraints": {},
+        }
+        if self.max_cost is not None:
+            payload["constraints"]["max_cost"] = self.max_cost
+        if self.policy:
+            payload["constraints"]["policy"] = [self.policy]
+        # token budget is not in the core schema yet; put it in constraints extension
+        if self.max_tokens is not None:
+            payload["constraints"]["max_context_tokens"] = self.max_tokens
+        return payload
+
+    def offer_constraints(self, selector: OfferSelector) -> OfferConstraints:
+        return selector.constraints(max_cost=self.max_cost, policy=self.policy, capability=self.capability)
+
+
+@dataclass
+class JobResult:
+    job_id: str
+    ok: bool
+    # Final reply (EVIDENCE or ERROR); None if no provider answered.
+    reply: Optional[dict]
+    receiver: Optional[str]
+    total_ms: float
+    # Set when the job never reached EXECUTE.
+    error: Optional[str] = None
+    bundle: Optional[dict] = None
+
+
+def _provider_key(c: Candidate) -> str:
+    return f"{c.receiver_id}@{c.discover_url}"
+
+
+def _envelope_meta(env: dict | None) -> dict | None:
+    if env is None:
+        return None
+    return {
+        "msg_id": env.get("msg_id"),
+        "msg_type": env.get("msg_type"),
+        "timestamp": env.get("timestamp"),
+        "sender": env.get("sender"),
+        "receiver": env.get("receiver"),
+        "in_reply_to": env.get("in_reply_to"),
+    }
+
+
+class Runner:
+    """Routes and runs jobs over an `MRPClient`.
+
+    Adds what `mrpd run` and `mrpd batch` need on top of the client's pool,
+    caches and mirror: dispatch settings, offer selection and caching,
+    health recording and the evidence writer. Use as an async context
+    manager; the client is not closed with it.
+    """
+
+    def __init__(
+        self,
+        client: MRPClient,
+        *,
+        settings: DispatchSettings | None = None,
+        echo: Echo = _quiet,
+        prefer: str | None = None,
+    ) -> None:
+        self.client = client
+        self.config = config = client.config
+        self.settings = settings or config.dispatch
+        self.echo = echo
+        self.selector = OfferSelector(config.offers, prefer)
+        cache, offer_ttl = client.cache, config.cache.offer_ttl
+        self.offer_cache = OfferCache(cache, offer_ttl) if cache is not None and offer_ttl > 0 else None
+        self._health_store: HealthStore | None = None
+        self.writer = AsyncEvidenceWriter()
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        return self.client.http
+
+    async def __aenter__(self) -> "Runner":
+        await self.writer.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        try:
+            await self.writer.close()
+        finally:
+            if self._health_store is not None:
+                self._health_store.close()
+                self._health_store = None
+
+    def health_store(self) -> HealthStore:
+        if self._health_store is None:
+            self._health_store = HealthStore.from_config(self.config)
+        return self._health_store
+
+    def observe(self, entry_id: str | None, manifest_url: str | None, latency_ms: float, ok: bool) -> None:
+        # Only registry-selected providers feed the health store.
+        if not entry_id or not self.config.health.enabled:
+            return
+        self.health_store().record(entry_id, latency_ms=latency_ms, ok=ok, manifest_url=manifest_url)
+
+    def claim_trial(self, c: Candidate, echo: Echo) -> bool:
+        """Take a half-open provider's single trial call; False if another run already holds it.
+
+        Providers the health view saw as open are re-checked too: their
+        circuit may have turned half-open since.
+        """
+
+        health = self.client.health
+        if not c.entry_id or health is None:
+            return True
+        if c.entry_id not in health.half_open_ids and not health.is_open(c.entry_id):
+            return True
+        if c.entry_id in self.health_store().claim_trials([c.entry_id]):
+            echo(f"- {c.entry_id}: circuit trial already in progress elsewhere; skipped")
+            return False
+        return True
+
+    async def candidates(
+        self,
+        *,
+        capability: str,
+        policy: str | None,
+        intent: str,
+        registry: str | None = None,
+        manifest_url: str | None = None,
+        max_scan: int = 500,
+        echo: Echo | None = None,
+    ) -> list[Candidate] | None:
+        """Rank registry entries and fetch manifests for the best ones.
+
+        Returns up to `hedge + failover` candidates with discover/execute
+        endpoints, or None (after explaining why) when nothing is usable.
+        """
+
+        echo = echo or self.echo
+        if manifest_url:
+            echo("Fetching manifest...")
+            manifest = await self.client.manifest(manifest_url)
+            # For the built-in demo provider, use a stable receiver id.
+            return self._usable([Candidate(None, "service:mrpd", manifest_url, manifest)], echo)
+
+        hedge = max(1, self.settings.hedge)
+        wanted = hedge + max(0, self.settings.failover)
+        echo("Querying registry...")
+        scan = await self.client.scan(
+            intent, capability, policy, limit=max(5, wanted), registry=registry, max_scan=max_scan
+        )
+        if scan.error:
+            echo(f"Registry scan stopped early: {scan.error}")
+        top = scan.top
+
+        ranked = top.ranked()
+        satisfying = top.satisfying()
+        if not ranked and top.skipped:
+            echo(f"All {top.skipped} matching providers are failing (circuit open); skipped.")
+            echo("Check them with: mrpd health probe")
+            return None
+        if not ranked:
+            echo("No registry entries matched (requires manifest_url entries).")
+            echo("Tip: use --manifest-url http://host/mrp/manifest for local testing.")
+            return None
+        if not satisfying:
+            echo("No registry entries satisfied required capability/policy.")
+            for r in ranked[:5]:
+                missing = ", ".join(r.missing) if r.missing else "none"
+                echo(f"- score={r.score:.2f} id={r.entry.id} missing: {missing}")
+            return None
+
+        picked, invalid = materialize_valid(satisfying, wanted)
+        if invalid:
+            echo(f"Skipped {len(invalid)} invalid registry entries: {', '.join(invalid)}")
+        if not picked:
+            echo("No valid registry entries satisfied required capability/policy.")
+            return None
+        for i, r in enumerate(picked):
+            echo(f"{'Selected' if i < hedge else 'Fallback'} entry: {r.entry.id} ({r.entry.name})")
+        echo("Fetching manifest..." if len(picked) == 1 else f"Fetching {len(picked)} manifests...")
+        tasks = self.client.manifests([r.entry.manifest_url for r in picked])
+        out: list[Candidate] = []
+        for r, task in zip(picked, tasks):
+            e = r.entry
+            t0 = time.perf_counter()
+            try:
+                manifest = await task
+            except Exception as ex:
+                echo(f"- {e.id}: manifest fetch failed ({ex or type(ex).__name__}); skipped")
+                self.observe(e.id, e.manifest_url, (time.perf_counter() - t0) * 1000.0, ok=False)
+                continue
+            manifest = normalize_manifest_endpoints(manifest, e.manifest_url)
+            out.append(Candidate(e.id, e.id, e.manifest_url, manifest, score=r.score))
+        return self._usable(out, echo)
+
+    def _usable(self, candidates: list[Candidate], echo: Echo) -> list[Candidate] | None:
+        usable = [c for c in candidates if c.discover_url and c.execute_url]
+        if not usable:
+            echo("Selected manifest is missing endpoints.discover/execute")
+            return None
+        return usable
+
+    def _cached_offer(
+        self,
+        candidates: list[Candidate],
+        scope: tuple[str, dict],
+        choose: Callable[[dict], dict | None],
+    ) -> DiscoverResult | None:
+        """The best-ranked candidate with a fresh, still acceptable cached OFFER."""
+
+        if self.offer_cache is None:
+            return None
+        for c in candidates:
+            reply = self.offer_cache.get(_provider_key(c), *scope)
+            if isinstance(reply, dict) and choose(reply):
+                attempt = DiscoverAttempt(c.entry_id, c.discover_url or "", 0.0, 0.0, outcome="cached")
+                return DiscoverResult(c, None, reply, [attempt])
+        return None
+
+    def failover_policy(self, started: float) -> FailoverPolicy:
+        s = self.settings
+        return FailoverPolicy(
+            retries=max(0, s.execute_retries),
+            backoff=s.retry_backoff,
+            max_retry_after=s.max_retry_after,
+            deadline=started + s.deadline if s.deadline else None,
+        )
+
+    async def fail_job(
+        self,
+        job: Job,
+        error: str,
+        *,
+        job_id: str | None = None,
+        started: float | None = None,
+        discover: dict[str, Any] | None = None,
+        discover_ms: float | None = None,
+        extra: dict[str, Any] | None = None,
+    ) -> JobResult:
+        """Store an error bundle for a job that never reached EXECUTE (no route, no offer)."""
+
+        job_id = job_id or str(uuid.uuid4())
+        total_ms = round((time.perf_counter() - started) * 1000.0, 3) if started is not None else 0.0
+        transcript: dict[str, Any] = {"intent": job.intent, "capability": job.capability, "policy": job.policy}
+        if discover is not None:
+            transcript["discover"] = discover
+        timings: dict[str, Any] = {"total_ms": total_ms}
+        if discover_ms is not None:
+            timings["discover_ms"] = round(discover_ms, 3)
+        bundle = {
+            "job_id": job_id,
+            "created_at": utc_now_rfc3339(),
+            "status": "error",
+            "error": error,
+            "timings": timings,
+            "transcript": transcript,
+            "evidence_envelope": None,
+            **(extra or {}),
+        }
+        await self.writer.submit(bundle)
+        return JobResult(job_id, False, None, None, total_ms, error=error, bundle=bundle)
+
+    async def run_job(
+        self,
+        job: Job,
+        candidates: list[Candidate],
+        *,
+        started: float | None = None,
+        extra: dict[str, Any] | None = None,
+        echo: Echo | None = None,
+    ) -> JobResult:
+        """DISCOVER (hedged) then EXECUTE (with failover) one job and store its evidence.
+
+        `extra` is merged into the evidence bundle (e.g. batch bookkeeping).
+        """
+
+        echo = echo or self.echo
+        started = time.perf_counter() if started is None else started
+        failover = self.failover_policy(started)
+        s = self.settings
+        hedge_delay = s.hedge_delay
+
+        # DISCOVER
+        hedged = candidates[: max(1, s.hedge)]
+        discover_payload = job.discover_payload()
+        constraints = job.offer_constraints(self.selector)
+        offer_cache = self.offer_cache
+        cache_scope = (job.capability, discover_payload["constraints"])
+        # Candidates whose offer came from the offer cache (re-asked if the route is gone).
+        from_cache: set[int] = set()
+
+        def choose(reply: dict) -> dict | None:
+            best = self.selector.select(reply, constraints)
+            return best.offer.raw if best is not None else None
+
+        def remember(c: Candidate, reply: dict) -> None:
+            if offer_cache is not None:
+                offer_cache.put(_provider_key(c), *cache_scope, reply)
+
+        def rediscover(c: Candidate, failure: Failure) -> bool:
+            if id(c) not in from_cache or not is_unknown_route(failure):
+                return False
+            if offer_cache is not None:
+                offer_cache.invalidate(_provider_key(c), *cache_scope)
+            echo(f"- {c.entry_id or c.receiver_id}: cached route is gone; sending DISCOVER")
+            return True
+
+        # Half-open trials are claimed at first contact, so unused fallbacks hold no lease.
+        admitted: dict[int, bool] = {}
+
+        def admit(c: Candidate) -> bool:
+            if id(c) not in admitted:
+                admitted[id(c)] = self.claim_trial(c, echo)
+            return admitted[id(c)]
+
+        make_discover = lambda c: mk_envelope("DISCOVER", discover_payload, receiver_id=c.receiver_id)  # noqa: E731
+        found = self._cached_offer(hedged, cache_scope, choose)
+        if found is not None:
+            assert found.winner is not None
+            from_cache.add(id(found.winner))
+            echo(f"Using cached offer from {found.winner.entry_id or found.winner.receiver_id}")
+        else:
+            if len(hedged) == 1:
+                echo("Sending DISCOVER...")
+            else:
+                how = f"{hedge_delay:g}s apart" if hedge_delay else "at once"
+                echo(f"Sending DISCOVER to up to {len(hedged)} providers ({how})...")
+            found = await hedged_discover(
+                self.http,
+                hedged,
+                make_discover,
+                hedge_delay=hedge_delay,
+                timeout=min(s.discover_timeout, max(0.001, failover.remaining())),
+                accept=choose,
+                admit=admit,
+                reserve=candidates[len(hedged) :],
+            )
+            if found.winner is not None and found.reply is not None:
+                remember(found.winner, found.reply)
+            for c, reply in found.spare_offers:
+                remember(c, reply)
+        for a in found.attempts:
+            if a.outcome == "error":
+                cand = next(c for c in candidates if c.entry_id == a.entry_id)
+                self.observe(cand.entry_id, cand.manifest_url, a.elapsed_ms or 0.0, ok=False)
+        discover_ms = found.elapsed_ms
+
+        job_id = str(uuid.uuid4())
+        if found.winner is None:
+            echo("No acceptable offers returned.")
+            for a in found.attempts:
+                detail = f" ({a.error})" if a.error else ""
+                echo(f"- {a.entry_id or a.endpoint}: {a.outcome}{detail}")
+            discover = {
+                "request": _envelope_meta(found.request),
+                "attempts": [asdict(a) for a in found.attempts],
+            }
+            return await self.fail_job(
+                job,
+                "no offers returned",
+                job_id=job_id,
+                started=started,
+                discover=discover,
+                discover_ms=discover_ms,
+                extra=extra,
+            )
+
+        winner = found.winner
+        assert found.reply is not None
+        discover_env, offer_env = found.request, found.reply
+        if len(found.attempts) > 1:
+            echo(f"Offer accepted from {winner.entry_id} in {discover_ms:.0f}ms")
+        offers = self.selector.evaluate(offer_env, constraints)
+        if len(offers) > 1:
+            echo(f"Chose route {offers[0].offer.route_id} of {len(offers)} offers (prefer={self.selector.prefer})")
+
+        # EXECUTE, failing over to providers that offered too, then to
+        # unasked (or cancelled) lower-ranked ones.
+        asked = {a.entry_id for a in found.attempts if a.outcome != "cancelled"}
+        providers: list[tuple[Candidate, dict | None]] = [(winner, offer_env), *found.spare_offers]
+        providers += [(c, None) for c in candidates if c.entry_id not in asked]
+        echo("Sending EXECUTE...")
+
+        def make_execute(c: Candidate, route_id: str) -> dict:
+            exec_payload = {
+                "route_id": route_id,
+                "inputs": [{"type": "url", "value": job.url}],
+                "output_format": "markdown",
+                # Same job id on every attempt, so providers can dedupe retries.
+                "job": {"id": job_id, "intent": job.intent},
+            }
+            return mk_envelope("EXECUTE", exec_payload, receiver_id=c.receiver_id)
+
+        def on_attempt(c: Candidate, a: ExecuteAttempt) -> None:
+            self.observe(c.entry_id, c.manifest_url, a.elapsed_ms or 0.0, ok=a.outcome in ("evidence", "offer"))
+            if a.outcome in ("evidence", "offer"):
+                return
+            retry = " (retryable)" if a.retryable else ""
+            echo(f"- {c.entry_id or a.endpoint}: {a.phase} failed: {a.code} {a.error or ''}{retry}".rstrip())
+
+        done = await execute_with_failover(
+            self.http,
+            providers,
+            make_discover,
+            make_execute,
+            policy=failover,
+            discover_timeout=s.discover_timeout,
+            execute_timeout=s.execute_timeout,
+            on_attempt=on_attempt,
+            choose=choose,
+            on_offer=remember,
+            rediscover=rediscover,
+            admit=admit,
+        )
+        out = done.reply
+        if done.ok:
+            echo("Received evidence.")
+        elif failover.remaining() <= 0:
+            echo("Deadline reached before any provider returned evidence.")
+        else:
+            echo("No provider returned evidence.")
+
+        payload = (out or {}).get("payload") or {}
+        response_job_id = payload.get("job_id") or job_id
+        outputs = payload.get("outputs") or []
+        artifact_refs = [o for o in outputs if isinstance(o, dict) and o.get("type") == "artifact"]
+
+        served_by = done.candidate or winner
+        total_ms = round((time.perf_counter() - started) * 1000.0, 3)
+        bundle = {
+            "job_id": response_job_id,
+            "created_at": utc_now_rfc3339(),
+            "status": "ok" if done.ok else "error",
+            "timings": {
+                "discover_ms": round(discover_ms, 3),
+                "execute_ms": round(done.elapsed_ms, 3),
+                "total_ms": total_ms,
+            },
+            "transcript": {
+                "intent": job.intent,
+                "capability": job.capability,
+                "policy": job.policy,
+                "discover": {
+                    "endpoint": winner.discover_url,
+                    "request": _envelope_meta(discover_env),
+                    "response": _envelope_meta(offer_env),
+                    # One record per provider asked (or "cached"); timings are relative to the first request.
+                    "attempts": [asdict(a) for a in found.attempts],
+                    # The winning reply's offers, chosen one first, with their objective scores.
+                    "offers": [o.summary() for o in offers],
+                },
+                "execute": {
+                    "endpoint": served_by.execute_url,
+                    "request": _envelope_meta(done.request),
+                    "response": _envelope_meta(out),
+                    # Every EXECUTE try, plus DISCOVERs sent to failover providers.
+                    "attempts": [asdict(a) for a in done.attempts],
+                },
+            },
+            "artifact_refs": artifact_refs,
+            "evidence_envelope": out,
+            **(extra or {}),
+        }
+        await self.writer.submit(bundle)
+        return JobResult(response_job_id, done.ok, out, served_by.receiver_id, total_ms, bundle=bundle)
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Iterable
+import heapq
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Iterable, Sequence, Union
 
+from mrpd.core.compact import CompactEntry
 from mrpd.core.models import RegistryEntry
 
+if TYPE_CHECKING:
+    from mrpd.core.health import HealthView
+    from mrpd.core.intent import IntentView
+
+
+AnyEntry = Union[RegistryEntry, CompactEntry]
+
 
 @dataclass(frozen=True)
 class ScoreResult:
-    entry: RegistryEntry
+    entry: AnyEntry
     score: float
     required_matches: int
     trust_score: float
@@ -31,21 +40,67 @@ class ScoreResult:
             self.entry.id,
         )
 
+    def materialize(self) -> "ScoreResult":
+        """Same result with a full `RegistryEntry` (for display/selection)."""
+
+        if isinstance(self.entry, CompactEntry):
+            return replace(self, entry=self.entry.materialize())
+        return self
 
-def score_entry(entry: RegistryEntry, *, capability: str | None, policy: str | None) -> ScoreResult:
+
+def materialize_valid(
+    results: Iterable[ScoreResult], limit: int | None = None
+) -> tuple[list[ScoreResult], list[str]]:
+    """Materialize results in order, dropping those whose full record fails validation.
+
+    Compact entries are only validated here, so a malformed registry record
+    can rank fine and still be unusable. Returns up to `limit` valid
+    results and the ids of the entries left out.
+    """
+
+    valid: list[ScoreResult] = []
+    invalid: list[str] = []
+    for r in results:
+        if limit is not None and len(valid) >= limit:
+            break
+        try:
+            valid.append(r.materialize())
+        except (ValueError, OSError):
+            invalid.append(r.entry.id)
+    return valid, invalid
+
+
+def _features(entry: AnyEntry) -> tuple[Iterable[str], Iterable[str], float | None, int]:
+    if isinstance(entry, CompactEntry):
+        return entry.capabilities, entry.policies, entry.trust_score, entry.proofs_count
+    trust = entry.trust.score if entry.trust else None
+    return entry.capabilities, entry.policies, trust, len(entry.proofs)
+
+
+def score_entry(
+    entry: AnyEntry,
+    *,
+    capability: str | None,
+    policy: str | None,
+    health: "HealthView | None" = None,
+    intent: "IntentView | None" = None,
+) -> ScoreResult:
     """Deterministic scoring with explicit tie-breakers.
 
     Score weights are simple and predictable; ties break by required matches,
-    trust score, proof count, then stable name/id ordering.
+    trust score, proof count, then stable name/id ordering. With `intent`,
+    free-text relevance adds points; with `health`, observed latency and
+    error rate are subtracted as a penalty.
     """
 
+    capabilities, policies, entry_trust, proofs_count = _features(entry)
     score = 0.0
     reasons: list[str] = []
     missing: list[str] = []
     required_matches = 0
 
     if capability:
-        if capability in entry.capabilities:
+        if capability in capabilities:
             score += 50.0
             required_matches += 1
             reasons.append(f"capability match: {capability}")
@@ -53,7 +108,7 @@ def score_entry(entry: RegistryEntry, *, capability: str | None, policy: str | N
             missing.append(f"capability:{capability}")
 
     if policy:
-        if policy in entry.policies:
+        if policy in policies:
             score += 20.0
             required_matches += 1
             reasons.append(f"policy match: {policy}")
@@ -61,19 +116,30 @@ def score_entry(entry: RegistryEntry, *, capability: str | None, policy: str | N
             missing.append(f"policy:{policy}")
 
     trust_score = 0.0
-    if entry.trust and entry.trust.score is not None:
-        trust_score = float(entry.trust.score)
+    if entry_trust is not None:
+        trust_score = float(entry_trust)
         score += 10.0 * trust_score
         reasons.append(f"trust score: {trust_score:.2f}")
 
-    proofs_count = len(entry.proofs)
     if proofs_count:
         reasons.append(f"proofs: {proofs_count}")
 
-    if capability and policy and (capability in entry.capabilities) and (policy in entry.policies):
+    if capability and policy and (capability in capabilities) and (policy in policies):
         score += 5.0
         reasons.append("capability+policy bonus")
 
+    if intent is not None:
+        points, notes = intent.bonus(entry.id)
+        if notes:
+            score += points
+            reasons.extend(notes)
+
+    if health is not None:
+        penalty, notes = health.penalty(entry.id)
+        if notes:
+            score -= penalty
+            reasons.extend(notes)
+
     return ScoreResult(
         entry=entry,
         score=score,
@@ -86,7 +152,175 @@ def score_entry(entry: RegistryEntry, *, capability: str | None, policy: str | N
 
 
 def rank_entries(
-    entries: Iterable[RegistryEntry], *, capability: str | None, policy: str | None
+    entries: Iterable[AnyEntry],
+    *,
+    capability: str | None,
+    policy: str | None,
+    health: "HealthView | None" = None,
+    intent: "IntentView | None" = None,
 ) -> list[ScoreResult]:
-    scored = [score_entry(e, capability=capability, policy=policy) for e in entries]
+    """Score and fully sort entries; with `health`, open-circuit providers are left out."""
+
+    if health is not None and health.open_ids:
+        entries = [e for e in entries if not health.is_open(e.id)]
+    scored = [
+        score_entry(e, capability=capability, policy=policy, health=health, intent=intent) for e in entries
+    ]
     return sorted(scored, key=lambda r: r.rank_key())
+
+
+def score_upper_bound(*, capability: str | None, policy: str | None, intent_weight: float = 0.0) -> float:
+    """Highest score `score_entry` can assign for this query."""
+
+    bound = 10.0 + intent_weight  # trust, intent relevance
+    if capability:
+        bound += 50.0
+    if policy:
+        bound += 20.0
+    if capability and policy:
+        bound += 5.0
+    return bound
+
+
+_BATCH_MIN = 256
+
+
+@dataclass(order=True)
+class _Worst:
+    # Heap item ordered so the *worst* ranked result sits at the heap root.
+    neg_key: tuple
+    result: ScoreResult = field(compare=False)
+
+
+@dataclass(frozen=True)
+class _InvStr:
+    s: str
+
+    def __lt__(self, other: "_InvStr") -> bool:
+        return self.s > other.s
+
+
+def _invert(key: tuple) -> tuple:
+    return tuple(-x if isinstance(x, (int, float)) else _InvStr(x) for x in key)
+
+
+class TopK:
+    """Incremental bounded ranking for streamed registry entries.
+
+    Keeps the best `k` satisfying results and the best `k` overall (for
+    near-miss reporting) in heaps, so memory stays O(k) however many entries
+    are pushed. Results come back in `rank_key` order.
+
+    `settled()` turns true once `k` satisfying results all score strictly
+    above anything an unseen entry could reach, so a caller may stop
+    fetching without changing the outcome. Unseen entries are bounded by
+    the capability/policy/trust maximum plus the best intent bonus not yet
+    seen; an equal score is never enough, since proofs, name and id still
+    break the tie. Without an intent view nothing clears that bound, so the
+    scan runs to its end.
+    """
+
+    def __init__(
+        self,
+        k: int,
+        *,
+        capability: str | None,
+        policy: str | None,
+        health: "HealthView | None" = None,
+        intent: "IntentView | None" = None,
+    ) -> None:
+        self.k = max(1, k)
+        self.capability = capability
+        self.policy = policy
+        # Health penalties only lower scores, so the upper bound still holds.
+        self.health = health
+        self.intent = intent
+        self.upper_bound = score_upper_bound(
+            capability=capability, policy=policy, intent_weight=intent.weight if intent else 0.0
+        )
+        self._base_bound = score_upper_bound(capability=capability, policy=policy)
+        # Intent-relevant ids, best first; `_intent_seen` marks those already pushed.
+        self._intent_order = sorted(intent.relevance, key=intent.relevance.__getitem__, reverse=True) if intent else []
+        self._intent_next = 0
+        self._intent_seen: set[str] = set()
+        self.seen = 0
+        # Entries left out because their provider's circuit is open.
+        self.skipped = 0
+        self._satisfied: list[_Worst] = []
+        self._all: list[_Worst] = []
+
+    def _offer(self, heap: list[_Worst], result: ScoreResult) -> None:
+        item = _Worst(_invert(result.rank_key()), result)
+        if len(heap) < self.k:
+            heapq.heappush(heap, item)
+        elif heap[0] < item:
+            heapq.heapreplace(heap, item)
+
+    def _mark_seen(self, entries: Iterable[AnyEntry]) -> None:
+        if self.intent is not None:
+            relevance = self.intent.relevance
+            self._intent_seen.update(e.id for e in entries if e.id in relevance)
+
+    def push(self, entry: AnyEntry) -> ScoreResult | None:
+        self._mark_seen((entry,))
+        if self.health is not None and self.health.is_open(entry.id):
+            self.skipped += 1
+            return None
+        result = score_entry(
+            entry, capability=self.capability, policy=self.policy, health=self.health, intent=self.intent
+        )
+        self.seen += 1
+        self._offer(self._all, result)
+        if result.satisfied:
+            self._offer(self._satisfied, result)
+        return result
+
+    def extend(self, entries: Iterable[AnyEntry]) -> None:
+        if isinstance(entries, Sequence) and len(entries) >= _BATCH_MIN:
+            # Large batches (whole pages, raw lists) go through the columnar ranker.
+            from mrpd.core.ranking import rank_top_k
+
+            self._mark_seen(entries)
+
+            satisfying, ranked = rank_top_k(
+                entries,
+                self.k,
+                capability=self.capability,
+                policy=self.policy,
+                health=self.health,
+                intent=self.intent,
+            )
+            skipped = 0
+            if self.health is not None and self.health.open_ids:
+                skipped = sum(1 for e in entries if self.health.is_open(e.id))
+            self.skipped += skipped
+            self.seen += len(entries) - skipped
+            for r in ranked:
+                self._offer(self._all, r)
+            for r in satisfying:
+                self._offer(self._satisfied, r)
+            return
+        for e in entries:
+            self.push(e)
+
+    def unseen_bound(self) -> float:
+        """Highest score an entry not pushed yet could still get."""
+
+        order = self._intent_order
+        while self._intent_next < len(order) and order[self._intent_next] in self._intent_seen:
+            self._intent_next += 1
+        if self._intent_next == len(order):
+            return self._base_bound
+        assert self.intent is not None
+        return self._base_bound + self.intent.bonus(order[self._intent_next])[0]
+
+    def settled(self) -> bool:
+        if len(self._satisfied) < self.k:
+            return False
+        return self._satisfied[0].result.score > self.unseen_bound()
+
+    def satisfying(self) -> list[ScoreResult]:
+        return sorted((i.result for i in self._satisfied), key=lambda r: r.rank_key())
+
+    def ranked(self) -> list[ScoreResult]:
+        return sorted((i.result for i in self._all), key=lambda r: r.rank_key())
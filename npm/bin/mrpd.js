@@ -11,10 +11,14 @@
       python -m mrpd.cli <args>
   - Otherwise, use a dedicated venv under ~/.mrpd/runtime and ensure the PyPI package is installed,
     then run: python -m mrpd.cli <args>
+  - The resolved venv python and installed version are cached in ~/.mrpd/runtime/stamp.json.
+    While the stamp is fresh (same package/version request, venv and site-packages unchanged),
+    the venv python is run directly: one process per invocation, no probing.
 
   Env overrides:
   - MRPD_PYPI_PACKAGE (default: "mrpd")
   - MRPD_PYPI_VERSION (optional, e.g. "0.1.0")
+  - MRPD_REFRESH_RUNTIME=1 (ignore the stamp and re-probe)
 */
 
 const fs = require("fs");
@@ -22,6 +26,9 @@ const os = require("os");
 const path = require("path");
 const { spawnSync } = require("child_process");
 
+// Bump when the stamp layout or what it vouches for changes.
+const STAMP_FORMAT = 1;
+
 function isWin() {
   return process.platform === "win32";
 }
@@ -72,25 +79,96 @@ function venvPython(venvDir) {
   return path.join(venvDir, isWin() ? "Scripts" : "bin", isWin() ? "python.exe" : "python");
 }
 
-function ensurePipPackage(pyExe, pkg, version) {
+// Prints the installed distribution version and the site-packages dir mrpd imports from.
+const PROBE = [
+  "import json, os, importlib.metadata as md, mrpd",
+  "print(json.dumps({'version': md.version(%s), 'site': os.path.dirname(os.path.dirname(os.path.abspath(mrpd.__file__)))}))",
+].join("\n");
+
+function probeInstalled(pyExe, pkg, cwd) {
+  const r = spawnSync(pyExe, ["-c", PROBE.replace("%s", JSON.stringify(pkg))], {
+    cwd,
+    encoding: "utf8",
+    stdio: ["ignore", "pipe", "ignore"],
+  });
+  if (r.status !== 0) return null;
+  try {
+    return JSON.parse(r.stdout);
+  } catch {
+    return null;
+  }
+}
+
+function ensurePipPackage(pyExe, pkg, version, cwd) {
   const spec = version ? `${pkg}==${version}` : pkg;
 
-  // Fast check: can we import mrpd?
-  const check = spawnSync(pyExe, ["-c", "import mrpd"], { stdio: "ignore" });
-  if (check.status === 0) return;
+  const installed = probeInstalled(pyExe, pkg, cwd);
+  if (installed && (!version || installed.version === version)) return installed;
 
   console.error(`[mrpd] Installing Python package: ${spec}`);
   const status = run(pyExe, ["-m", "pip", "install", "--upgrade", spec], { cwd: path.dirname(pyExe) });
   if (status !== 0) process.exit(status);
+  return probeInstalled(pyExe, pkg, cwd);
 }
 
-function main() {
+function mtimeMs(p) {
+  try {
+    return fs.statSync(p).mtimeMs;
+  } catch {
+    return null;
+  }
+}
+
+function stampKey(venvDir, site, pkg, version) {
+  // pyvenv.cfg changes when the venv is rebuilt; site-packages when anything is (un)installed.
+  return {
+    format: STAMP_FORMAT,
+    pkg,
+    requested: version,
+    venvMtime: mtimeMs(path.join(venvDir, "pyvenv.cfg")),
+    siteMtime: site ? mtimeMs(site) : null,
+  };
+}
+
+function readStamp(stampPath, venvDir, pkg, version) {
+  if (process.env.MRPD_REFRESH_RUNTIME === "1") return null;
+  let stamp;
+  try {
+    stamp = JSON.parse(fs.readFileSync(stampPath, "utf8"));
+  } catch {
+    return null;
+  }
+  const want = stampKey(venvDir, stamp.site, pkg, version);
+  for (const [k, v] of Object.entries(want)) {
+    if (v === null || stamp[k] !== v) return null;
+  }
+  return fs.existsSync(stamp.python) ? stamp : null;
+}
+
+function writeStamp(stampPath, venvDir, pyExe, installed, pkg, version) {
+  const stamp = { ...stampKey(venvDir, installed.site, pkg, version), python: pyExe, installed: installed.version, site: installed.site };
+  const tmp = `${stampPath}.${process.pid}.tmp`;
+  try {
+    fs.writeFileSync(tmp, JSON.stringify(stamp, null, 2));
+    fs.renameSync(tmp, stampPath);
+  } catch {
+    // A missing stamp only costs the next run a re-probe.
+    try {
+      fs.unlinkSync(tmp);
+    } catch {}
+  }
+}
+
+function requirePython() {
   const py = whichPython();
   if (!py) {
     console.error("[mrpd] Python 3 is required (python/python3 or py -3). Install Python first.");
     process.exit(2);
   }
+  return py;
+}
 
+function main() {
   const args = process.argv.slice(2);
 
   const root = repoRootFromHere();
@@ -104,8 +182,9 @@ function main() {
       ? path.join(root, ".venv", "Scripts", "python.exe")
       : path.join(root, ".venv", "bin", "python");
 
-    const cmd = fs.existsSync(repoPy) ? repoPy : py.cmd;
-    const prefix = fs.existsSync(repoPy) ? [] : py.prefixArgs;
+    const py = fs.existsSync(repoPy) ? { cmd: repoPy, prefixArgs: [] } : requirePython();
+    const cmd = py.cmd;
+    const prefix = py.prefixArgs;
 
     process.exit(run(cmd, [...prefix, "-m", "mrpd.cli", ...args], { cwd: root }));
   }
@@ -114,16 +193,24 @@ function main() {
   const home = os.homedir();
   const runtimeDir = path.join(home, ".mrpd", "runtime");
   const venvDir = path.join(runtimeDir, "venv");
-
-  ensureVenv(py, venvDir);
-
-  const pyExe = venvPython(venvDir);
+  const stampPath = path.join(runtimeDir, "stamp.json");
   const pkg = process.env.MRPD_PYPI_PACKAGE || "mrpd";
   const ver = process.env.MRPD_PYPI_VERSION || "";
 
   // IMPORTANT: avoid importing the local repo's ./mrpd package when running
   // the venv-installed CLI. Set cwd away from any checkout that may shadow it.
-  ensurePipPackage(pyExe, pkg, ver || null);
+  const stamp = readStamp(stampPath, venvDir, pkg, ver);
+  if (stamp) {
+    process.exit(run(stamp.python, ["-m", "mrpd.cli", ...args], { cwd: runtimeDir }));
+  }
+
+  if (!fs.existsSync(path.join(venvDir, isWin() ? "Scripts" : "bin"))) {
+    ensureVenv(requirePython(), venvDir);
+  }
+
+  const pyExe = venvPython(venvDir);
+  const installed = ensurePipPackage(pyExe, pkg, ver || null, runtimeDir);
+  if (installed) writeStamp(stampPath, venvDir, pyExe, installed, pkg, ver);
 
   process.exit(run(pyExe, ["-m", "mrpd.cli", ...args], { cwd: runtimeDir }));
 }
@@ -0,0 +1,104 @@
+"""Import-time benchmark for the mrpd CLI.
+
+Runs `python -X importtime` on cheap commands in fresh interpreters and
+fails when they pull in a heavy dependency they don't need, or when their
+imports (beyond a bare interpreter's) blow the time budget:
+
+    python scripts/bench_import.py
+    python scripts/bench_import.py --scale 2 --runs 7   # slower machine
+
+Cold start matters for agents that shell out to `mrpd` once per call;
+run this after touching `mrpd/cli.py` or adding top-level imports.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Modules no cheap command may import (first dotted component).
+HEAVY = ("httpx", "fastapi", "starlette", "uvicorn", "jsonschema", "yaml", "pydantic", "numpy", "h2")
+
+# (label, python args, heavy modules the command legitimately needs, import budget in ms).
+# Budgets are over a bare interpreter's imports; typer alone is ~60ms.
+CASES = [
+    ("import mrpd.cli", ["-c", "import mrpd.cli"], (), 120.0),
+    ("mrpd version", ["-m", "mrpd", "version"], (), 120.0),
+    ("mrpd validate", ["-m", "mrpd", "validate", "--fixtures"], ("jsonschema",), 250.0),
+]
+
+
+def importtime(args: list[str]) -> tuple[float, dict[str, int], set[str]]:
+    """Wall time (ms) of one run, cumulative import µs per top-level import, and every module imported."""
+
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")]))}
+    env.pop("PYTHONIMPORTTIME", None)
+    cmd = [sys.executable, "-X", "importtime", *args]
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, env=env, capture_output=True, text=True, cwd=ROOT)
+    wall_ms = (time.perf_counter() - t0) * 1000.0
+    if proc.returncode != 0:
+        raise SystemExit(f"{' '.join(args)} failed ({proc.returncode}):\n{proc.stderr[-2000:]}")
+    top: dict[str, int] = {}
+    seen: set[str] = set()
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package", nesting shown by indent
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        seen.add(name.strip())
+        if name[1:2] != " ":
+            top[name.strip()] = int(cumulative)
+    return wall_ms, top, seen
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5, help="fresh interpreters per case (median is reported)")
+    ap.add_argument("--scale", type=float, default=1.0, help="multiply every case's time budget")
+    ap.add_argument("--top", type=int, default=5, help="slowest top-level imports to show per case")
+    opts = ap.parse_args()
+
+    runs = max(1, opts.runs)
+    # Interpreter startup (site, encodings, ...) is not ours to optimize.
+    baseline = statistics.median(sum(importtime(["-c", "pass"])[1].values()) / 1000.0 for _ in range(runs))
+    print(f"baseline (python -c pass): imports {baseline:.0f}ms")
+
+    failed = False
+    for label, args, allowed, budget_ms in CASES:
+        walls: list[float] = []
+        totals: list[float] = []
+        modules: dict[str, int] = {}
+        seen: set[str] = set()
+        for _ in range(runs):
+            wall_ms, modules, seen = importtime(args)
+            walls.append(wall_ms)
+            # Top-level cumulative times add up to the whole import cost.
+            totals.append(sum(modules.values()) / 1000.0)
+        imports_ms = statistics.median(totals) - baseline
+        heavy = sorted(({m.split(".")[0] for m in seen} & set(HEAVY)) - set(allowed))
+        budget_ms *= opts.scale
+        ok = not heavy and imports_ms <= budget_ms
+        failed |= not ok
+        print(
+            f"{'ok  ' if ok else 'FAIL'} {label}: imports {imports_ms:.0f}ms (budget {budget_ms:.0f}ms), "
+            f"wall {statistics.median(walls):.0f}ms (median of {len(walls)})"
+        )
+        if heavy:
+            print(f"     heavy modules imported: {', '.join(heavy)}")
+        ours = {k: v for k, v in modules.items() if k not in ("site", "encodings")}
+        for name, us in sorted(ours.items(), key=lambda kv: -kv[1])[: opts.top]:
+            print(f"     {us / 1000.0:8.1f}ms  {name}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())